@@ -1,63 +1,324 @@
 # Enhanced_BankingApp.py - Creative Multi-Feature Banking System
 
-import os
-import json
-import datetime
-from Model import BankAccount, BankAccountOwner, TransactionType
+import uuid
+from Model import BankAccount, BankAccountOwner, TransactionType, check_finite
+from banking_journal import (ChangeJournal, JournalWatcher, JournalReset, RetryPolicy,
+                             ConcurrentUpdateError, journal_path_for, account_record,
+                             new_event, event_is_empty, read_snapshot, write_snapshot)
+from banking_allocator import AccountNumberAllocator, allocator_path_for
+from banking_records import stamp, format_ts, today, new_transfer_id, TransactionLog
+from banking_index import OwnerIndex, AccountOrder, sort_name
+from banking_customers import CustomerRegistry, new_customer_id
+from banking_fraud import FraudDetector
+from banking_limits import AccountLimits, new_hold_id
+from banking_archive import HistoryArchive, archive_dir_for
+from banking_rollups import Rollups
+from banking_jobs import prune_jobs
+
+# Journal polls publish_changes makes to read its own record back before redoing it
+PUBLISH_POLLS = 3
+
+def restore_accounts(data, customers):
+    """Rebuild the accounts of a snapshot, loading its customers into `customers` first"""
+    customers.load(data.get('customers', {}))
+    accounts = {}
+    for acc_data in data.get('accounts', {}).values():
+        owner = customers.get(acc_data.get('customer_id'))
+        if owner is None:
+            # Snapshot written before customers were stored separately
+            owner = customers.intern(
+                acc_data['owner_first_name'], 
+                acc_data['owner_last_name'],
+                acc_data.get('customer_id')
+            )
+        accounts[acc_data['account_number']] = BankAccount(
+            acc_data['account_number'], 
+            owner, 
+            acc_data['balance'],
+            acc_data.get('version', 0)
+        )
+    return accounts
+
 
 class EnhancedBankingSystem:
-    def __init__(self):
+    def __init__(self, data_file="banking_data.json", auto_save=True, check_digits=None):
         self.accounts = {}
-        self.transaction_history = []
-        self.data_file = "banking_data.json"
+        self.transaction_history = TransactionLog()
+        self.data_file = data_file
+        # Every operation is durable in the journal (fsynced) as soon as it
+        # commits. The snapshot is checkpointed once the journal tail after it
+        # holds checkpoint_interval records, whoever wrote them: with
+        # auto_save after each commit, otherwise when the caller asks
+        # (checkpoint_if_due / save_data).
+        self.auto_save = auto_save
+        self.checkpoint_interval = 100
+        # Journal records already read when the current snapshot was loaded or written
+        self.snapshot_records = 0
+        self.dirty = False
+        
+        # Change journal shared with other running front ends
+        self.origin = uuid.uuid4().hex
+        self.journal = ChangeJournal(journal_path_for(data_file))
+        self.watcher = JournalWatcher(self.journal, self.origin)
+        self.pending_event = new_event(self.origin)
+        self.event_seq = 0
+        self.journal_resets = 0
+        self.retry_policy = RetryPolicy()
+        # Account numbers come from a shared high-water mark, not a max() scan
+        self.allocator = AccountNumberAllocator(
+            allocator_path_for(data_file),
+            seed=lambda: max(self.accounts) if self.accounts else None)
+        self.owner_index = OwnerIndex()
+        self.account_order = AccountOrder()
+        self.customers = CustomerRegistry()
+        # Called with the changed account numbers after every merge (None = full reload)
+        self.change_listeners = []
+        # Bumped on every merge that changed accounts (cheap "has anything changed" check)
+        self.revision = 0
+        # Batch job id -> progress, committed through the journal (see banking_jobs)
+        self.job_progress = {}
+        # Screens every committed operation; alerts queue up in fraud_detector.alerts
+        self.fraud_detector = FraudDetector()
+        # Daily withdrawal limits and holds, kept current by journal replay
+        self.limits = AccountLimits()
+        self.watcher.observers.append(self.limits.observe_event)
+        # Old transaction rows moved out of the snapshot (see archive_history)
+        self.archive = HistoryArchive(archive_dir_for(data_file))
+        # Per-day / per-type / per-account-month totals, caught up after every merge
+        self.rollups = Rollups()
         self.load_data()
+        # True/False switches Luhn check digits on new account numbers for
+        # every front end of this book; None keeps the stored setting
+        if check_digits is not None:
+            self.allocator.set_check_digit(check_digits)
     
-    def save_data(self):
-        """Save all banking data to JSON file"""
+    def to_data(self):
+        """Build the JSON-serializable snapshot of the book"""
         data = {
+            'customers': self.customers.to_data(),
             'accounts': {},
-            'transaction_history': self.transaction_history
+            'transaction_history': self.transaction_history.to_data(),
+            'jobs': self.job_progress,
+            'limits': self.limits.to_data(),
+            'rollups': self.rollups.to_data(),
+            'journal_offset': self.watcher.offset
         }
         
+        # Owners are stored once under 'customers'; accounts only reference them
         for acc_num, account in self.accounts.items():
             data['accounts'][acc_num] = {
-                'account_number': account.account_number,
-                'owner_first_name': account.account_owner.first_name,
-                'owner_last_name': account.account_owner.last_name,
-                'balance': account.account_balance
+                'account_number': acc_num,
+                'customer_id': account.account_owner.customer_id,
+                'balance': account.account_balance,
+                'version': account.version
             }
+        return data
+    
+    def save_data(self):
+        """Checkpoint all banking data into the JSON snapshot (atomic write)"""
+        # Publish our own pending change and pick up everyone else's first, so
+        # the snapshot holds exactly the journal up to journal_offset
+        self.publish_changes()
+        self.sync_changes()
+        prune_jobs(self.job_progress)
+        write_snapshot(self.data_file, self.to_data())
+        self.dirty = False
+        self.snapshot_records = self.watcher.records
+    
+    def journal_tail(self):
+        """Journal records (from any front end) after the snapshot this process last loaded or wrote"""
+        return self.watcher.records - self.snapshot_records
+    
+    def checkpoint_if_due(self):
+        """Checkpoint once the journal tail has reached checkpoint_interval records"""
+        self.sync_changes()
+        if self.journal_tail() >= self.checkpoint_interval:
+            self.save_data()
+    
+    def compact_journal(self):
+        """Checkpoint and empty the journal.
+        
+        Only run this while no other front end is open on the same data file:
+        a running front end notices the reset and reloads, but an operation
+        it is committing at that very moment could be lost.
+        """
+        self.save_data()
+        self.journal.truncate()
+        self.watcher.reset(0)
+        self.save_data()
+    
+    def persist(self):
+        """Commit the staged operation to the journal and checkpoint when due.
         
-        with open(self.data_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        Returns False if the operation lost a version conflict and was not applied.
+        """
+        if not self.publish_changes():
+            return False
+        self.dirty = True
+        if self.auto_save:
+            self.checkpoint_if_due()
+        return True
+    
+    def publish_changes(self):
+        """Append the staged operation to the journal and replay it.
+        
+        The operation only changes in-memory state once it is read back from
+        the journal, which is where version conflicts are decided.
+        """
+        event = self.pending_event
+        self.pending_event = new_event(self.origin)
+        if event_is_empty(event):
+            return True
+        self.event_seq += 1
+        event['seq'] = self.event_seq
+        end = self.journal.append(event)
+        
+        resets = self.journal_resets
+        for _ in range(PUBLISH_POLLS):
+            self.sync_changes()
+            if self.journal_resets != resets:
+                # Journal was compacted under us: the event's fate is unknown, redo it
+                return False
+            if self.watcher.offset >= end:
+                break
+        accepted = self.watcher.take_outcome(event['seq'])
+        if accepted is None:
+            # Our record did not read back (corrupt or torn): it was never applied, redo it
+            return False
+        if accepted and self.fraud_detector is not None:
+            self.fraud_detector.screen_many(event['transactions'])
+        return accepted
+    
+    def discard_changes(self):
+        """Drop the staged (uncommitted) operation"""
+        self.pending_event = new_event(self.origin)
+    
+    def run_operation(self, stage):
+        """Stage and commit an operation, retrying it when another writer won a conflict"""
+        policy = self.retry_policy
+        for attempt in range(policy.max_attempts):
+            try:
+                result = stage()
+            except Exception:
+                # Never leave half a staged operation for the next commit
+                self.discard_changes()
+                raise
+            if self.persist():
+                return result()
+            policy.wait(attempt)
+        raise ConcurrentUpdateError("Account was changed concurrently too many times, please retry")
+    
+    def sync_changes(self):
+        """Merge operations committed by other front ends; return changed account numbers"""
+        try:
+            changed = self.watcher.poll(self.accounts, self.transaction_history)
+        except JournalReset:
+            self.journal_resets += 1
+            self.load_data()
+            return set(self.accounts)
+        if self.rollups.through < self.transaction_history.archived_rows:
+            # Another front end archived rows this one had not counted yet
+            self.rebuild_rollups()
+        else:
+            self.rollups.catch_up(self.transaction_history)
+        reshaped = self.watcher.reshaped
+        if reshaped:
+            # Balance-only changes leave owners, names and numbers untouched
+            self.customers.update(self.accounts, reshaped)
+            self.owner_index.update(self.accounts, reshaped)
+            self.account_order.update(self.accounts, reshaped)
+        if changed:
+            self.notify_listeners(changed)
+        return changed
+    
+    def add_change_listener(self, listener):
+        """Register listener(changed_account_numbers); None means everything may have changed"""
+        self.change_listeners.append(listener)
+    
+    def notify_listeners(self, changed):
+        self.revision += 1
+        for listener in self.change_listeners:
+            listener(changed)
     
     def load_data(self):
-        """Load banking data from JSON file"""
-        if os.path.exists(self.data_file):
+        """Recover the book: newest readable snapshot plus the journal tail after it"""
+        self.accounts = {}
+        self.transaction_history = TransactionLog()
+        self.customers = CustomerRegistry()
+        self.watcher.make_owner = self.customers.intern
+        self.job_progress = {}
+        self.watcher.jobs = self.job_progress
+        self.limits.load({})
+        self.rollups = None
+        self.dirty = False
+        self.snapshot_records = 0
+        self.pending_event = new_event(self.origin)
+        journal_offset = 0
+        
+        try:
+            data, source = read_snapshot(self.data_file)
+        except ValueError as e:
+            # Never fall back to demo accounts over a real (damaged) book:
+            # rebuild from the journal instead
+            print(f"Error loading data: {e}")
+            print("Rebuilding the book from the change journal...")
+            data, source = {'accounts': {}}, None
+        
+        if data is None:
+            self.create_default_accounts()
+        else:
+            if source and source != self.data_file:
+                print(f"⚠️ {self.data_file} is unreadable, recovered from {source}")
             try:
-                with open(self.data_file, 'r') as f:
-                    data = json.load(f)
-                
-                # Restore accounts
-                for acc_data in data.get('accounts', {}).values():
-                    owner = BankAccountOwner(
-                        acc_data['owner_first_name'], 
-                        acc_data['owner_last_name']
-                    )
-                    account = BankAccount(
-                        acc_data['account_number'], 
-                        owner, 
-                        acc_data['balance']
-                    )
-                    self.accounts[acc_data['account_number']] = account
+                self.accounts = restore_accounts(data, self.customers)
                 
                 # Restore transaction history
-                self.transaction_history = data.get('transaction_history', [])
+                history_data = data.get('transaction_history', [])
+                self.transaction_history = TransactionLog.from_data(history_data)
+                self.job_progress.update(data.get('jobs', {}))
+                self.limits.load(data.get('limits', {}))
+                if 'rollups' in data:
+                    self.rollups = Rollups.from_data(data['rollups'])
+                journal_offset = data.get('journal_offset', 0)
+                
+                # History saved as row dicts or without audit anchors: rewrite it at the next checkpoint
+                if self.transaction_history.upgraded:
+                    self.dirty = True
+                for problem in self.transaction_history.tamper_problems:
+                    print(f"⚠️ Audit check failed on load: {problem}")
                 
             except Exception as e:
                 print(f"Error loading data: {e}")
-                self.create_default_accounts()
+                print("Rebuilding the book from the change journal...")
+                self.accounts = {}
+                self.transaction_history = TransactionLog()
+                self.job_progress.clear()
+                self.limits.load({})
+                self.rollups = None
+                journal_offset = 0
+        
+        # A journal shorter than the checkpointed offset was compacted afterwards
+        if self.journal.size() < journal_offset:
+            journal_offset = 0
+        
+        # Replay changes committed after the snapshot was written
+        self.watcher.reset(journal_offset)
+        corrupt_before = self.journal.corrupt_records
+        self.watcher.poll(self.accounts, self.transaction_history)
+        if self.journal.corrupt_records > corrupt_before:
+            print(f"⚠️ Skipped {self.journal.corrupt_records - corrupt_before} corrupt journal record(s)")
+        history = self.transaction_history
+        if self.rollups is None or not (history.archived_rows <= self.rollups.through
+                                        <= history.archived_rows + len(history)):
+            # Snapshot without (usable) rollups: recompute them and store them at the next checkpoint
+            self.rebuild_rollups()
+            self.dirty = bool(history) or history.archived_rows > 0
         else:
-            self.create_default_accounts()
+            self.rollups.catch_up(history)
+        self.customers.rebuild(self.accounts)
+        self.owner_index.rebuild(self.accounts)
+        self.account_order.rebuild(self.accounts)
+        self.notify_listeners(None)
     
     def create_default_accounts(self):
         """Create some default accounts for demo"""
@@ -68,30 +329,384 @@ class EnhancedBankingSystem:
             (901234, "Alice", "Johnson", 1200.0)
         ]
         
+        # Name-derived ids: every front end starting without a data file
+        # must build the very same demo book
         for acc_num, first, last, balance in accounts_data:
-            owner = BankAccountOwner(first, last)
+            owner = self.customers.intern(first, last)
             account = BankAccount(acc_num, owner, balance)
             self.accounts[acc_num] = account
     
-    def log_transaction(self, account_number, transaction_type, amount, success=True, error_msg=""):
-        """Log transaction for history"""
-        transaction = {
-            'timestamp': datetime.datetime.now().isoformat(),
+    def log_transaction(self, account_number, transaction_type, amount, success=True, error_msg="",
+                        transfer_id=None):
+        """Log transaction for history (added to the history when the operation commits)"""
+        transaction = stamp({
             'account_number': account_number,
             'type': transaction_type,
             'amount': amount,
             'success': success,
             'error': error_msg
+        })
+        if transfer_id:
+            transaction['transfer_id'] = transfer_id
+        self.pending_event['transactions'].append(transaction)
+        return transaction
+    
+    def log_batch(self, transaction_type, account_numbers, amounts):
+        """Log many successful rows of one type at once (stored as columns in the journal)"""
+        if account_numbers:
+            batch = stamp({'type': transaction_type,
+                           'account_number': list(account_numbers),
+                           'amount': list(amounts)})
+            self.pending_event.setdefault('batches', []).append(batch)
+    
+    def stage_job_progress(self, job_id, progress):
+        """Commit a batch job's progress together with the current operation"""
+        self.pending_event.setdefault('jobs', {})[job_id] = progress
+    
+    def stage_delta(self, account_number, delta):
+        """Record a balance change of the current operation for the journal"""
+        key = str(account_number)
+        deltas = self.pending_event['deltas']
+        deltas[key] = deltas.get(key, 0.0) + float(delta)
+    
+    def expect_version(self, account_number, version):
+        """Make the current operation conditional on an account version (None = must not exist)"""
+        self.pending_event['expect'][str(account_number)] = version
+    
+    def log_failure(self, account_number, transaction_type, amount, error):
+        """Commit a failed-operation row on its own (it never conflicts)"""
+        self.discard_changes()
+        self.log_transaction(account_number, transaction_type, amount, False, str(error))
+        self.persist()
+    
+    @staticmethod
+    def check_operation(account, operation, amount):
+        """Validate deposit/withdraw against a scratch copy without touching the account"""
+        scratch = BankAccount(account.account_number, account.account_owner, account.account_balance)
+        getattr(scratch, operation)(amount)
+    
+    # Core operations (no prompts, no printing) - shared by the menus and the CLI
+    def get_account(self, account_number):
+        """Return an account or raise ValueError if it does not exist"""
+        self.sync_changes()
+        account = self.accounts.get(account_number)
+        if account is None:
+            raise ValueError(f"Account {account_number} not found")
+        return account
+    
+    def next_account_number(self):
+        """Generate the next free account number"""
+        account_number = self.allocator.allocate()
+        # Books created before the allocator may hold numbers above its mark
+        while account_number in self.accounts:
+            account_number = self.allocator.allocate()
+        return account_number
+    
+    def open_account(self, first_name, last_name, initial_deposit=0.0, customer_id=None):
+        """Create an account and return it.
+        
+        Without customer_id the account gets a new customer; with it, the
+        account is added to that existing customer (the names may then be
+        left empty, otherwise they must match the customer's).
+        """
+        first_name = first_name.strip()
+        last_name = last_name.strip()
+        if not customer_id and (not first_name or not last_name):
+            raise ValueError("Both first and last name are required")
+        initial_deposit = float(initial_deposit)
+        check_finite(initial_deposit, "Initial deposit")
+        if initial_deposit < 0:
+            raise ValueError("Initial deposit cannot be negative")
+        new_id = customer_id or new_customer_id()
+        
+        def stage():
+            self.sync_changes()
+            owner = BankAccountOwner(first_name, last_name, new_id)
+            if customer_id:
+                owner = self.customers.get(customer_id)
+                if owner is None:
+                    raise ValueError(f"Customer {customer_id} not found")
+                if first_name and (first_name, last_name) != (owner.first_name, owner.last_name):
+                    raise ValueError(f"Customer {customer_id} is {owner.full_name}")
+            account_number = self.next_account_number()
+            account = BankAccount(account_number, owner, initial_deposit, version=1)
+            
+            self.expect_version(account_number, None)
+            self.pending_event['accounts'].append(account_record(account))
+            self.log_transaction(account_number, "ACCOUNT_CREATED", initial_deposit)
+            return lambda: self.accounts[account_number]
+        
+        return self.run_operation(stage)
+    
+    def update_owner(self, account_number, first_name, last_name):
+        """Rename the owner of an account and return the updated account"""
+        first_name = first_name.strip()
+        last_name = last_name.strip()
+        if not first_name or not last_name:
+            raise ValueError("Both first and last name are required")
+        
+        def stage():
+            account = self.get_account(account_number)
+            # Renaming the only account of a customer renames the customer;
+            # one of several accounts moves to a new customer instead
+            customer_id = account.account_owner.customer_id
+            if self.customers.accounts_of(customer_id) != [account_number]:
+                customer_id = new_customer_id()
+            owner = BankAccountOwner(first_name, last_name, customer_id)
+            updated_account = BankAccount(account_number, owner, account.account_balance, account.version)
+            self.expect_version(account_number, account.version)
+            self.pending_event['accounts'].append(account_record(updated_account))
+            return lambda: self.accounts[account_number]
+        
+        return self.run_operation(stage)
+    
+    def delete_account(self, account_number):
+        """Close an account and return the removed account"""
+        def stage():
+            account = self.get_account(account_number)
+            self.expect_version(account_number, account.version)
+            self.pending_event['deleted'].append(account_number)
+            self.log_transaction(account_number, "ACCOUNT_DELETED", account.account_balance)
+            return lambda: account
+        
+        return self.run_operation(stage)
+    
+    def deposit(self, account_number, amount):
+        """Deposit into an account and return it"""
+        # Checked before staging: a NaN would otherwise reach the journal in the failure row
+        check_finite(amount, "Deposit amount")
+        
+        def stage():
+            account = self.get_account(account_number)
+            try:
+                self.check_operation(account, 'deposit', amount)
+            except ValueError as e:
+                self.log_failure(account_number, "DEPOSIT_FAILED", amount, e)
+                raise
+            self.expect_version(account_number, account.version)
+            self.stage_delta(account_number, amount)
+            self.log_transaction(account_number, "DEPOSIT", amount)
+            return lambda: self.accounts[account_number]
+        
+        return self.run_operation(stage)
+    
+    def withdraw(self, account_number, amount):
+        """Withdraw from an account and return it"""
+        check_finite(amount, "Withdrawal amount")
+        
+        def stage():
+            account = self.get_account(account_number)
+            try:
+                self.check_operation(account, 'withdraw', amount)
+                self.limits.check_debit(account, amount, today())
+            except ValueError as e:
+                self.log_failure(account_number, "WITHDRAW_FAILED", amount, e)
+                raise
+            self.expect_version(account_number, account.version)
+            self.stage_delta(account_number, -amount)
+            self.log_transaction(account_number, "WITHDRAW", amount)
+            return lambda: self.accounts[account_number]
+        
+        return self.run_operation(stage)
+    
+    def transfer(self, from_acc, to_acc, amount, transfer_id=None):
+        """Move money between two accounts and return (source, destination)
+        
+        Both legs are logged under transfer_id (a new one if not given), see
+        get_transfer().
+        """
+        check_finite(amount, "Transfer amount")
+        # Chosen once, so a retried attempt does not get a second id
+        transfer_id = transfer_id or new_transfer_id()
+        
+        def stage():
+            source_account = self.get_account(from_acc)
+            dest_account = self.get_account(to_acc)
+            if from_acc == to_acc:
+                raise ValueError("Cannot transfer to the same account")
+            
+            try:
+                self.check_operation(source_account, 'withdraw', amount)
+                self.limits.check_debit(source_account, amount, today())
+            except ValueError as e:
+                if "Insufficient" in str(e) or "limit exceeded" in str(e):
+                    self.log_failure(from_acc, "TRANSFER_FAILED", amount, e)
+                raise
+            self.check_operation(dest_account, 'deposit', amount)
+            
+            self.expect_version(from_acc, source_account.version)
+            self.expect_version(to_acc, dest_account.version)
+            self.stage_delta(from_acc, -amount)
+            self.stage_delta(to_acc, amount)
+            self.log_transaction(from_acc, "TRANSFER_OUT", amount, transfer_id=transfer_id)
+            self.log_transaction(to_acc, "TRANSFER_IN", amount, transfer_id=transfer_id)
+            return lambda: (self.accounts[from_acc], self.accounts[to_acc])
+        
+        return self.run_operation(stage)
+    
+    def set_daily_limit(self, account_number, limit):
+        """Set an account's daily withdrawal limit (None = back to the default)"""
+        if limit is not None:
+            check_finite(limit, "Daily limit")
+        if limit is not None and limit < 0:
+            raise ValueError("Daily limit cannot be negative")
+        
+        def stage():
+            account = self.get_account(account_number)
+            # Bump the version so a withdrawal checked against the old limit retries
+            self.expect_version(account_number, account.version)
+            self.stage_delta(account_number, 0.0)
+            self.pending_event.setdefault('limits', {})[str(account_number)] = limit
+            return lambda: self.limits.limit_of(account_number)
+        
+        return self.run_operation(stage)
+    
+    def place_hold(self, account_number, amount):
+        """Reserve part of an account's balance; returns the hold id"""
+        check_finite(amount, "Hold amount")
+        hold_id = new_hold_id()
+        
+        def stage():
+            account = self.get_account(account_number)
+            self.limits.check_hold(account, amount)
+            # Likewise: a withdrawal staged without this hold retries
+            self.expect_version(account_number, account.version)
+            self.stage_delta(account_number, 0.0)
+            self.pending_event.setdefault('holds', {})[str(hold_id)] = [account_number, amount]
+            return lambda: hold_id
+        
+        return self.run_operation(stage)
+    
+    def release_hold(self, hold_id):
+        """Release a hold; returns (account number, amount)"""
+        def stage():
+            self.sync_changes()
+            hold = self.limits.holds.get(hold_id)
+            if hold is None:
+                raise ValueError(f"Hold {hold_id} not found")
+            self.pending_event.setdefault('released', []).append(hold_id)
+            return lambda: hold
+        
+        return self.run_operation(stage)
+    
+    def available_balance(self, account_number):
+        """Balance minus the amounts on hold"""
+        account = self.get_account(account_number)
+        return account.account_balance - self.limits.held_amount(account_number)
+    
+    def archive_history(self, max_age_days):
+        """Move transactions older than max_age_days to the archive and checkpoint.
+        
+        The rows are written to the archive first; dropping them is committed
+        to the journal, so every running front end drops them too.
+        Returns the number of rows moved out of the snapshot.
+        """
+        if max_age_days < 0:
+            raise ValueError("Archive age cannot be negative")
+        cutoff_day = today() - max_age_days
+        
+        def stage():
+            self.sync_changes()
+            history = self.transaction_history
+            moved = self.archive.archive(history, cutoff_day)
+            if moved:
+                self.pending_event['archived'] = {'rows': history.archived_rows + moved,
+                                                  'cutoff': cutoff_day}
+            return lambda: moved
+        
+        moved = self.run_operation(stage)
+        if moved:
+            self.save_data()
+        return moved
+    
+    def rebuild_rollups(self, full=False):
+        """Recompute the rollup tables from the archive and the live history
+        
+        full=True re-reads every archived row instead of the archive's
+        per-month tables.
+        """
+        if self.rollups is None:
+            self.rollups = Rollups()
+        self.rollups.rebuild(self.archive, self.transaction_history, full)
+        return self.rollups
+    
+    def get_transfer(self, transfer_id):
+        """Both legs of a transfer as one record, or raise ValueError if unknown"""
+        self.sync_changes()
+        record = self.transaction_history.transfer(transfer_id)
+        if record is None:
+            raise ValueError(f"Transfer {transfer_id} not found")
+        return record
+    
+    def total_balance(self):
+        """Sum of all account balances"""
+        return sum(account.account_balance for account in self.accounts.values())
+    
+    def matching_account_numbers(self, query, limit=50):
+        """Account numbers matching an owner-name prefix or an account number prefix"""
+        query = query.strip()
+        numbers = self.account_order.numbers_with_prefix(query, limit) if query.isdigit() else []
+        seen = set(numbers)
+        numbers += [n for n in self.owner_index.search(query, limit) if n not in seen]
+        return numbers if limit is None else numbers[:limit]
+    
+    def search_accounts(self, query, limit=50):
+        """Accounts matching an owner-name prefix or an account number prefix"""
+        self.sync_changes()
+        return [self.accounts[n] for n in self.matching_account_numbers(query, limit)]
+    
+    def browse_accounts(self, query="", sort_by="number", descending=False, offset=0, limit=50):
+        """One page of the (optionally filtered) book: returns (accounts, has_more).
+        
+        Only the requested window is materialized; without a filter the page
+        comes straight from the maintained sort orders.
+        """
+        self.sync_changes()
+        if not query.strip():
+            numbers = self.account_order.page(self.accounts, sort_by, descending, offset, limit + 1)
+        else:
+            sort_keys = {
+                'number': lambda n: n,
+                'name': lambda n: (sort_name(self.accounts[n]), n),
+                'balance': lambda n: (self.accounts[n].account_balance, n)
+            }
+            if sort_by not in sort_keys:
+                raise ValueError(f"Unknown sort order: {sort_by}")
+            matches = self.matching_account_numbers(query, None)
+            matches.sort(key=sort_keys[sort_by], reverse=descending)
+            numbers = matches[offset:offset + limit + 1]
+        return [self.accounts[n] for n in numbers[:limit]], len(numbers) > limit
+    
+    def find_owner_accounts(self, first_name, last_name):
+        """Accounts owned by exactly this person"""
+        self.sync_changes()
+        return [self.accounts[n] for n in self.owner_index.find(f"{first_name} {last_name}")]
+    
+    def customer_accounts(self, customer_id):
+        """All accounts of a customer"""
+        self.sync_changes()
+        return [self.accounts[n] for n in self.customers.accounts_of(customer_id)]
+    
+    def customer_summary(self, account_number):
+        """Owner of an account with all of their accounts and total holdings"""
+        owner = self.get_account(account_number).account_owner
+        accounts = self.customer_accounts(owner.customer_id)
+        return {
+            'customer_id': owner.customer_id,
+            'owner': owner.full_name,
+            'accounts': accounts,
+            'total_holdings': sum(account.account_balance for account in accounts)
         }
-        self.transaction_history.append(transaction)
+    
+    def recent_transactions(self, limit=10):
+        """Return the most recent transactions as plain dicts, oldest first"""
+        rows = self.transaction_history[-limit:] if limit else self.transaction_history
+        return [dict(transaction) for transaction in rows]
     
     def create_account(self):
         """Create a new bank account"""
         print("\n🏦 === CREATE NEW ACCOUNT ===")
         
-        # Generate new account number
-        account_number = max(self.accounts.keys()) + 1 if self.accounts else 100000
-        
         first_name = input("Enter first name: ").strip()
         last_name = input("Enter last name: ").strip()
         
@@ -104,26 +719,21 @@ class EnhancedBankingSystem:
             print("❌ Invalid amount")
             return
         
-        owner = BankAccountOwner(first_name, last_name)
-        account = BankAccount(account_number, owner, initial_deposit)
-        self.accounts[account_number] = account
-        
-        self.log_transaction(account_number, "ACCOUNT_CREATED", initial_deposit)
-        self.save_data()
+        try:
+            account = self.open_account(first_name, last_name, initial_deposit)
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+            return
         
         print(f"✅ Account created successfully!")
-        print(f"📋 Account Number: {account_number}")
-        print(f"👤 Owner: {owner.full_name}")
+        print(f"📋 Account Number: {account.account_number}")
+        print(f"👤 Owner: {account.account_owner.full_name}")
         print(f"💰 Initial Balance: ${initial_deposit:.2f}")
     
     def transfer_money(self):
         """Transfer money between accounts"""
         print("\n💸 === TRANSFER MONEY ===")
         
-        # Initialize variables to avoid unbound errors
-        from_acc = None
-        amount = None
-        
         try:
             from_acc = int(input("From Account Number: "))
             to_acc = int(input("To Account Number: "))
@@ -142,15 +752,7 @@ class EnhancedBankingSystem:
                 return
             
             # Perform transfer
-            source_account = self.accounts[from_acc]
-            dest_account = self.accounts[to_acc]
-            
-            source_account.withdraw(amount)
-            dest_account.deposit(amount)
-            
-            self.log_transaction(from_acc, "TRANSFER_OUT", amount)
-            self.log_transaction(to_acc, "TRANSFER_IN", amount)
-            self.save_data()
+            source_account, dest_account = self.transfer(from_acc, to_acc, amount)
             
             print(f"✅ Transfer successful!")
             print(f"💰 ${amount:.2f} transferred from {from_acc} to {to_acc}")
@@ -160,8 +762,6 @@ class EnhancedBankingSystem:
         except ValueError as e:
             if "Insufficient balance" in str(e):
                 print("❌ Insufficient balance for transfer")
-                if from_acc is not None and amount is not None:
-                    self.log_transaction(from_acc, "TRANSFER_FAILED", amount, False, str(e))
             else:
                 print(f"❌ Error: {e}")
         except Exception as e:
@@ -175,16 +775,14 @@ class EnhancedBankingSystem:
             print("No accounts found.")
             return
         
-        total_balance = 0
         print(f"{'Account':<10} {'Owner':<20} {'Balance':<15}")
         print("-" * 50)
         
         for account in self.accounts.values():
             print(f"{account.account_number:<10} {account.account_owner.full_name:<20} ${account.account_balance:<14.2f}")
-            total_balance += account.account_balance
         
         print("-" * 50)
-        print(f"{'TOTAL':<30} ${total_balance:.2f}")
+        print(f"{'TOTAL':<30} ${self.total_balance():.2f}")
         print(f"📈 Total Accounts: {len(self.accounts)}")
     
     def transaction_history_report(self):
@@ -196,13 +794,13 @@ class EnhancedBankingSystem:
             return
         
         # Show last 10 transactions
-        recent_transactions = self.transaction_history[-10:]
+        recent_transactions = self.recent_transactions(10)
         
         print(f"{'Time':<20} {'Account':<10} {'Type':<15} {'Amount':<12} {'Status':<10}")
         print("-" * 75)
         
         for trans in recent_transactions:
-            timestamp = trans['timestamp'][:19].replace('T', ' ')
+            timestamp = format_ts(trans['ts'])
             status = "✅ Success" if trans['success'] else "❌ Failed"
             amount_str = f"${trans['amount']:.2f}" if trans['amount'] else "N/A"
             
@@ -215,13 +813,14 @@ class EnhancedBankingSystem:
         try:
             acc_num = int(input("Enter Account Number: "))
             
-            if acc_num not in self.accounts:
-                print("❌ Account not found")
-                return
-            
-            account = self.accounts[acc_num]
-            
             while True:
+                # Looked up on every pass: a rename or a reload (here or in
+                # another front end) replaces the account object
+                self.sync_changes()
+                account = self.accounts.get(acc_num)
+                if account is None:
+                    print("❌ Account not found")
+                    return
                 print(f"\n👤 Account: {acc_num} - {account.account_owner.full_name}")
                 print(f"💰 Current Balance: ${account.account_balance:.2f}")
                 print("\n1. 💵 Deposit")
@@ -232,34 +831,26 @@ class EnhancedBankingSystem:
                 choice = input("\nChoose operation (1-4): ").strip()
                 
                 if choice == '1':
-                    amount = None  # Initialize variable
                     try:
                         amount = float(input("Deposit amount: $"))
-                        account.deposit(amount)
-                        self.log_transaction(acc_num, "DEPOSIT", amount)
-                        self.save_data()
+                        account = self.deposit(acc_num, amount)
                         print(f"✅ Deposited ${amount:.2f}")
                         print(f"💰 New Balance: ${account.account_balance:.2f}")
                     except ValueError as e:
                         print(f"❌ Error: {e}")
-                        if amount is not None:
-                            self.log_transaction(acc_num, "DEPOSIT_FAILED", amount, False, str(e))
                 
                 elif choice == '2':
-                    amount = None  # Initialize variable
                     try:
                         amount = float(input("Withdrawal amount: $"))
-                        account.withdraw(amount)
-                        self.log_transaction(acc_num, "WITHDRAW", amount)
-                        self.save_data()
+                        account = self.withdraw(acc_num, amount)
                         print(f"✅ Withdrew ${amount:.2f}")
                         print(f"💰 New Balance: ${account.account_balance:.2f}")
                     except ValueError as e:
                         print(f"❌ Error: {e}")
-                        if amount is not None:
-                            self.log_transaction(acc_num, "WITHDRAW_FAILED", amount, False, str(e))
                 
                 elif choice == '3':
+                    self.sync_changes()
+                    account = self.accounts.get(acc_num, account)
                     print(f"\n📋 === ACCOUNT DETAILS ===")
                     print(f"Account Number: {account.account_number}")
                     print(f"Owner: {account.account_owner.full_name}")
@@ -277,6 +868,7 @@ class EnhancedBankingSystem:
     def main_menu(self):
         """Main application menu"""
         while True:
+            self.sync_changes()
             print("\n" + "="*50)
             print("🏦 ENHANCED BANKING SYSTEM 🏦")
             print("="*50)
@@ -2,10 +2,13 @@
 
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
-import json
-import os
 import datetime
-from Model import BankAccount, BankAccountOwner, TransactionType
+from Model import TransactionType
+from Enhanced_BankingApp import EnhancedBankingSystem
+from banking_views import KeyedListModel, AccountPager, RefreshScheduler, BackgroundTasks
+from banking_stats import compute_statistics
+from banking_records import format_ts
+from banking_widgets import AccountPicker
 
 class EnhancedProfessionalBankingGUI:
     def __init__(self, root):
@@ -14,11 +17,14 @@ class EnhancedProfessionalBankingGUI:
         self.root.geometry("1400x900")
         self.root.configure(bg='#2c3e50')
         
-        # Data storage
+        # Data storage (shared engine keeps us in sync with other front ends)
         self.data_file = "banking_data.json"
-        self.accounts = {}
-        self.transaction_history = []
+        self.sync_interval = 1000  # ms between change-journal polls
+        self.sync_error = None  # last sync failure shown to the user
+        self.bank = None
         self.selected_account = None
+        # Account numbers changed since the list was last refreshed (None = all)
+        self.account_changes = None
         
         # Load existing data
         self.load_data()
@@ -26,12 +32,37 @@ class EnhancedProfessionalBankingGUI:
         # Configure modern styles
         self.setup_modern_styles()
         
+        # Panels are redrawn through the scheduler: changes are coalesced into
+        # one refresh per frame and panels whose inputs did not change are skipped
+        self.refresher = RefreshScheduler(self.root)
+        # Statistics are computed in a worker thread and published back via root.after
+        self.background = BackgroundTasks(self.root)
+        
         # Create main interface
         self.create_modern_interface()
         
+        self.refresher.register('accounts', self.refresh_account_list)
+        self.refresher.register('details', self.refresh_account_details,
+                                lambda: self.selected_account_signature())
+        self.refresher.register('statistics', self.refresh_statistics,
+                                lambda: (self.bank.revision, len(self.transaction_history)))
+        self.refresher.register('history', self.refresh_transaction_history,
+                                lambda: len(self.transaction_history))
+        
         # Load initial data
         self.refresh_all_displays()
         
+        # Watch for changes made by other running front ends
+        self.root.after(self.sync_interval, self.poll_external_changes)
+    
+    @property
+    def accounts(self):
+        return self.bank.accounts
+    
+    @property
+    def transaction_history(self):
+        return self.bank.transaction_history
+        
     def setup_modern_styles(self):
         """Setup ultra-modern styles for professional look"""
         style = ttk.Style()
@@ -186,6 +217,15 @@ class EnhancedProfessionalBankingGUI:
                                   bg='white', fg=self.colors['text'])
         list_frame.pack(fill='both', expand=True, pady=(0, 15))
         
+        # Search-as-you-type filter (owner name prefix or account number)
+        search_frame = tk.Frame(list_frame, bg='white')
+        search_frame.pack(fill='x', padx=10, pady=(10, 0))
+        tk.Label(search_frame, text="🔍", font=('Segoe UI', 10), bg='white').pack(side='left')
+        self.search_var = tk.StringVar()
+        tk.Entry(search_frame, textvariable=self.search_var, font=('Segoe UI', 10),
+                relief='solid', bd=1).pack(side='left', fill='x', expand=True, padx=(5, 0))
+        self.search_var.trace_add('write', lambda *args: self.refresher.mark('accounts'))
+        
         # Account Listbox with modern styling
         self.account_listbox = tk.Listbox(list_frame, 
                                          font=('Segoe UI', 10),
@@ -197,6 +237,30 @@ class EnhancedProfessionalBankingGUI:
                                          highlightcolor=self.colors['primary'])
         self.account_listbox.pack(fill='both', expand=True, padx=10, pady=10)
         self.account_listbox.bind('<<ListboxSelect>>', self.on_account_select)
+        self.account_list_model = KeyedListModel(
+            lambda acc: f"{acc.account_number} - {acc.account_owner.full_name} (${acc.account_balance:.2f})",
+            self.account_listbox)
+        # Only one page of the book is ever loaded into the listbox
+        self.account_pager = AccountPager(self.bank, self.account_list_model)
+        
+        # Sorting and paging controls
+        page_frame = tk.Frame(list_frame, bg='white')
+        page_frame.pack(fill='x', padx=10, pady=(0, 10))
+        self.sort_var = tk.StringVar(value="Number")
+        sort_combo = ttk.Combobox(page_frame, textvariable=self.sort_var, width=8, state="readonly",
+                                  values=list(AccountPager.SORT_LABELS), font=('Segoe UI', 9))
+        sort_combo.pack(side='left')
+        sort_combo.bind('<<ComboboxSelected>>', lambda event: self.change_account_sort())
+        self.sort_descending_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(page_frame, text="⇅", variable=self.sort_descending_var, bg='white',
+                       command=self.change_account_sort).pack(side='left', padx=2)
+        tk.Button(page_frame, text="▶", font=('Segoe UI', 9), relief='flat', cursor='hand2',
+                  command=lambda: self.turn_account_page(1)).pack(side='right')
+        tk.Button(page_frame, text="◀", font=('Segoe UI', 9), relief='flat', cursor='hand2',
+                  command=lambda: self.turn_account_page(-1)).pack(side='right')
+        self.page_label_var = tk.StringVar()
+        tk.Label(page_frame, textvariable=self.page_label_var, font=('Segoe UI', 9),
+                 bg='white', fg=self.colors['text']).pack(side='right', padx=5)
         
         # Create Account Section
         create_frame = tk.LabelFrame(content, text="➕ Create New Account",
@@ -319,19 +383,20 @@ class EnhancedProfessionalBankingGUI:
         tk.Label(transfer_content, text="From Account:", 
                 font=('Segoe UI', 9), bg='white', fg=self.colors['text']).grid(row=0, column=0, sticky='w', pady=5)
         self.from_account_var = tk.StringVar()
-        from_combo = ttk.Combobox(transfer_content, textvariable=self.from_account_var,
-                                 font=('Segoe UI', 9), width=25, state="readonly")
-        from_combo.grid(row=0, column=1, pady=5, padx=(10, 0), sticky='w')
-        self.from_account_combo = from_combo
+        # Autocomplete pickers: suggestions come from the search index as you type
+        from_picker = AccountPicker(transfer_content, self.bank, textvariable=self.from_account_var,
+                                    font=('Segoe UI', 9), width=25)
+        from_picker.grid(row=0, column=1, pady=5, padx=(10, 0), sticky='w')
+        self.from_account_picker = from_picker
         
         # To Account
         tk.Label(transfer_content, text="To Account:", 
                 font=('Segoe UI', 9), bg='white', fg=self.colors['text']).grid(row=1, column=0, sticky='w', pady=5)
         self.to_account_var = tk.StringVar()
-        to_combo = ttk.Combobox(transfer_content, textvariable=self.to_account_var,
-                               font=('Segoe UI', 9), width=25, state="readonly")
-        to_combo.grid(row=1, column=1, pady=5, padx=(10, 0), sticky='w')
-        self.to_account_combo = to_combo
+        to_picker = AccountPicker(transfer_content, self.bank, textvariable=self.to_account_var,
+                                  font=('Segoe UI', 9), width=25)
+        to_picker.grid(row=1, column=1, pady=5, padx=(10, 0), sticky='w')
+        self.to_account_picker = to_picker
         
         # Transfer Amount
         tk.Label(transfer_content, text="Amount ($):", 
@@ -464,82 +529,43 @@ class EnhancedProfessionalBankingGUI:
     # Data Management Methods
     def load_data(self):
         """Load banking data from JSON file"""
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r') as f:
-                    data = json.load(f)
-                
-                # Restore accounts
-                for acc_data in data.get('accounts', {}).values():
-                    owner = BankAccountOwner(
-                        acc_data['owner_first_name'], 
-                        acc_data['owner_last_name']
-                    )
-                    account = BankAccount(
-                        acc_data['account_number'], 
-                        owner, 
-                        acc_data['balance']
-                    )
-                    self.accounts[acc_data['account_number']] = account
-                
-                # Restore transaction history
-                self.transaction_history = data.get('transaction_history', [])
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Error loading data: {e}")
-                self.create_default_accounts()
+        self.bank = EnhancedBankingSystem(self.data_file)
+        self.bank.add_change_listener(self.note_account_changes)
+    
+    def note_account_changes(self, changed):
+        """Engine callback: remember which accounts the list has to redraw"""
+        if changed is None or self.account_changes is None:
+            self.account_changes = None
         else:
-            self.create_default_accounts()
+            self.account_changes |= changed
     
     def save_data(self):
         """Save banking data to JSON file"""
         try:
-            data = {
-                'accounts': {},
-                'transaction_history': self.transaction_history
-            }
-            
-            for acc_num, account in self.accounts.items():
-                data['accounts'][acc_num] = {
-                    'account_number': account.account_number,
-                    'owner_first_name': account.account_owner.first_name,
-                    'owner_last_name': account.account_owner.last_name,
-                    'balance': account.account_balance
-                }
-            
-            with open(self.data_file, 'w') as f:
-                json.dump(data, f, indent=2)
-                
+            self.bank.save_data()
         except Exception as e:
             messagebox.showerror("Error", f"Error saving data: {e}")
     
-    def create_default_accounts(self):
-        """Create some default accounts for demo"""
-        accounts_data = [
-            (123456, "Filan", "Fisteku", 500.0),
-            (789012, "John", "Doe", 1000.0),
-            (345678, "Jane", "Smith", 750.0),
-            (901234, "Alice", "Johnson", 1250.0),
-            (567890, "Bob", "Wilson", 850.0)
-        ]
-        
-        for acc_num, first, last, balance in accounts_data:
-            owner = BankAccountOwner(first, last)
-            account = BankAccount(acc_num, owner, balance)
-            self.accounts[acc_num] = account
-    
-    def log_transaction(self, account_number, transaction_type, amount, success=True, error_msg=""):
-        """Log transaction for history"""
-        transaction = {
-            'timestamp': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'account_number': account_number,
-            'type': transaction_type,
-            'amount': amount,
-            'success': success,
-            'error': error_msg
-        }
-        self.transaction_history.append(transaction)
-        self.save_data()
+    def poll_external_changes(self):
+        """Merge operations committed by other front ends and refresh if needed"""
+        try:
+            changed = self.bank.sync_changes()
+        except OSError:
+            # Journal briefly unreadable (e.g. on a network share): try again next poll
+            changed = set()
+        except Exception as e:
+            # Anything else is a real problem: report it, but only once while it persists
+            changed = set()
+            if str(e) != self.sync_error:
+                self.sync_error = str(e)
+                messagebox.showerror("Sync Error", f"Could not merge changes from other windows:\n{e}")
+        else:
+            self.sync_error = None
+        if changed:
+            if self.selected_account not in self.accounts:
+                self.selected_account = None
+            self.refresh_all_displays()
+        self.root.after(self.sync_interval, self.poll_external_changes)
     
     # CRUD Operations
     def create_account(self):
@@ -562,16 +588,9 @@ class EnhancedProfessionalBankingGUI:
                 messagebox.showerror("Error", "Please enter a valid balance amount")
                 return
             
-            # Generate new account number
-            account_number = max(self.accounts.keys()) + 1 if self.accounts else 100000
-            
-            # Create account
-            owner = BankAccountOwner(first_name, last_name)
-            account = BankAccount(account_number, owner, balance)
-            self.accounts[account_number] = account
-            
-            # Log and save
-            self.log_transaction(account_number, "ACCOUNT_CREATED", balance)
+            # Create, log and save
+            account = self.bank.open_account(first_name, last_name, balance)
+            account_number = account.account_number
             
             # Clear form
             self.first_name_var.set("")
@@ -597,11 +616,8 @@ class EnhancedProfessionalBankingGUI:
         if messagebox.askyesno("Confirm Delete", 
                               f"Are you sure you want to delete account {self.selected_account}?\n\nOwner: {account.account_owner.full_name}\nBalance: ${account.account_balance:.2f}\n\nThis action cannot be undone!"):
             
-            # Log transaction
-            self.log_transaction(self.selected_account, "ACCOUNT_DELETED", account.account_balance)
-            
-            # Delete account
-            del self.accounts[self.selected_account]
+            # Delete and log
+            self.bank.delete_account(self.selected_account)
             self.selected_account = None
             
             # Refresh displays
@@ -619,20 +635,19 @@ class EnhancedProfessionalBankingGUI:
         if amount_str:
             try:
                 amount = float(amount_str)
-                if amount <= 0:
-                    messagebox.showerror("Error", "Amount must be positive")
-                    return
-                
-                account = self.accounts[self.selected_account]
-                account.deposit(amount)
-                
-                self.log_transaction(self.selected_account, "DEPOSIT", amount)
+            except ValueError:
+                messagebox.showerror("Error", "Please enter a valid amount")
+                return
+            if amount <= 0:
+                messagebox.showerror("Error", "Amount must be positive")
+                return
+            
+            try:
+                account = self.bank.deposit(self.selected_account, amount)
                 self.refresh_all_displays()
                 
                 messagebox.showinfo("Success", f"✅ ${amount:.2f} deposited successfully!\n\nNew Balance: ${account.account_balance:.2f}")
                 
-            except ValueError:
-                messagebox.showerror("Error", "Please enter a valid amount")
             except Exception as e:
                 messagebox.showerror("Error", str(e))
     
@@ -644,28 +659,23 @@ class EnhancedProfessionalBankingGUI:
         
         amount_str = simpledialog.askstring("Withdraw", "Enter withdrawal amount:")
         if amount_str:
-            amount = None
             try:
                 amount = float(amount_str)
-                if amount <= 0:
-                    messagebox.showerror("Error", "Amount must be positive")
-                    return
-                
-                account = self.accounts[self.selected_account]
-                account.withdraw(amount)
-                
-                self.log_transaction(self.selected_account, "WITHDRAWAL", amount)
+            except ValueError:
+                messagebox.showerror("Error", "Please enter a valid amount")
+                return
+            if amount <= 0:
+                messagebox.showerror("Error", "Amount must be positive")
+                return
+            
+            try:
+                account = self.bank.withdraw(self.selected_account, amount)
                 self.refresh_all_displays()
                 
                 messagebox.showinfo("Success", f"✅ ${amount:.2f} withdrawn successfully!\n\nNew Balance: ${account.account_balance:.2f}")
                 
-            except ValueError as ve:
-                if "Insufficient balance" in str(ve) and amount is not None:
-                    messagebox.showerror("Error", "Insufficient balance for this withdrawal")
-                    self.log_transaction(self.selected_account, "WITHDRAWAL_FAILED", amount, False, str(ve))
-                else:
-                    messagebox.showerror("Error", "Please enter a valid amount")
             except Exception as e:
+                # Insufficient balance, daily limit, held funds, ...
                 messagebox.showerror("Error", str(e))
     
     def transfer_money(self):
@@ -698,15 +708,8 @@ class EnhancedProfessionalBankingGUI:
                 messagebox.showerror("Error", "Please enter a valid amount")
                 return
             
-            # Perform transfer
-            source_account = self.accounts[from_acc]
-            dest_account = self.accounts[to_acc]
-            
-            source_account.withdraw(amount)
-            dest_account.deposit(amount)
-            
-            self.log_transaction(from_acc, "TRANSFER_OUT", amount)
-            self.log_transaction(to_acc, "TRANSFER_IN", amount)
+            # Perform and log transfer
+            source_account, dest_account = self.bank.transfer(from_acc, to_acc, amount)
             
             # Clear form
             self.transfer_amount_var.set("")
@@ -719,7 +722,6 @@ class EnhancedProfessionalBankingGUI:
         except ValueError as ve:
             if "Insufficient balance" in str(ve) and from_acc is not None and amount is not None:
                 messagebox.showerror("Error", "Insufficient balance for transfer")
-                self.log_transaction(from_acc, "TRANSFER_FAILED", amount, False, str(ve))
             else:
                 messagebox.showerror("Error", f"Error: {ve}")
         except Exception as e:
@@ -727,29 +729,35 @@ class EnhancedProfessionalBankingGUI:
     
     # UI Update Methods
     def refresh_all_displays(self):
-        """Refresh all display elements"""
-        self.refresh_account_list()
-        self.refresh_account_combos()
-        self.refresh_account_details()
-        self.refresh_statistics()
-        self.refresh_transaction_history()
+        """Schedule a refresh of all display elements (coalesced, runs once per frame)"""
+        self.refresher.mark()
+    
+    def selected_account_signature(self):
+        """What the details panel shows: selected account and its version"""
+        account = self.accounts.get(self.selected_account)
+        return (self.selected_account, account.version if account else None)
     
     def refresh_account_list(self):
-        """Refresh the account listbox"""
-        self.account_listbox.delete(0, tk.END)
-        for account in self.accounts.values():
-            display_text = f"{account.account_number} - {account.account_owner.full_name} (${account.account_balance:.2f})"
-            self.account_listbox.insert(tk.END, display_text)
+        """Refresh the visible page of the account listbox - only changed rows are redrawn"""
+        changes, self.account_changes = self.account_changes, set()
+        if self.account_pager.set_query(self.search_var.get()):
+            changes = None
+        self.account_pager.apply_changes(changes)
+        self.page_label_var.set(self.account_pager.describe())
     
-    def refresh_account_combos(self):
-        """Refresh account combo boxes for transfers"""
-        account_list = []
-        for account in self.accounts.values():
-            display_text = f"{account.account_number} - {account.account_owner.full_name}"
-            account_list.append(display_text)
-        
-        self.from_account_combo['values'] = account_list
-        self.to_account_combo['values'] = account_list
+    def change_account_sort(self):
+        """Re-sort the account list (sort happens in the engine, page by page)"""
+        self.account_pager.set_sort(AccountPager.SORT_LABELS[self.sort_var.get()],
+                                    self.sort_descending_var.get())
+        self.page_label_var.set(self.account_pager.describe())
+    
+    def turn_account_page(self, step):
+        """Show the next (step=1) or previous (step=-1) page of accounts"""
+        if step > 0:
+            self.account_pager.next_page()
+        else:
+            self.account_pager.previous_page()
+        self.page_label_var.set(self.account_pager.describe())
     
     def refresh_account_details(self):
         """Refresh account details display"""
@@ -786,37 +794,34 @@ class EnhancedProfessionalBankingGUI:
         self.details_text.config(state=tk.DISABLED)
     
     def refresh_statistics(self):
-        """Refresh statistics display"""
+        """Recompute statistics in the background (a newer request supersedes an older one)"""
+        self.background.submit('statistics', compute_statistics, self.show_statistics,
+                               list(self.accounts.values()),
+                               *self.transaction_history.copy_columns('success', 'day'))
+    
+    def show_statistics(self, stats):
+        """Render computed statistics (runs on the Tk thread)"""
         self.stats_text.config(state=tk.NORMAL)
         self.stats_text.delete(1.0, tk.END)
         
-        if self.accounts:
-            total_balance = sum(acc.account_balance for acc in self.accounts.values())
-            avg_balance = total_balance / len(self.accounts)
-            max_balance = max(acc.account_balance for acc in self.accounts.values())
-            min_balance = min(acc.account_balance for acc in self.accounts.values())
-            
-            # Recent transactions count
-            today = datetime.datetime.now().date()
-            today_transactions = sum(1 for t in self.transaction_history 
-                                   if datetime.datetime.fromisoformat(t['timestamp'].replace('Z', '')).date() == today)
-            
-            stats = f"""📈 BANKING STATISTICS
+        if stats['total_accounts']:
+            avg_balance = stats['average_balance']
+            stats_text = f"""📈 BANKING STATISTICS
 {'='*30}
 
-👥 Total Accounts: {len(self.accounts)}
-💰 Total Balance: ${total_balance:.2f}
+👥 Total Accounts: {stats['total_accounts']}
+💰 Total Balance: ${stats['total_balance']:.2f}
 📊 Average Balance: ${avg_balance:.2f}
-🔺 Highest Balance: ${max_balance:.2f}
-🔻 Lowest Balance: ${min_balance:.2f}
+🔺 Highest Balance: ${stats['max_balance']:.2f}
+🔻 Lowest Balance: ${stats['min_balance']:.2f}
 
-📜 Total Transactions: {len(self.transaction_history)}
-📅 Today's Transactions: {today_transactions}
+📜 Total Transactions: {stats['total_transactions']}
+📅 Today's Transactions: {stats['today_transactions']}
 
 🏆 Bank Performance: {'🟢 Excellent' if avg_balance > 500 else '🟡 Good' if avg_balance > 200 else '🔴 Needs Attention'}
-💎 Premium Customers: {sum(1 for acc in self.accounts.values() if acc.account_balance > 1000)}"""
+💎 Premium Customers: {stats['premium_accounts']}"""
         else:
-            stats = """📈 BANKING STATISTICS
+            stats_text = """📈 BANKING STATISTICS
 {'='*30}
 
 📊 No accounts available yet.
@@ -827,7 +832,7 @@ class EnhancedProfessionalBankingGUI:
    • Transaction metrics
    • Performance indicators"""
         
-        self.stats_text.insert(1.0, stats)
+        self.stats_text.insert(1.0, stats_text)
         self.stats_text.config(state=tk.DISABLED)
     
     def refresh_transaction_history(self):
@@ -840,7 +845,7 @@ class EnhancedProfessionalBankingGUI:
         recent_transactions = self.transaction_history[-20:] if len(self.transaction_history) > 20 else self.transaction_history
         
         for transaction in reversed(recent_transactions):
-            time_str = transaction['timestamp'][:16]  # Show only date and time
+            time_str = format_ts(transaction['ts'], seconds=False)
             account_num = transaction['account_number']
             trans_type = transaction['type']
             amount = f"${transaction['amount']:.2f}"
@@ -855,12 +860,13 @@ class EnhancedProfessionalBankingGUI:
             index = selection[0]
             account_text = self.account_listbox.get(index)
             self.selected_account = int(account_text.split(' - ')[0])
-            self.refresh_account_details()
+            self.refresher.mark('details')
 
 def main():
     """Main function to run the Enhanced Professional Banking GUI"""
     root = tk.Tk()
     app = EnhancedProfessionalBankingGUI(root)
+    root.protocol("WM_DELETE_WINDOW", lambda: (app.background.shutdown(), root.destroy()))
     root.mainloop()
 
 if __name__ == "__main__":
@@ -1,15 +1,23 @@
 # Model.py
 
+import math
 from enum import Enum
 
 class TransactionType(Enum):
     DEPOSIT = "Deposit"
     WITHDRAW = "Withdraw"
 
+def check_finite(amount, what="Amount"):
+    """Raise ValueError for NaN or infinite amounts (they pass every < / > check)"""
+    if not math.isfinite(amount):
+        raise ValueError(f"{what} must be a finite number")
+
 class BankAccountOwner:
-    def __init__(self, first_name, last_name):
+    def __init__(self, first_name, last_name, customer_id=None):
         self.__first_name = first_name
         self.__last_name = last_name
+        # Shared by all accounts of the same customer (see banking_customers)
+        self.__customer_id = customer_id
     
     @property
     def first_name(self):
@@ -19,6 +27,10 @@ class BankAccountOwner:
     def last_name(self):
         return self.__last_name
     
+    @property
+    def customer_id(self):
+        return self.__customer_id
+    
     @property
     def full_name(self):
         return f"{self.__first_name} {self.__last_name}"
@@ -27,10 +39,12 @@ class BankAccountOwner:
         return self.full_name
 
 class BankAccount:
-    def __init__(self, account_number, account_owner, account_balance=0.0):
+    def __init__(self, account_number, account_owner, account_balance=0.0, version=0):
         self.__account_number = account_number
         self.__account_owner = account_owner
         self.__account_balance = float(account_balance)
+        # Bumped on every balance change; used for optimistic concurrency control
+        self.__version = int(version)
     
     @property
     def account_number(self):
@@ -44,21 +58,34 @@ class BankAccount:
     def account_balance(self):
         return self.__account_balance
     
+    @property
+    def version(self):
+        return self.__version
+    
     def deposit(self, amount):
         """Deposit money into the account"""
+        check_finite(amount, "Deposit amount")
         if amount <= 0:
             raise ValueError("Deposit amount must be positive")
         self.__account_balance += float(amount)
+        self.__version += 1
         return True
     
     def withdraw(self, amount):
         """Withdraw money from the account"""
+        check_finite(amount, "Withdrawal amount")
         if amount <= 0:
             raise ValueError("Withdrawal amount must be positive")
         if amount > self.__account_balance:
             raise ValueError("Insufficient balance")
         self.__account_balance -= float(amount)
+        self.__version += 1
         return True
     
+    def apply_delta(self, delta):
+        """Apply a balance change that was already validated and committed to the journal"""
+        self.__account_balance += float(delta)
+        self.__version += 1
+    
     def __str__(self):
         return f"Account: {self.__account_number}, Owner: {self.__account_owner}, Balance: ${self.__account_balance:.2f}"
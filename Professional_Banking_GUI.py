@@ -2,10 +2,13 @@
 
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
-import json
-import os
 import datetime
-from Model import BankAccount, BankAccountOwner, TransactionType
+from Model import TransactionType
+from Enhanced_BankingApp import EnhancedBankingSystem
+from banking_views import KeyedListModel, AccountPager, RefreshScheduler, BackgroundTasks
+from banking_stats import compute_statistics
+from banking_records import format_ts
+from banking_widgets import AccountPicker
 
 class ProfessionalBankingGUI:
     def __init__(self, root):
@@ -14,10 +17,13 @@ class ProfessionalBankingGUI:
         self.root.geometry("1200x800")
         self.root.configure(bg='#f0f0f0')
         
-        # Data storage
+        # Data storage (shared engine keeps us in sync with other front ends)
         self.data_file = "banking_data.json"
-        self.accounts = {}
-        self.transaction_history = []
+        self.sync_interval = 1000  # ms between change-journal polls
+        self.sync_error = None  # last sync failure shown to the user
+        self.bank = None
+        # Account numbers changed since the list was last refreshed (None = all)
+        self.account_changes = None
         
         # Load existing data
         self.load_data()
@@ -25,11 +31,36 @@ class ProfessionalBankingGUI:
         # Configure styles
         self.setup_styles()
         
+        # Panels are redrawn through the scheduler: changes are coalesced into
+        # one refresh per frame and nothing runs while the book is unchanged
+        self.refresher = RefreshScheduler(self.root)
+        # Statistics are computed in a worker thread and published back via root.after
+        self.background = BackgroundTasks(self.root)
+        
         # Create main interface
         self.create_interface()
         
+        self.refresher.register('accounts', self.refresh_account_list)
+        self.refresher.register('details', self.refresh_selected_account,
+                                lambda: self.selected_account_signature())
+        self.refresher.register('statistics', self.refresh_statistics,
+                                lambda: (self.bank.revision, len(self.transaction_history)))
+        self.refresher.register('history', self.refresh_transaction_history,
+                                lambda: len(self.transaction_history))
+        
         # Load initial data
-        self.refresh_account_list()
+        self.refresher.mark()
+        
+        # Watch for changes made by other running front ends
+        self.root.after(self.sync_interval, self.poll_external_changes)
+    
+    @property
+    def accounts(self):
+        return self.bank.accounts
+    
+    @property
+    def transaction_history(self):
+        return self.bank.transaction_history
         
     def setup_styles(self):
         """Setup custom styles for professional look"""
@@ -141,12 +172,43 @@ class ProfessionalBankingGUI:
         list_frame = ttk.Frame(account_frame)
         list_frame.grid(row=7, column=0, columnspan=2, sticky="nsew")
         
+        # Search-as-you-type filter (owner name prefix or account number)
+        search_frame = ttk.Frame(list_frame)
+        search_frame.grid(row=0, column=0, columnspan=2, sticky="we", pady=(0, 5))
+        ttk.Label(search_frame, text="🔍 Search:").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        ttk.Entry(search_frame, textvariable=self.search_var, width=25).pack(side=tk.LEFT, padx=(5, 0))
+        self.search_var.trace_add('write', lambda *args: self.refresher.mark('accounts'))
+        
         self.account_listbox = tk.Listbox(list_frame, height=8, width=35)
         scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.account_listbox.yview)
         self.account_listbox.configure(yscrollcommand=scrollbar.set)
-        
-        self.account_listbox.grid(row=0, column=0, sticky="nsew")
-        scrollbar.grid(row=0, column=1, sticky="ns")
+        self.account_list_model = KeyedListModel(
+            lambda acc: f"{acc.account_number} - {acc.account_owner.full_name} (${acc.account_balance:.2f})",
+            self.account_listbox)
+        # Only one page of the book is ever loaded into the listbox
+        self.account_pager = AccountPager(self.bank, self.account_list_model)
+        
+        self.account_listbox.grid(row=1, column=0, sticky="nsew")
+        scrollbar.grid(row=1, column=1, sticky="ns")
+        
+        # Sorting and paging controls
+        page_frame = ttk.Frame(list_frame)
+        page_frame.grid(row=2, column=0, columnspan=2, sticky="we", pady=(5, 0))
+        self.sort_var = tk.StringVar(value="Number")
+        sort_combo = ttk.Combobox(page_frame, textvariable=self.sort_var, width=8, state="readonly",
+                                  values=list(AccountPager.SORT_LABELS))
+        sort_combo.pack(side=tk.LEFT)
+        sort_combo.bind('<<ComboboxSelected>>', lambda event: self.change_account_sort())
+        self.sort_descending_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(page_frame, text="⇅", variable=self.sort_descending_var,
+                        command=self.change_account_sort).pack(side=tk.LEFT, padx=2)
+        ttk.Button(page_frame, text="▶", width=3,
+                   command=lambda: self.turn_account_page(1)).pack(side=tk.RIGHT)
+        ttk.Button(page_frame, text="◀", width=3,
+                   command=lambda: self.turn_account_page(-1)).pack(side=tk.RIGHT)
+        self.page_label_var = tk.StringVar()
+        ttk.Label(page_frame, textvariable=self.page_label_var).pack(side=tk.RIGHT, padx=5)
         
         # Bind selection event
         self.account_listbox.bind('<<ListboxSelect>>', self.on_account_select)
@@ -160,7 +222,7 @@ class ProfessionalBankingGUI:
         ttk.Button(button_frame, text="🗑️ Delete", 
                   command=self.delete_account, style='Danger.TButton').grid(row=0, column=1, padx=2)
         ttk.Button(button_frame, text="🔄 Refresh", 
-                  command=self.refresh_account_list).grid(row=0, column=2, padx=2)
+                  command=self.reload_account_list).grid(row=0, column=2, padx=2)
     
     def create_account_details_panel(self, parent):
         """Create account details panel"""
@@ -214,18 +276,19 @@ class ProfessionalBankingGUI:
         # From Account
         ttk.Label(transfer_frame, text="From Account:").grid(row=0, column=0, sticky=tk.W)
         self.from_account_var = tk.StringVar()
-        from_combo = ttk.Combobox(transfer_frame, textvariable=self.from_account_var, 
-                                 width=15, state="readonly")
-        from_combo.grid(row=0, column=1, pady=2)
-        self.from_account_combo = from_combo
+        # Autocomplete pickers: suggestions come from the search index as you type
+        from_picker = AccountPicker(transfer_frame, self.bank, textvariable=self.from_account_var,
+                                    width=15)
+        from_picker.grid(row=0, column=1, pady=2)
+        self.from_account_picker = from_picker
         
         # To Account
         ttk.Label(transfer_frame, text="To Account:").grid(row=1, column=0, sticky=tk.W)
         self.to_account_var = tk.StringVar()
-        to_combo = ttk.Combobox(transfer_frame, textvariable=self.to_account_var, 
-                               width=15, state="readonly")
-        to_combo.grid(row=1, column=1, pady=2)
-        self.to_account_combo = to_combo
+        to_picker = AccountPicker(transfer_frame, self.bank, textvariable=self.to_account_var,
+                                  width=15)
+        to_picker.grid(row=1, column=1, pady=2)
+        self.to_account_picker = to_picker
         
         # Transfer Amount
         ttk.Label(transfer_frame, text="Amount:").grid(row=2, column=0, sticky=tk.W)
@@ -275,86 +338,44 @@ class ProfessionalBankingGUI:
         self.stats_text = tk.Text(stats_frame, height=6, wrap=tk.WORD, 
                                 state=tk.DISABLED, font=('Arial', 10))
         self.stats_text.grid(row=0, column=0, sticky="we")
-        
-        # Auto-refresh stats
-        self.refresh_statistics()
     
     def load_data(self):
         """Load banking data from JSON file"""
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r') as f:
-                    data = json.load(f)
-                
-                # Restore accounts
-                for acc_data in data.get('accounts', {}).values():
-                    owner = BankAccountOwner(
-                        acc_data['owner_first_name'], 
-                        acc_data['owner_last_name']
-                    )
-                    account = BankAccount(
-                        acc_data['account_number'], 
-                        owner, 
-                        acc_data['balance']
-                    )
-                    self.accounts[acc_data['account_number']] = account
-                
-                # Restore transaction history
-                self.transaction_history = data.get('transaction_history', [])
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Error loading data: {e}")
-                self.create_default_accounts()
+        self.bank = EnhancedBankingSystem(self.data_file)
+        self.bank.add_change_listener(self.note_account_changes)
+    
+    def note_account_changes(self, changed):
+        """Engine callback: remember which accounts the list has to redraw"""
+        if changed is None or self.account_changes is None:
+            self.account_changes = None
         else:
-            self.create_default_accounts()
+            self.account_changes |= changed
     
     def save_data(self):
         """Save banking data to JSON file"""
         try:
-            data = {
-                'accounts': {},
-                'transaction_history': self.transaction_history
-            }
-            
-            for acc_num, account in self.accounts.items():
-                data['accounts'][acc_num] = {
-                    'account_number': account.account_number,
-                    'owner_first_name': account.account_owner.first_name,
-                    'owner_last_name': account.account_owner.last_name,
-                    'balance': account.account_balance
-                }
-            
-            with open(self.data_file, 'w') as f:
-                json.dump(data, f, indent=2)
-                
+            self.bank.save_data()
         except Exception as e:
             messagebox.showerror("Error", f"Error saving data: {e}")
     
-    def create_default_accounts(self):
-        """Create some default accounts for demo"""
-        accounts_data = [
-            (123456, "Filan", "Fisteku", 500.0),
-            (789012, "John", "Doe", 1000.0),
-            (345678, "Jane", "Smith", 750.0)
-        ]
-        
-        for acc_num, first, last, balance in accounts_data:
-            owner = BankAccountOwner(first, last)
-            account = BankAccount(acc_num, owner, balance)
-            self.accounts[acc_num] = account
-    
-    def log_transaction(self, account_number, transaction_type, amount, success=True, error_msg=""):
-        """Log transaction for history"""
-        transaction = {
-            'timestamp': datetime.datetime.now().isoformat(),
-            'account_number': account_number,
-            'type': transaction_type,
-            'amount': amount,
-            'success': success,
-            'error': error_msg
-        }
-        self.transaction_history.append(transaction)
-        self.save_data()
+    def poll_external_changes(self):
+        """Merge operations committed by other front ends and refresh if needed"""
+        try:
+            changed = self.bank.sync_changes()
+        except OSError:
+            # Journal briefly unreadable (e.g. on a network share): try again next poll
+            changed = set()
+        except Exception as e:
+            # Anything else is a real problem: report it, but only once while it persists
+            changed = set()
+            if str(e) != self.sync_error:
+                self.sync_error = str(e)
+                messagebox.showerror("Sync Error", f"Could not merge changes from other windows:\n{e}")
+        else:
+            self.sync_error = None
+        if changed:
+            self.refresher.mark()
+        self.root.after(self.sync_interval, self.poll_external_changes)
     
     # CRUD Operations
     def create_account(self):
@@ -377,16 +398,9 @@ class ProfessionalBankingGUI:
                 messagebox.showerror("Error", "Please enter a valid balance amount")
                 return
             
-            # Generate new account number
-            account_number = max(self.accounts.keys()) + 1 if self.accounts else 100000
-            
-            # Create account
-            owner = BankAccountOwner(first_name, last_name)
-            account = BankAccount(account_number, owner, balance)
-            self.accounts[account_number] = account
-            
-            # Log and save
-            self.log_transaction(account_number, "ACCOUNT_CREATED", balance)
+            # Create, log and save
+            account = self.bank.open_account(first_name, last_name, balance)
+            account_number = account.account_number
             
             # Clear form
             self.first_name_var.set("")
@@ -394,8 +408,7 @@ class ProfessionalBankingGUI:
             self.balance_var.set("0.00")
             
             # Refresh displays
-            self.refresh_account_list()
-            self.refresh_statistics()
+            self.refresher.mark('accounts', 'statistics', 'history')
             
             messagebox.showinfo("Success", f"Account {account_number} created successfully!")
             
@@ -437,15 +450,10 @@ class ProfessionalBankingGUI:
                     messagebox.showerror("Error", "Please enter both first and last name")
                     return
                 
-                # Update account owner (create new owner object)
-                new_owner = BankAccountOwner(new_first, new_last)
-                # Create updated account
-                updated_account = BankAccount(account.account_number, new_owner, account.account_balance)
-                self.accounts[account_number] = updated_account
+                # Update account owner
+                self.bank.update_owner(account_number, new_first, new_last)
                 
-                self.save_data()
-                self.refresh_account_list()
-                self.refresh_statistics()
+                self.refresher.mark('accounts', 'details')
                 
                 update_window.destroy()
                 messagebox.showinfo("Success", "Account updated successfully!")
@@ -475,26 +483,50 @@ class ProfessionalBankingGUI:
                                     f"Balance: ${account.account_balance:.2f}")
         
         if confirm:
-            del self.accounts[account_number]
-            self.log_transaction(account_number, "ACCOUNT_DELETED", 0)
-            self.refresh_account_list()
-            self.refresh_statistics()
+            self.bank.delete_account(account_number)
+            self.refresher.mark('accounts', 'statistics', 'history')
             self.clear_account_details()
             messagebox.showinfo("Success", "Account deleted successfully!")
     
     def refresh_account_list(self):
-        """Refresh the account listbox"""
-        self.account_listbox.delete(0, tk.END)
-        
-        for account in sorted(self.accounts.values(), key=lambda x: x.account_number):
-            display_text = f"{account.account_number} - {account.account_owner.full_name} (${account.account_balance:.2f})"
-            self.account_listbox.insert(tk.END, display_text)
-        
-        # Update comboboxes for transfer
-        account_list = [f"{acc.account_number} - {acc.account_owner.full_name}" 
-                       for acc in self.accounts.values()]
-        self.from_account_combo['values'] = account_list
-        self.to_account_combo['values'] = account_list
+        """Refresh the visible page of the account listbox - only changed rows are redrawn"""
+        changes, self.account_changes = self.account_changes, set()
+        if self.account_pager.set_query(self.search_var.get()):
+            changes = None
+        self.account_pager.apply_changes(changes)
+        self.page_label_var.set(self.account_pager.describe())
+    
+    def change_account_sort(self):
+        """Re-sort the account list (sort happens in the engine, page by page)"""
+        self.account_pager.set_sort(AccountPager.SORT_LABELS[self.sort_var.get()],
+                                    self.sort_descending_var.get())
+        self.page_label_var.set(self.account_pager.describe())
+    
+    def turn_account_page(self, step):
+        """Show the next (step=1) or previous (step=-1) page of accounts"""
+        if step > 0:
+            self.account_pager.next_page()
+        else:
+            self.account_pager.previous_page()
+        self.page_label_var.set(self.account_pager.describe())
+    
+    def reload_account_list(self):
+        """Redraw the whole account list (Refresh button)"""
+        self.account_changes = None
+        self.refresher.mark('accounts')
+    
+    def selected_account_signature(self):
+        """What the details panel shows: selected account and its version"""
+        selection = self.account_listbox.curselection()
+        if not selection:
+            return None
+        account = self.accounts.get(self.account_list_model.key_at(selection[0]))
+        return (account.account_number, account.version) if account else None
+    
+    def refresh_selected_account(self):
+        """Redraw the details of the selected account (if any)"""
+        if self.account_listbox.curselection():
+            self.on_account_select(None)
     
     def on_account_select(self, event):
         """Handle account selection"""
@@ -570,32 +602,29 @@ class ProfessionalBankingGUI:
         
         try:
             amount = float(self.operation_amount_var.get())
-            if amount <= 0:
-                messagebox.showerror("Error", "Amount must be positive")
-                return
-            
+        except ValueError:
+            messagebox.showerror("Error", "Please enter a valid amount")
+            return
+        if amount <= 0:
+            messagebox.showerror("Error", "Amount must be positive")
+            return
+        
+        try:
             # Get selected account
             account_text = self.account_listbox.get(selection[0])
             account_number = int(account_text.split(" - ")[0])
-            account = self.accounts[account_number]
             
             # Perform deposit
-            account.deposit(amount)
-            self.log_transaction(account_number, "DEPOSIT", amount)
+            account = self.bank.deposit(account_number, amount)
             
             # Refresh displays
-            self.refresh_account_list()
-            self.display_account_details(account)
-            self.refresh_statistics()
+            self.refresher.mark('accounts', 'details', 'statistics', 'history')
             self.operation_amount_var.set("")
             
             messagebox.showinfo("Success", f"${amount:.2f} deposited successfully!")
             
         except ValueError as e:
-            if "positive" in str(e):
-                messagebox.showerror("Error", "Deposit amount must be positive")
-            else:
-                messagebox.showerror("Error", "Please enter a valid amount")
+            messagebox.showerror("Error", str(e))
         except Exception as e:
             messagebox.showerror("Error", f"Error processing deposit: {e}")
     
@@ -606,64 +635,53 @@ class ProfessionalBankingGUI:
             messagebox.showwarning("Warning", "Please select an account")
             return
         
-        # Initialize variables to avoid unbound errors
-        account_number = None
-        amount = None
-        
         try:
             amount = float(self.operation_amount_var.get())
-            if amount <= 0:
-                messagebox.showerror("Error", "Amount must be positive")
-                return
-            
+        except ValueError:
+            messagebox.showerror("Error", "Please enter a valid amount")
+            return
+        if amount <= 0:
+            messagebox.showerror("Error", "Amount must be positive")
+            return
+        
+        try:
             # Get selected account
             account_text = self.account_listbox.get(selection[0])
             account_number = int(account_text.split(" - ")[0])
-            account = self.accounts[account_number]
             
             # Perform withdrawal
-            account.withdraw(amount)
-            self.log_transaction(account_number, "WITHDRAW", amount)
+            account = self.bank.withdraw(account_number, amount)
             
             # Refresh displays
-            self.refresh_account_list()
-            self.display_account_details(account)
-            self.refresh_statistics()
+            self.refresher.mark('accounts', 'details', 'statistics', 'history')
             self.operation_amount_var.set("")
             
             messagebox.showinfo("Success", f"${amount:.2f} withdrawn successfully!")
             
         except ValueError as e:
-            if "Insufficient balance" in str(e):
-                messagebox.showerror("Error", "Insufficient balance for this withdrawal")
-                if account_number is not None and amount is not None:
-                    self.log_transaction(account_number, "WITHDRAW_FAILED", amount, False, str(e))
-            elif "positive" in str(e):
-                messagebox.showerror("Error", "Withdrawal amount must be positive")
-            else:
-                messagebox.showerror("Error", "Please enter a valid amount")
+            # Insufficient balance, daily limit, held funds, ...
+            messagebox.showerror("Error", str(e))
         except Exception as e:
             messagebox.showerror("Error", f"Error processing withdrawal: {e}")
     
     def transfer_money(self):
         """Transfer money between accounts"""
-        # Initialize variables to avoid unbound errors
-        from_acc_num = None
-        amount = None
+        from_text = self.from_account_var.get()
+        to_text = self.to_account_var.get()
+        if not from_text or not to_text:
+            messagebox.showerror("Error", "Please select both source and destination accounts")
+            return
         
         try:
-            from_text = self.from_account_var.get()
-            to_text = self.to_account_var.get()
             amount = float(self.transfer_amount_var.get())
-            
-            if not from_text or not to_text:
-                messagebox.showerror("Error", "Please select both source and destination accounts")
-                return
-            
-            if amount <= 0:
-                messagebox.showerror("Error", "Transfer amount must be positive")
-                return
-            
+        except ValueError:
+            messagebox.showerror("Error", "Please enter a valid transfer amount")
+            return
+        if amount <= 0:
+            messagebox.showerror("Error", "Transfer amount must be positive")
+            return
+        
+        try:
             # Extract account numbers
             from_acc_num = int(from_text.split(" - ")[0])
             to_acc_num = int(to_text.split(" - ")[0])
@@ -672,22 +690,11 @@ class ProfessionalBankingGUI:
                 messagebox.showerror("Error", "Cannot transfer to the same account")
                 return
             
-            # Get accounts
-            from_account = self.accounts[from_acc_num]
-            to_account = self.accounts[to_acc_num]
-            
-            # Perform transfer
-            from_account.withdraw(amount)
-            to_account.deposit(amount)
-            
-            # Log transactions
-            self.log_transaction(from_acc_num, "TRANSFER_OUT", amount)
-            self.log_transaction(to_acc_num, "TRANSFER_IN", amount)
+            # Perform and log transfer
+            from_account, to_account = self.bank.transfer(from_acc_num, to_acc_num, amount)
             
             # Refresh displays
-            self.refresh_account_list()
-            self.refresh_statistics()
-            self.refresh_transaction_history()
+            self.refresher.mark('accounts', 'statistics', 'history')
             self.transfer_amount_var.set("")
             
             messagebox.showinfo("Success", 
@@ -696,12 +703,7 @@ class ProfessionalBankingGUI:
                               f"To: {to_account.account_owner.full_name}")
             
         except ValueError as e:
-            if "Insufficient balance" in str(e):
-                messagebox.showerror("Error", "Insufficient balance for transfer")
-                if from_acc_num is not None and amount is not None:
-                    self.log_transaction(from_acc_num, "TRANSFER_FAILED", amount, False, str(e))
-            else:
-                messagebox.showerror("Error", "Please enter a valid transfer amount")
+            messagebox.showerror("Error", str(e))
         except Exception as e:
             messagebox.showerror("Error", f"Error processing transfer: {e}")
     
@@ -715,7 +717,7 @@ class ProfessionalBankingGUI:
         recent_transactions = self.transaction_history[-20:]
         
         for trans in reversed(recent_transactions):
-            timestamp = trans['timestamp'][:19].replace('T', ' ')
+            timestamp = format_ts(trans['ts'])
             account_num = trans['account_number']
             trans_type = trans['type']
             amount = f"${trans['amount']:.2f}" if trans['amount'] else "N/A"
@@ -725,38 +727,34 @@ class ProfessionalBankingGUI:
                                                           trans_type, amount, status))
     
     def refresh_statistics(self):
-        """Refresh statistics display"""
+        """Recompute statistics in the background (a newer request supersedes an older one)"""
+        self.background.submit('statistics', compute_statistics, self.show_statistics,
+                               list(self.accounts.values()),
+                               *self.transaction_history.copy_columns('success', 'day'))
+    
+    def show_statistics(self, stats):
+        """Render computed statistics (runs on the Tk thread)"""
         self.stats_text.config(state=tk.NORMAL)
         self.stats_text.delete(1.0, tk.END)
         
-        # Calculate statistics
-        total_accounts = len(self.accounts)
-        total_balance = sum(acc.account_balance for acc in self.accounts.values())
-        avg_balance = total_balance / max(total_accounts, 1)
-        
-        total_transactions = len(self.transaction_history)
-        successful_transactions = sum(1 for t in self.transaction_history if t['success'])
-        success_rate = (successful_transactions / max(total_transactions, 1)) * 100
-        
         stats_text = f"""
 📊 REAL-TIME BANKING STATISTICS
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-💼 PORTFOLIO OVERVIEW:  👥 Total Accounts: {total_accounts}  |  💰 Total Assets: ${total_balance:,.2f}  |  📊 Average Balance: ${avg_balance:,.2f}
+💼 PORTFOLIO OVERVIEW:  👥 Total Accounts: {stats['total_accounts']}  |  💰 Total Assets: ${stats['total_balance']:,.2f}  |  📊 Average Balance: ${stats['average_balance']:,.2f}
 
-📈 TRANSACTION METRICS:  🔄 Total Transactions: {total_transactions}  |  ✅ Success Rate: {success_rate:.1f}%  |  📅 Last Updated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+📈 TRANSACTION METRICS:  🔄 Total Transactions: {stats['total_transactions']}  |  ✅ Success Rate: {stats['success_rate']:.1f}%  |  📅 Last Updated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         """
         
         self.stats_text.insert(1.0, stats_text)
         self.stats_text.config(state=tk.DISABLED)
-        
-        # Schedule next refresh
-        self.root.after(5000, self.refresh_statistics)  # Refresh every 5 seconds
+
 
 def main():
     """Main application entry point"""
     root = tk.Tk()
     app = ProfessionalBankingGUI(root)
+    root.protocol("WM_DELETE_WINDOW", lambda: (app.background.shutdown(), root.destroy()))
     
     # Load transaction history on startup
     app.refresh_transaction_history()
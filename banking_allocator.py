@@ -0,0 +1,158 @@
+# banking_allocator.py - Account Number Allocation Service
+"""
+Hands out new account numbers in O(1) without scanning existing accounts.
+
+The allocator persists a high-water mark next to the data file
+(banking_data.json -> banking_data.alloc). Each process reserves a block of
+numbers at a time under a short file lock, then serves numbers from that
+block locally, so parallel creators (GUIs, CLI bulk onboarding, the daemon)
+never hand out the same number and rarely touch the shared file. Numbers in
+a block that a process never used are simply skipped; account numbers have
+gaps but are never reused.
+
+Optional check digits: when enabled, every number gets a trailing Luhn digit
+(e.g. base 100000 -> 1000009) so typos in an account number can be detected
+with is_valid_account_number(). The setting is stored in the state file and
+shared by every process. A new book takes it from the constructor;
+set_check_digit() switches an existing one (EnhancedBankingSystem's
+check_digits argument, 'banking_cli.py --check-digits on|off').
+"""
+
+import json
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def allocator_path_for(data_file):
+    """Allocator state file used for a given data file"""
+    return os.path.splitext(data_file)[0] + ".alloc"
+
+
+def luhn_check_digit(base):
+    """Luhn check digit for a base number"""
+    total = 0
+    for i, ch in enumerate(reversed(str(base))):
+        digit = int(ch)
+        if i % 2 == 0:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        total += digit
+    return (10 - total % 10) % 10
+
+
+def is_valid_account_number(number):
+    """True if the last digit of number is the Luhn check digit of the rest"""
+    return number >= 10 and luhn_check_digit(number // 10) == number % 10
+
+
+@contextmanager
+def _file_lock(path):
+    """Exclusive inter-process lock held only while the allocator state is updated"""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        yield
+    finally:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        os.close(fd)
+
+
+class AccountNumberAllocator:
+    """Block-reserving account number allocator with a persisted high-water mark"""
+
+    def __init__(self, state_file, start=100000, block_size=20, check_digit=False, seed=None):
+        self.state_file = state_file
+        self.lock_file = state_file + ".lock"
+        self.start = start
+        self.block_size = block_size
+        # Only used when the state file is created; afterwards the stored setting wins
+        self.check_digit = check_digit
+        # Callable returning the highest account number already in use (or None).
+        # Called once, when the state file is first created on an existing book.
+        self.seed = seed
+        self._next = 0
+        self._end = 0
+
+    def _read_state(self):
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_state(self, state):
+        tmp_path = self.state_file + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.state_file)
+
+    def _initial_state(self):
+        """State of a book that has no state file yet"""
+        state = {'high_water_mark': self.start, 'check_digit': self.check_digit}
+        existing_max = self.seed() if self.seed else None
+        if existing_max is not None:
+            floor = existing_max // 10 + 1 if self.check_digit else existing_max + 1
+            state['high_water_mark'] = max(self.start, floor)
+        return state
+
+    def set_check_digit(self, enabled):
+        """Switch check digits on or off for every number allocated from now on"""
+        with _file_lock(self.lock_file):
+            state = self._read_state() or self._initial_state()
+            if state.get('check_digit', False) != enabled:
+                # Bases below the mark were handed out in the old form. With
+                # check digits the next number is at least mark * 10, above
+                # every plain one; without them, start plain numbers at
+                # mark * 10, above every check-digit one
+                if not enabled:
+                    state['high_water_mark'] *= 10
+                state['check_digit'] = enabled
+            self._write_state(state)
+        self.check_digit = enabled
+        # Drop the rest of this process's block (reserved in the old form)
+        self._next = self._end = 0
+
+    def reserve_block(self, size=None):
+        """Reserve `size` consecutive base numbers for this process and return them as a range"""
+        size = size or self.block_size
+        with _file_lock(self.lock_file):
+            state = self._read_state() or self._initial_state()
+            self.check_digit = state.get('check_digit', False)
+            first = state['high_water_mark']
+            state['high_water_mark'] = first + size
+            self._write_state(state)
+        return range(first, first + size)
+
+    def format_number(self, base):
+        """Account number for a base number (appends the check digit if enabled)"""
+        return base * 10 + luhn_check_digit(base) if self.check_digit else base
+
+    def allocate(self):
+        """Return a new, never used account number"""
+        if self._next >= self._end:
+            block = self.reserve_block()
+            self._next, self._end = block.start, block.stop
+        base = self._next
+        self._next += 1
+        return self.format_number(base)
+
+    def allocate_many(self, count):
+        """Reserve and return `count` account numbers in one step (bulk onboarding)"""
+        block = self.reserve_block(count)
+        return [self.format_number(base) for base in block]
@@ -0,0 +1,205 @@
+# banking_archive.py - Cold Storage for Old Transaction History
+"""
+Moves old transaction rows out of the snapshot into compressed, monthly
+partition files next to the data file
+(banking_data.json -> banking_data_archive/):
+
+    2025-06.jsonl.gz     runs of rows logged in June 2025
+    2025-07.jsonl.gz
+    manifest.json        rows archived so far + the rollup tables of each month
+
+A partition file is a sequence of gzip members, one per archive run. Each
+member holds one JSON line: the run's first absolute row number and its
+rows in the snapshot's columnar form (TransactionLog.slice_data). New runs
+are appended as new members, so archiving never rewrites old partitions.
+
+What gets archived: the longest prefix of the log whose rows are older
+than the cutoff day, rounded down to whole sealed audit segments. The
+audit chain then continues unchanged (see banking_audit.verify_archive).
+The partitions are written and fsynced, then the manifest is replaced
+atomically, and only then are the rows dropped from the log: the engine
+commits an 'archived' record to the change journal, and every front end
+drops them when it replays that record (see banking_journal), so a running
+front end never writes archived rows back into the snapshot. The snapshot
+shrinks at the next checkpoint. A crash in between leaves rows in both
+places: runs at or past the manifest's row count are ignored when reading,
+and the next run drops the rows the manifest already covers instead of
+writing them again.
+
+Each month's entry in the manifest holds the rollup tables
+(banking_rollups) of its archived rows, so Rollups.rebuild() only has to
+add the live rows instead of decompressing every partition. runs() and
+period_logs() read old periods on demand.
+"""
+
+import datetime
+import gzip
+import heapq
+import json
+import os
+from banking_journal import write_snapshot
+from banking_records import AUDIT_SEGMENT_ROWS, TransactionLog, day_number, day_to_date
+from banking_rollups import Rollups
+
+MANIFEST = "manifest.json"
+
+
+def archive_dir_for(data_file):
+    """Archive directory used for a given data file"""
+    return os.path.splitext(data_file)[0] + "_archive"
+
+
+def month_key(day):
+    return day_to_date(day).strftime('%Y-%m')
+
+
+def month_bounds(day):
+    """(first day, last day) numbers of the month a day falls in"""
+    first = day_to_date(day).replace(day=1)
+    following = (first + datetime.timedelta(days=32)).replace(day=1)
+    return day_number(first), day_number(following) - 1
+
+
+class HistoryArchive:
+    """Monthly gzip partitions of archived transaction rows"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._manifest = None
+
+    @property
+    def manifest(self):
+        """{'rows': archived rows, 'partitions': {'YYYY-MM': rollups}} (re-read after each run)"""
+        if self._manifest is None:
+            try:
+                with open(os.path.join(self.directory, MANIFEST)) as f:
+                    self._manifest = json.load(f)
+            except FileNotFoundError:
+                self._manifest = {'rows': 0, 'partitions': {}}
+        return self._manifest
+
+    @property
+    def rows(self):
+        return self.manifest['rows']
+
+    def refresh(self):
+        """Forget the cached manifest (another process may have archived since)"""
+        self._manifest = None
+
+    def partition_path(self, month):
+        return os.path.join(self.directory, f"{month}.jsonl.gz")
+
+    def archive(self, log, cutoff_day):
+        """Copy log rows older than cutoff_day into the archive.
+
+        Returns how many leading rows of the log the archive now holds; the
+        caller drops them (the engine does so through the change journal).
+        """
+        if log.tamper_problems:
+            raise ValueError("The transaction history does not match its audit anchors "
+                             "(run 'verify'); not archiving it")
+        self.refresh()
+        archived = self.rows
+        if log.archived_rows > archived:
+            raise ValueError(f"The archive in {self.directory} is missing rows the history has dropped")
+        # Rows an interrupted run already archived are dropped, not written again
+        start = min(archived - log.archived_rows,
+                    len(log) - (log.archived_rows + len(log)) % AUDIT_SEGMENT_ROWS)
+
+        end = self.older_rows(log, cutoff_day, start)
+        end -= (log.archived_rows + end) % AUDIT_SEGMENT_ROWS
+        if end > start:
+            self._write_runs(log, start, end)
+        return max(start, end)
+
+    @staticmethod
+    def older_rows(log, cutoff_day, start=0):
+        """End of the run of log rows from start on that are older than cutoff_day"""
+        days = log.column('day')
+        end = start
+        while end < len(log) and days[end] < cutoff_day:
+            end += 1
+        return end
+
+    def _write_runs(self, log, start, end):
+        """Append rows [start, end) as runs split by month, then update the manifest"""
+        os.makedirs(self.directory, exist_ok=True)
+        manifest = self.manifest
+        partitions = manifest['partitions']
+        days = log.column('day')
+
+        run_start = start
+        low, high = month_bounds(days[start])
+        for index in range(start, end + 1):
+            if index < end and low <= days[index] <= high:
+                continue
+            month = month_key(low)
+            rollups = self.month_rollups(month) or Rollups()
+            rollups.add_rows(log, run_start, index)
+            rollups.through += index - run_start
+            partitions[month] = rollups.to_data()
+            run = dict(log.slice_data(run_start, index), first_row=log.archived_rows + run_start)
+            self._append_member(month, run)
+            if index < end:
+                run_start = index
+                low, high = month_bounds(days[index])
+
+        manifest['rows'] = log.archived_rows + end
+        write_snapshot(os.path.join(self.directory, MANIFEST), manifest)
+
+    def month_rollups(self, month):
+        """Rollups of a month's archived rows (through = their count), None if not recorded.
+
+        Manifests written before rollups were kept per month hold a
+        different summary there: None as well.
+        """
+        data = self.manifest['partitions'].get(month)
+        if not data or 'through' not in data:
+            return None
+        return Rollups.from_data(data)
+
+    def _append_member(self, month, run):
+        with open(self.partition_path(month), 'ab') as f:
+            with gzip.GzipFile(fileobj=f, mode='wb') as member:
+                member.write(json.dumps(run, separators=(',', ':')).encode('utf-8') + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _partition_runs(self, month):
+        """(first row, TransactionLog) of every complete run of a partition, in row order"""
+        limit = self.rows
+        seen = set()
+        try:
+            with gzip.open(self.partition_path(month), 'rt', encoding='utf-8') as f:
+                for line in f:
+                    run = json.loads(line)
+                    first_row = run['first_row']
+                    if first_row < limit and first_row not in seen:
+                        seen.add(first_row)
+                        yield first_row, TransactionLog.from_data(run, chained=False)
+        except FileNotFoundError:
+            raise ValueError(f"Archive partition {self.partition_path(month)} is missing") from None
+        except (EOFError, gzip.BadGzipFile, ValueError):
+            # A torn member from an interrupted run: the manifest never covered it
+            return
+
+    def runs(self, start_day=None, end_day=None):
+        """(first row, TransactionLog) of the archived runs in the months of a period, in row order"""
+        months = sorted(self.manifest['partitions'])
+        if start_day is not None:
+            months = [month for month in months if month >= month_key(start_day)]
+        if end_day is not None:
+            months = [month for month in months if month <= month_key(end_day)]
+        return heapq.merge(*(self._partition_runs(month) for month in months), key=lambda run: run[0])
+
+    def period_logs(self, log, start_day=None, end_day=None):
+        """Logs covering a period from the archive and the live log, oldest first.
+
+        Returns [(TransactionLog, first index to read)]: the archived runs of
+        the period's months, then the live log, skipping live rows the
+        archive already holds.
+        """
+        self.refresh()
+        logs = [(run, 0) for _, run in self.runs(start_day, end_day)] if self.rows else []
+        logs.append((log, max(0, min(self.rows - log.archived_rows, len(log)))))
+        return logs
@@ -0,0 +1,182 @@
+# banking_audit.py - Transaction History Integrity Checks
+"""
+Verifies the audit hash chain of a TransactionLog (see banking_records).
+
+Every full segment of AUDIT_SEGMENT_ROWS rows is sealed with an anchor:
+
+    anchor[k] = SHA-256(anchor[k-1] + column bytes of segment k)
+
+with anchor[-1] = 32 zero bytes. Because each segment starts from the
+stored anchor of the one before, every segment can be checked on its own:
+verify_log() recomputes the anchors in a process pool, a bounded number of
+segments in flight at a time. A mismatch in segment k means rows in it (or
+its stored anchor) were changed after sealing. The rows after the last full
+segment are checked against the tail anchor stored with the snapshot when
+the log is loaded (TransactionLog.tamper_problems), so no row goes
+unchained.
+
+The anchors alone are tamper-evident, not tamper-proof: someone who edits
+the data file can recompute them. The audit root closes that gap. It is a
+Merkle root over the segment anchors, the hash of the open tail segment
+and the hash of the interned error / type tables, so one 32-byte value
+covers the whole history. Record it somewhere the data file's writers
+cannot change (a ticket, a signed e-mail, another system) and pass it back
+to verify_log(expected_root=...) later.
+
+Segments moved to the archive (banking_archive) keep their anchors in the
+log, so the root does not change when history is archived. verify_log
+checks the segments the log still holds; verify_archive streams the
+archive partitions and checks the archived ones.
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from banking_records import AUDIT_SEGMENT_ROWS, GENESIS_ANCHOR, TRANSACTION_FIELDS, chain_hash
+
+
+def merkle_root(leaves):
+    """Merkle root of a list of hashes (leaf and node hashes are domain-separated)"""
+    level = [hashlib.sha256(b"\x00" + leaf).digest() for leaf in leaves]
+    if not level:
+        return hashlib.sha256(b"").digest()
+    while len(level) > 1:
+        paired = [hashlib.sha256(b"\x01" + level[i] + level[i + 1]).digest()
+                  for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+    return level[0]
+
+
+def tables_hash(log):
+    """Hash of the interned tables the error and type columns index into"""
+    tables = json.dumps([log.errors(), log.extra_types()], separators=(',', ':'))
+    return hashlib.sha256(tables.encode('utf-8')).digest()
+
+
+def audit_root(log):
+    """Hex audit root of a log: one value covering every row and the tables"""
+    tail = log.stored_tail()
+    tail_leaves = [tail[1]] if tail else []
+    return merkle_root(list(log.anchors()) + tail_leaves + [tables_hash(log)]).hex()
+
+
+def hash_segments(tasks):
+    """Recompute anchors for (index, previous anchor, column bytes) tasks (runs in a worker)"""
+    return [(index, chain_hash(previous, chunks)) for index, previous, chunks in tasks]
+
+
+def segment_tasks(log, first, count, per_task):
+    """Yield lists of hash_segments tasks covering segments first..count-1"""
+    anchors = log.anchors()
+    batch = []
+    for index in range(first, count):
+        start = index * AUDIT_SEGMENT_ROWS - log.archived_rows
+        previous = anchors[index - 1] if index else GENESIS_ANCHOR
+        batch.append((index, previous, log.column_bytes(start, start + AUDIT_SEGMENT_ROWS)))
+        if len(batch) >= per_task:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def verify_log(log, workers=None, expected_root=None, segments_per_task=64):
+    """Check every sealed segment the log holds (and the audit root, if expected_root is given).
+
+    workers=None uses one process per core; with one worker (or one core)
+    everything runs in-process.
+    Returns a report dict; report['ok'] is False if anything did not match.
+    """
+    anchors = log.anchors()
+    first = log.archived_rows // AUDIT_SEGMENT_ROWS
+    full_segments = (log.archived_rows + len(log)) // AUDIT_SEGMENT_ROWS
+    count = min(full_segments, len(anchors))
+    recomputed = [None] * count
+
+    tasks = segment_tasks(log, first, count, segments_per_task)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for task in tasks:
+            for index, anchor in hash_segments(task):
+                recomputed[index] = anchor
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            for task in tasks:
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        for index, anchor in future.result():
+                            recomputed[index] = anchor
+                pending.add(pool.submit(hash_segments, task))
+            for future in pending:
+                for index, anchor in future.result():
+                    recomputed[index] = anchor
+
+    bad_segments = [index for index in range(first, count) if recomputed[index] != anchors[index]]
+    problems = [f"segment {index} (rows {index * AUDIT_SEGMENT_ROWS}-"
+                f"{(index + 1) * AUDIT_SEGMENT_ROWS - 1}) does not match its anchor"
+                for index in bad_segments]
+    # Anchor count and tail rows were checked when the log was loaded
+    problems += log.tamper_problems
+
+    root = audit_root(log)
+    if expected_root is not None and root != expected_root.lower():
+        problems.append("audit root differs from the expected root")
+    return {
+        'ok': not problems,
+        'rows': len(log),
+        'segments': count - first,
+        'bad_segments': bad_segments,
+        'problems': problems,
+        'root': root
+    }
+
+
+def verify_archive(archive, log):
+    """Check the archived segments of a log against its anchors.
+
+    Reads the archive runs in row order, one segment at a time. Returns a
+    report dict like verify_log's (without the root).
+    """
+    anchors = log.anchors()
+    expected_rows = log.archived_rows
+    problems = []
+    bad_segments = []
+    pending = [[] for _ in TRANSACTION_FIELDS]
+    pending_rows = 0
+    row = 0
+    segment = 0
+    for first_row, run in archive.runs():
+        if first_row != row:
+            problems.append(f"archive rows {row}-{first_row - 1} are missing or duplicated")
+            break
+        start = 0
+        while start < len(run):
+            take = min(len(run) - start, AUDIT_SEGMENT_ROWS - pending_rows)
+            for column, chunk in zip(pending, run.column_bytes(start, start + take)):
+                column.append(chunk)
+            pending_rows += take
+            start += take
+            if pending_rows == AUDIT_SEGMENT_ROWS:
+                previous = anchors[segment - 1] if segment else GENESIS_ANCHOR
+                stored = anchors[segment] if segment < len(anchors) else None
+                if chain_hash(previous, [b"".join(column) for column in pending]) != stored:
+                    bad_segments.append(segment)
+                    problems.append(f"archived segment {segment} does not match its anchor")
+                pending = [[] for _ in TRANSACTION_FIELDS]
+                pending_rows = 0
+                segment += 1
+        row += len(run)
+    if not problems and row != expected_rows:
+        problems.append(f"archive holds {row} rows, the log expects {expected_rows}")
+    return {
+        'ok': not problems,
+        'rows': row,
+        'segments': segment,
+        'bad_segments': bad_segments,
+        'problems': problems
+    }
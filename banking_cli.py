@@ -0,0 +1,566 @@
+# banking_cli.py - Non-interactive Command Line Interface
+"""
+Scriptable front end for EnhancedBankingSystem.
+
+Every command runs directly against the data file without menus or prompts:
+
+    python banking_cli.py deposit 123456 50
+    python banking_cli.py withdraw 123456 20
+    python banking_cli.py transfer 123456 789012 100
+    python banking_cli.py create Jane Doe 250 [--customer <customer id>]
+    python banking_cli.py summary
+    python banking_cli.py history --limit 20
+    python banking_cli.py search "jane sm"
+    python banking_cli.py customer 345678
+    python banking_cli.py transfer-info 4611686018427387904
+    python banking_cli.py limit 123456 500        (or 'none' to clear it)
+    python banking_cli.py hold 123456 75
+    python banking_cli.py release 1234567890123
+    python banking_cli.py run-job interest [--job-id interest-2025-07-31]
+    python banking_cli.py statements --period 2025-07 --format csv --out statements
+    python banking_cli.py verify [--expect <audit root>]
+    python banking_cli.py archive --days 365
+    python banking_cli.py rebuild-rollups
+    python banking_cli.py bulk operations.csv
+
+A bulk file holds one command per line in CSV form (blank lines and lines
+starting with '#' are ignored):
+
+    deposit,123456,50
+    withdraw,789012,25.5
+    transfer,123456,789012,100
+    create,Jane,Doe,250
+
+The whole bulk file is applied to a single in-memory book. Each operation is
+committed to the change journal; the snapshot is checkpointed once at the end
+instead of once per operation.
+
+    python banking_cli.py checkpoint [--compact]
+
+writes a snapshot now; --compact also empties the journal (run it only while
+no other front end is open on the same data file).
+
+    python banking_cli.py --check-digits on create Jane Doe 250
+
+switches Luhn check digits on new account numbers on (or off) for the book
+before running the command (see banking_allocator).
+"""
+
+import argparse
+import csv
+import inspect
+import sys
+from Enhanced_BankingApp import EnhancedBankingSystem
+from banking_records import AUDIT_SEGMENT_ROWS, format_ts, today, new_transfer_id
+from banking_audit import verify_archive, verify_log
+from banking_jobs import BatchJob, SCHEDULES, default_job_id
+from banking_statements import (FORMATS, collect_statements, parse_period, period_label,
+                                previous_month, write_statements)
+
+
+def account_info(account):
+    """Plain dict describing an account"""
+    return {
+        'account_number': account.account_number,
+        'owner': account.account_owner.full_name,
+        'balance': account.account_balance
+    }
+
+
+# Command handlers - each takes the banking system plus positional string
+# arguments and returns a JSON-friendly result
+def cmd_create(system, first_name, last_name, initial_deposit="0", customer_id=""):
+    account = system.open_account(first_name, last_name, float(initial_deposit), customer_id or None)
+    return account_info(account)
+
+
+def cmd_deposit(system, account_number, amount):
+    account = system.deposit(int(account_number), float(amount))
+    return account_info(account)
+
+
+def cmd_withdraw(system, account_number, amount):
+    account = system.withdraw(int(account_number), float(amount))
+    return account_info(account)
+
+
+def cmd_transfer(system, from_account, to_account, amount):
+    transfer_id = new_transfer_id()
+    source, destination = system.transfer(int(from_account), int(to_account), float(amount),
+                                          transfer_id)
+    return {
+        'transfer_id': transfer_id,
+        'amount': float(amount),
+        'from': account_info(source),
+        'to': account_info(destination)
+    }
+
+
+def cmd_summary(system):
+    accounts = [account_info(account)
+                for account in sorted(system.accounts.values(), key=lambda a: a.account_number)]
+    return {
+        'accounts': accounts,
+        'total_accounts': len(accounts),
+        'total_balance': system.total_balance()
+    }
+
+
+def cmd_search(system, query, limit="20"):
+    return {'accounts': [account_info(account)
+                         for account in system.search_accounts(query, int(limit))]}
+
+
+def cmd_customer(system, account_number):
+    summary = system.customer_summary(int(account_number))
+    return {
+        'customer_id': summary['customer_id'],
+        'owner': summary['owner'],
+        'accounts': [account_info(account) for account in summary['accounts']],
+        'total_holdings': summary['total_holdings']
+    }
+
+
+def cmd_transfer_info(system, transfer_id):
+    return system.get_transfer(int(transfer_id))
+
+
+def cmd_run_job(system, kind, job_id="", chunk_size="10000"):
+    schedule = SCHEDULES.get(kind)
+    if schedule is None:
+        raise ValueError(f"Unknown job: {kind} (choose from {', '.join(SCHEDULES)})")
+    job_id = job_id or default_job_id(kind)
+    progress = BatchJob(system, job_id, schedule(), int(chunk_size)).run()
+    return dict(progress, job_id=job_id)
+
+
+def cmd_statements(system, period="", fmt="text", out_dir="statements", workers="0", account=""):
+    start_day, end_day = parse_period(period) if period else previous_month()
+    statements = collect_statements(system, start_day, end_day,
+                                    [int(account)] if account else None)
+    written = write_statements(statements, out_dir, fmt, int(workers) or None)
+    return {'period': period_label(start_day, end_day), 'statements': written, 'out_dir': out_dir}
+
+
+def limit_info(system, account_number):
+    """Plain dict describing an account's limit, usage and holds"""
+    limits = system.limits
+    return {
+        'account_number': account_number,
+        'daily_limit': limits.limit_of(account_number),
+        'used_today': limits.used_on(account_number, today()),
+        'held': limits.held_amount(account_number),
+        'available': system.available_balance(account_number)
+    }
+
+
+def cmd_limit(system, account_number, amount="none"):
+    account_number = int(account_number)
+    system.set_daily_limit(account_number, None if amount.lower() == "none" else float(amount))
+    return limit_info(system, account_number)
+
+
+def cmd_hold(system, account_number, amount):
+    hold_id = system.place_hold(int(account_number), float(amount))
+    return dict(limit_info(system, int(account_number)), hold_id=hold_id, amount=float(amount))
+
+
+def cmd_release(system, hold_id):
+    account_number, amount = system.release_hold(int(hold_id))
+    return dict(limit_info(system, account_number), hold_id=int(hold_id), amount=amount)
+
+
+def cmd_verify(system, workers="0", expected_root=""):
+    system.sync_changes()
+    history = system.transaction_history
+    report = verify_log(history, int(workers) or None, expected_root or None)
+    if history.archived_rows:
+        archived = verify_archive(system.archive, history)
+        report['ok'] = report['ok'] and archived['ok']
+        report['problems'] = archived['problems'] + report['problems']
+        report['segments'] += archived['segments']
+    return report
+
+
+def cmd_archive(system, days="365"):
+    moved = system.archive_history(int(days))
+    # Only whole audit segments are archived: older rows short of one stay live
+    waiting = system.archive.older_rows(system.transaction_history, today() - int(days))
+    return {'archived': moved, 'archived_rows': system.transaction_history.archived_rows,
+            'live_rows': len(system.transaction_history), 'directory': system.archive.directory,
+            'waiting': waiting, 'segment_rows': AUDIT_SEGMENT_ROWS}
+
+
+def cmd_rebuild_rollups(system):
+    system.sync_changes()
+    rollups = system.rebuild_rollups(full=True)
+    system.save_data()
+    rows, successful = rollups.totals()
+    return {'rows': rows, 'successful': successful, 'days': len(rollups.days),
+            'accounts': len(rollups.accounts)}
+
+
+def cmd_history(system, limit="10"):
+    return {'transactions': system.recent_transactions(int(limit))}
+
+
+COMMANDS = {
+    'create': cmd_create,
+    'deposit': cmd_deposit,
+    'withdraw': cmd_withdraw,
+    'transfer': cmd_transfer,
+    'summary': cmd_summary,
+    'history': cmd_history,
+    'search': cmd_search,
+    'customer': cmd_customer,
+    'transfer-info': cmd_transfer_info,
+    'run-job': cmd_run_job,
+    'statements': cmd_statements,
+    'verify': cmd_verify,
+    'archive': cmd_archive,
+    'rebuild-rollups': cmd_rebuild_rollups,
+    'limit': cmd_limit,
+    'hold': cmd_hold,
+    'release': cmd_release,
+}
+
+# Commands that change the book and therefore need a save
+MUTATING_COMMANDS = {'create', 'deposit', 'withdraw', 'transfer', 'limit', 'hold', 'release'}
+
+
+def run_command(system, name, args):
+    """Dispatch a single command by name"""
+    handler = COMMANDS.get(name)
+    if handler is None:
+        raise ValueError(f"Unknown command: {name}")
+    try:
+        inspect.signature(handler).bind(system, *args)
+    except TypeError:
+        raise ValueError(f"Wrong number of arguments for '{name}'")
+    return handler(system, *args)
+
+
+def format_result(name, result):
+    """Human readable one-line (or table) rendering of a command result"""
+    if name in ('create', 'deposit', 'withdraw'):
+        return (f"✅ {name}: {result['account_number']} - {result['owner']} "
+                f"balance ${result['balance']:.2f}")
+    if name == 'transfer':
+        return (f"✅ transfer: ${result['amount']:.2f} "
+                f"{result['from']['account_number']} (${result['from']['balance']:.2f}) -> "
+                f"{result['to']['account_number']} (${result['to']['balance']:.2f}) "
+                f"[transfer {result['transfer_id']}]")
+    if name == 'statements':
+        return f"🧾 {result['statements']} statement(s) for {result['period']} written to {result['out_dir']}"
+    if name == 'run-job':
+        return (f"🧮 {result['job_id']}: {result['accounts']} accounts, "
+                f"{result['transactions']} {result['type']} transactions, "
+                f"total ${result['total']:.2f}")
+    if name in ('limit', 'hold', 'release'):
+        limit = "none" if result['daily_limit'] is None else f"${result['daily_limit']:.2f}"
+        prefix = "🚦 limit"
+        if name == 'hold':
+            prefix = f"🔒 hold {result['hold_id']} of ${result['amount']:.2f}"
+        elif name == 'release':
+            prefix = f"🔓 released hold {result['hold_id']} of ${result['amount']:.2f}"
+        return (f"{prefix} - {result['account_number']}: daily limit {limit} "
+                f"(${result['used_today']:.2f} used today), ${result['held']:.2f} on hold, "
+                f"${result['available']:.2f} available")
+    if name == 'archive':
+        lines = [f"🗄️ Archived {result['archived']} row(s) to {result['directory']} "
+                 f"({result['archived_rows']} archived, {result['live_rows']} live)"]
+        if result['waiting']:
+            lines.append(f"   {result['waiting']} older row(s) stay live: history is archived in "
+                         f"whole audit segments of {result['segment_rows']} rows")
+        return "\n".join(lines)
+    if name == 'rebuild-rollups':
+        return (f"📚 Rollups rebuilt: {result['rows']} rows ({result['successful']} successful) "
+                f"over {result['days']} days and {result['accounts']} accounts")
+    if name == 'verify':
+        lines = [f"{'✅' if result['ok'] else '❌'} {result['rows']} rows, "
+                 f"{result['segments']} sealed segment(s) checked"]
+        lines += [f"   {problem}" for problem in result['problems']]
+        lines.append(f"   Audit root: {result['root']}")
+        return "\n".join(lines)
+    if name == 'transfer-info':
+        return (f"💸 transfer {result['transfer_id']}: ${result['amount']:.2f} "
+                f"{result['from_account']} -> {result['to_account']} at {format_ts(result['ts'])}")
+    if name == 'search':
+        lines = [f"{'Account':<10} {'Owner':<20} {'Balance':<15}", "-" * 50]
+        for acc in result['accounts']:
+            lines.append(f"{acc['account_number']:<10} {acc['owner']:<20} ${acc['balance']:<14.2f}")
+        lines.append(f"{len(result['accounts'])} match(es)")
+        return "\n".join(lines)
+    if name == 'customer':
+        lines = [f"👤 {result['owner']} (customer {result['customer_id']})"]
+        for acc in result['accounts']:
+            lines.append(f"   {acc['account_number']:<10} ${acc['balance']:.2f}")
+        lines.append(f"   Total holdings: ${result['total_holdings']:.2f}")
+        return "\n".join(lines)
+    if name == 'summary':
+        lines = [f"{'Account':<10} {'Owner':<20} {'Balance':<15}", "-" * 50]
+        for acc in result['accounts']:
+            lines.append(f"{acc['account_number']:<10} {acc['owner']:<20} ${acc['balance']:<14.2f}")
+        lines.append("-" * 50)
+        lines.append(f"{'TOTAL':<30} ${result['total_balance']:.2f}")
+        lines.append(f"Total Accounts: {result['total_accounts']}")
+        return "\n".join(lines)
+    if name == 'history':
+        lines = [f"{'Time':<20} {'Account':<10} {'Type':<15} {'Amount':<12} {'Status':<10}", "-" * 75]
+        for trans in result['transactions']:
+            timestamp = format_ts(trans['ts'])
+            amount_str = f"${trans['amount']:.2f}" if trans['amount'] else "N/A"
+            status = "Success" if trans['success'] else "Failed"
+            lines.append(f"{timestamp:<20} {trans['account_number']:<10} {trans['type']:<15} {amount_str:<12} {status:<10}")
+        return "\n".join(lines)
+    return str(result)
+
+
+def read_bulk_file(path):
+    """Yield (line_number, command, args) from a bulk operations file"""
+    with open(path, newline='') as f:
+        for line_number, row in enumerate(csv.reader(f), 1):
+            row = [field.strip() for field in row]
+            if not row or not row[0] or row[0].startswith('#'):
+                continue
+            yield line_number, row[0].lower(), row[1:]
+
+
+def run_bulk(system, path, stop_on_error=False, quiet=False):
+    """Apply every command in a bulk file, then save once. Returns (ok, failed)"""
+    ok = failed = 0
+    for line_number, name, args in read_bulk_file(path):
+        if name not in MUTATING_COMMANDS:
+            print(f"❌ line {line_number}: '{name}' is not allowed in bulk files")
+            failed += 1
+        else:
+            try:
+                result = run_command(system, name, args)
+                ok += 1
+                if not quiet:
+                    print(format_result(name, result))
+            except ValueError as e:
+                failed += 1
+                print(f"❌ line {line_number}: {name} failed: {e}")
+        if failed and stop_on_error:
+            break
+
+    if system.dirty:
+        system.save_data()
+    return ok, failed
+
+
+def build_parser():
+    """Build the argparse command line parser"""
+    parser = argparse.ArgumentParser(
+        prog="banking_cli.py",
+        description="Non-interactive banking operations")
+    parser.add_argument('--data-file', default="banking_data.json",
+                        help="banking data file (default: banking_data.json)")
+    parser.add_argument('--check-digits', choices=('on', 'off'),
+                        help="switch Luhn check digits on new account numbers on or off "
+                             "(stored with the book)")
+    parser.add_argument('--daemon', nargs='?', const='', metavar='HOST:PORT',
+                        help="send commands to a running banking_daemon.py instead of "
+                             "loading the data file")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('create', help="create a new account")
+    p.add_argument('first_name')
+    p.add_argument('last_name')
+    p.add_argument('initial_deposit', nargs='?', default="0")
+    p.add_argument('--customer', default="",
+                   help="add the account to this existing customer id (see 'customer')")
+
+    p = sub.add_parser('deposit', help="deposit into an account")
+    p.add_argument('account_number')
+    p.add_argument('amount')
+
+    p = sub.add_parser('withdraw', help="withdraw from an account")
+    p.add_argument('account_number')
+    p.add_argument('amount')
+
+    p = sub.add_parser('transfer', help="transfer between two accounts")
+    p.add_argument('from_account')
+    p.add_argument('to_account')
+    p.add_argument('amount')
+
+    sub.add_parser('summary', help="list all accounts and the total balance")
+    
+    p = sub.add_parser('search', help="find accounts by owner name prefix or account number")
+    p.add_argument('query')
+    p.add_argument('--limit', default="20", help="maximum number of matches")
+
+    p = sub.add_parser('customer', help="show all accounts of an account's owner")
+    p.add_argument('account_number')
+    
+    p = sub.add_parser('transfer-info', help="show both legs of a transfer by its id")
+    p.add_argument('transfer_id')
+    
+    p = sub.add_parser('limit', help="set an account's daily withdrawal limit")
+    p.add_argument('account_number')
+    p.add_argument('amount', nargs='?', default="none", help="limit, or 'none' to remove it")
+    
+    p = sub.add_parser('hold', help="put part of an account's balance on hold")
+    p.add_argument('account_number')
+    p.add_argument('amount')
+    
+    p = sub.add_parser('release', help="release a hold by its id")
+    p.add_argument('hold_id')
+    
+    p = sub.add_parser('run-job', help="apply interest or fees to every account (resumable)")
+    p.add_argument('kind', choices=sorted(SCHEDULES))
+    p.add_argument('--job-id', default="",
+                   help="id of the run; re-running an id resumes it (default: KIND-TODAY)")
+    p.add_argument('--chunk-size', default="10000", help="accounts per journal record")
+    
+    p = sub.add_parser('statements', help="write account statements for a period")
+    p.add_argument('--period', default="",
+                   help="YYYY-MM or YYYY-MM-DD:YYYY-MM-DD (default: last month)")
+    p.add_argument('--format', default='text', choices=FORMATS)
+    p.add_argument('--out', default="statements", help="output directory")
+    p.add_argument('--workers', default="0", help="worker processes (default: one per core)")
+    p.add_argument('--account', default="", help="only this account number")
+    
+    p = sub.add_parser('verify', help="check the transaction history's audit hash chain")
+    p.add_argument('--workers', default="0", help="worker processes (default: one per core)")
+    p.add_argument('--expect', default="", help="audit root recorded earlier to compare with")
+    
+    p = sub.add_parser('archive', help="move old transactions out of the data file")
+    p.add_argument('--days', default="365", help="archive transactions older than this many days")
+    
+    sub.add_parser('rebuild-rollups', help="recompute the rollup tables from the full history")
+    
+    p = sub.add_parser('checkpoint', help="write a snapshot of the book now")
+    p.add_argument('--compact', action='store_true',
+                   help="also empty the change journal (no other front end may be running)")
+
+    p = sub.add_parser('history', help="show recent transactions")
+    p.add_argument('--limit', default="10", help="number of transactions (0 = all)")
+
+    p = sub.add_parser('bulk', help="apply a CSV file of operations with a single save")
+    p.add_argument('file')
+    p.add_argument('--stop-on-error', action='store_true',
+                   help="stop at the first failing line")
+    p.add_argument('--quiet', action='store_true',
+                   help="only report failures and the final count")
+    return parser
+
+
+def command_args(args):
+    """Positional arguments of a parsed single command, in handler order"""
+    if args.command == 'create':
+        return [args.first_name, args.last_name, args.initial_deposit, args.customer]
+    if args.command == 'customer':
+        return [args.account_number]
+    if args.command == 'transfer-info':
+        return [args.transfer_id]
+    if args.command in ('limit', 'hold'):
+        return [args.account_number, args.amount]
+    if args.command == 'release':
+        return [args.hold_id]
+    if args.command == 'run-job':
+        return [args.kind, args.job_id, args.chunk_size]
+    if args.command == 'statements':
+        return [args.period, args.format, args.out, args.workers, args.account]
+    if args.command in ('deposit', 'withdraw'):
+        return [args.account_number, args.amount]
+    if args.command == 'transfer':
+        return [args.from_account, args.to_account, args.amount]
+    if args.command == 'verify':
+        return [args.workers, args.expect]
+    if args.command == 'archive':
+        return [args.days]
+    if args.command == 'history':
+        return [args.limit]
+    if args.command == 'search':
+        return [args.query, args.limit]
+    return []
+
+
+def run_via_daemon(args):
+    """Execute the parsed command against a running daemon"""
+    from banking_daemon import BankingClient, parse_address
+    
+    host, port = parse_address(args.daemon)
+    with BankingClient(host, port, data_file=args.data_file) as client:
+        if args.command == 'checkpoint':
+            client.call('save')
+            print("💾 Checkpoint written by the daemon")
+            return 0
+        if args.command != 'bulk':
+            try:
+                result = client.call(args.command, *command_args(args))
+            except ValueError as e:
+                print(f"❌ Error: {e}")
+                return 1
+            print(format_result(args.command, result))
+            return 0
+        
+        ok = failed = 0
+        for line_number, name, line_args in read_bulk_file(args.file):
+            if name not in MUTATING_COMMANDS:
+                print(f"❌ line {line_number}: '{name}' is not allowed in bulk files")
+                failed += 1
+            else:
+                try:
+                    result = client.call(name, *line_args)
+                    ok += 1
+                    if not args.quiet:
+                        print(format_result(name, result))
+                except ValueError as e:
+                    failed += 1
+                    print(f"❌ line {line_number}: {name} failed: {e}")
+            if failed and args.stop_on_error:
+                break
+        print(f"📊 Bulk run complete: {ok} succeeded, {failed} failed")
+        return 1 if failed else 0
+
+
+def main(argv=None):
+    """CLI entry point - returns a process exit code"""
+    args = build_parser().parse_args(argv)
+    if args.daemon is not None:
+        if args.check_digits is not None:
+            print("❌ --check-digits applies to the data file; run it without --daemon")
+            return 1
+        try:
+            return run_via_daemon(args)
+        except OSError as e:
+            print(f"❌ Cannot reach banking daemon: {e}")
+            return 1
+    
+    check_digits = None if args.check_digits is None else args.check_digits == 'on'
+    system = EnhancedBankingSystem(args.data_file, auto_save=False, check_digits=check_digits)
+
+    if args.command == 'checkpoint':
+        if args.compact:
+            system.compact_journal()
+            print("💾 Checkpoint written and change journal compacted")
+        else:
+            system.save_data()
+            print("💾 Checkpoint written")
+        return 0
+
+    if args.command == 'bulk':
+        try:
+            ok, failed = run_bulk(system, args.file, args.stop_on_error, args.quiet)
+        except OSError as e:
+            print(f"❌ Cannot read bulk file: {e}")
+            return 1
+        print(f"📊 Bulk run complete: {ok} succeeded, {failed} failed")
+        return 1 if failed else 0
+
+    try:
+        result = run_command(system, args.command, command_args(args))
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+    system.checkpoint_if_due()
+    print(format_result(args.command, result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
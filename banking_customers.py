@@ -0,0 +1,117 @@
+# banking_customers.py - Customer Registry
+"""
+One shared BankAccountOwner per customer instead of one per account.
+
+A customer is identified by an opaque customer_id, a random uuid4 drawn
+when the customer is created and stored in every account record of the
+journal and the snapshot. Two people with the same name are two customers;
+the name is only a search key (see banking_index.OwnerIndex). Records
+written before ids were stored carry no id; they fall back to an id
+derived from the normalized name, so every front end replaying them still
+agrees:
+
+    "Jane  Smith" -> normalize -> "jane smith" -> uuid5 -> "3f2a9c0d17be"
+
+The registry interns owners by id (all accounts of a customer point to the
+same owner object), keeps customer -> account numbers links for per-customer
+queries, and serializes every customer once in the snapshot:
+
+    "customers": {"9b1e0c...": {"first_name": "Jane", "last_name": "Smith"}}
+    "accounts":  {"345678": {"account_number": 345678, "customer_id": "9b1e0c...", ...}}
+"""
+
+import uuid
+from Model import BankAccountOwner
+from banking_index import normalize_name
+
+CUSTOMER_NAMESPACE = uuid.UUID('6f1c1f8e-3b0a-4d4e-9a57-2f3c8d1e0b42')
+
+
+def new_customer_id():
+    """Opaque id for a new customer"""
+    return uuid.uuid4().hex
+
+
+def legacy_customer_id(first_name, last_name):
+    """Name-derived id of a customer recorded before ids were stored"""
+    return uuid.uuid5(CUSTOMER_NAMESPACE, normalize_name(f"{first_name} {last_name}")).hex[:12]
+
+
+class CustomerRegistry:
+    """Interned account owners and their accounts"""
+
+    def __init__(self):
+        self._owners = {}
+        # customer id -> set of account numbers
+        self._accounts = {}
+        # account number -> customer id
+        self._customer_of = {}
+
+    def __len__(self):
+        return len(self._owners)
+
+    def intern(self, first_name, last_name, customer_id=None):
+        """Return the shared owner object for a customer, creating (or renaming) it if needed"""
+        customer_id = customer_id or legacy_customer_id(first_name, last_name)
+        owner = self._owners.get(customer_id)
+        if owner is None or (owner.first_name, owner.last_name) != (first_name, last_name):
+            owner = self._owners[customer_id] = BankAccountOwner(first_name, last_name, customer_id)
+        return owner
+
+    def get(self, customer_id):
+        """Owner object of a customer, or None"""
+        return self._owners.get(customer_id)
+
+    def load(self, customers):
+        """Intern the customers section of a snapshot"""
+        for customer_id, record in customers.items():
+            self.intern(record['first_name'], record['last_name'], customer_id)
+
+    def to_data(self):
+        """Customers section of a snapshot"""
+        return {customer_id: {'first_name': owner.first_name, 'last_name': owner.last_name}
+                for customer_id, owner in self._owners.items()}
+
+    def rebuild(self, accounts):
+        """Relink all accounts from scratch and forget customers without accounts"""
+        self._accounts = {}
+        self._customer_of = {}
+        for acc_num, account in accounts.items():
+            self._link(acc_num, account.account_owner)
+        self._owners = {customer_id: owner for customer_id, owner in self._owners.items()
+                        if customer_id in self._accounts}
+
+    def update(self, accounts, changed):
+        """Relink the given account numbers (created, renamed or deleted)"""
+        for acc_num in changed:
+            account = accounts.get(acc_num)
+            new_id = account.account_owner.customer_id if account is not None else None
+            if new_id == self._customer_of.get(acc_num):
+                continue
+            self._unlink(acc_num)
+            if account is not None:
+                self._link(acc_num, account.account_owner)
+
+    def _link(self, acc_num, owner):
+        customer_id = owner.customer_id
+        self._owners.setdefault(customer_id, owner)
+        self._accounts.setdefault(customer_id, set()).add(acc_num)
+        self._customer_of[acc_num] = customer_id
+
+    def _unlink(self, acc_num):
+        customer_id = self._customer_of.pop(acc_num, None)
+        if customer_id is None:
+            return
+        numbers = self._accounts.get(customer_id)
+        numbers.discard(acc_num)
+        if not numbers:
+            del self._accounts[customer_id]
+            self._owners.pop(customer_id, None)
+
+    def customer_of(self, acc_num):
+        """Customer id owning an account, or None"""
+        return self._customer_of.get(acc_num)
+
+    def accounts_of(self, customer_id):
+        """Account numbers of a customer"""
+        return sorted(self._accounts.get(customer_id, ()))
@@ -0,0 +1,301 @@
+# banking_daemon.py - Persistent Banking Service
+"""
+Long-running process that keeps the book (accounts and transaction history)
+loaded in memory and serves local clients over a small JSON-lines protocol.
+
+Start it once:
+
+    python banking_daemon.py --port 8765
+
+Then point short-lived tools at it instead of re-reading banking_data.json:
+
+    python banking_cli.py --daemon deposit 123456 50
+    BankingDashboard(client=BankingClient())
+
+Protocol: one JSON object per line in each direction.
+
+    -> {"token": "...", "command": "deposit", "args": ["123456", "50"]}
+    <- {"ok": true, "result": {...}}
+    <- {"ok": false, "error": "Insufficient balance"}
+
+The daemon only listens on 127.0.0.1. On start it writes a random token to
+a file only its user can read (banking_data.json -> banking_data.token,
+mode 0600) and rejects every request that does not carry it, so other local
+users cannot drive the book; BankingClient reads the token from that file.
+
+Besides the CLI commands (create, deposit, withdraw, transfer, summary,
+history, search, customer, transfer-info, limit, hold, release, run-job,
+statements, verify, archive, rebuild-rollups) the daemon understands ping,
+dashboard (balances, customers, rollups and transfer totals - no history),
+snapshot (the whole book), save, reload, alerts (takes the queued fraud
+alerts) and shutdown.
+
+Every operation is committed to the change journal immediately; the snapshot
+is checkpointed in the background (checked every flush_interval seconds) and
+on shutdown. Operations committed by other front
+ends are merged from the change journal before each request is served.
+"""
+
+import argparse
+import hmac
+import json
+import os
+import secrets
+import socket
+import socketserver
+import threading
+from Enhanced_BankingApp import EnhancedBankingSystem
+from banking_cli import run_command, MUTATING_COMMANDS
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+def token_path_for(data_file):
+    """Token file of the daemon serving a given data file"""
+    return os.path.splitext(data_file)[0] + ".token"
+
+
+def write_token(path):
+    """Create a fresh random token in a file only the current user can read"""
+    token = secrets.token_hex(32)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        # O_CREAT leaves the mode of an existing file alone
+        os.chmod(path, 0o600)
+        os.write(fd, token.encode('ascii'))
+    finally:
+        os.close(fd)
+    return token
+
+
+def read_token(path):
+    """Read a daemon token; raises ValueError if others may read the file"""
+    if os.name == 'posix' and os.stat(path).st_mode & 0o077:
+        raise ValueError(f"Daemon token file {path} must only be readable by its owner (chmod 600)")
+    with open(path) as f:
+        return f.read().strip()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Serve JSON-lines requests for one client connection"""
+
+    def handle(self):
+        for line in self.rfile:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+                daemon = self.server.banking_daemon
+                if not daemon.authorized(request.get('token')):
+                    raise PermissionError("Unauthorized: wrong or missing daemon token")
+                result = daemon.execute(request.get('command'), request.get('args', []))
+                response = {'ok': True, 'result': result}
+            except (ValueError, PermissionError) as e:
+                response = {'ok': False, 'error': str(e)}
+            except Exception as e:
+                response = {'ok': False, 'error': f"Internal error: {e}"}
+            self.wfile.write((json.dumps(response) + "\n").encode('utf-8'))
+            self.wfile.flush()
+            if self.server.banking_daemon.stopping:
+                break
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class BankingDaemon:
+    """Keeps an EnhancedBankingSystem hot in memory and serves it to clients"""
+
+    def __init__(self, data_file="banking_data.json", port=DEFAULT_PORT, flush_interval=1.0):
+        self.system = EnhancedBankingSystem(data_file, auto_save=False)
+        self.flush_interval = flush_interval
+        self.lock = threading.RLock()
+        self.stopping = False
+        self._stop_event = threading.Event()
+
+        # Loopback only: the book is never reachable from the network
+        self.server = _ThreadingServer((DEFAULT_HOST, port), _RequestHandler)
+        self.server.banking_daemon = self
+        self.address = self.server.server_address
+        self.token_file = token_path_for(data_file)
+        self._token = write_token(self.token_file)
+
+    def authorized(self, token):
+        return isinstance(token, str) and hmac.compare_digest(token, self._token)
+
+    def dashboard_data(self):
+        """What the dashboard reads: balances, customers, rollups and transfer totals"""
+        system = self.system
+        history = system.transaction_history
+        return {
+            'accounts': {acc_num: {'account_number': acc_num,
+                                   'customer_id': account.account_owner.customer_id,
+                                   'balance': account.account_balance}
+                         for acc_num, account in system.accounts.items()},
+            'customers': system.customers.to_data(),
+            'rollups': system.rollups.to_data(),
+            'transfers': {'volume': history.transfer_volume, 'count': history.transfer_count}
+        }
+
+    def flush(self):
+        """Checkpoint pending changes into the data file"""
+        with self.lock:
+            if self.system.dirty:
+                self.system.save_data()
+
+    def checkpoint_if_due(self):
+        with self.lock:
+            self.system.checkpoint_if_due()
+
+    def execute(self, command, args):
+        """Run one request against the in-memory book"""
+        if not isinstance(args, list):
+            raise ValueError("'args' must be a list")
+        args = [str(arg) for arg in args]
+
+        with self.lock:
+            if command == 'ping':
+                return 'pong'
+            if command == 'shutdown':
+                self.stop()
+                return 'stopping'
+            if command == 'save':
+                self.flush()
+                return 'saved'
+            if command == 'reload':
+                self.flush()
+                self.system.load_data()
+                return 'reloaded'
+
+            if command == 'alerts':
+                return self.system.fraud_detector.drain()
+
+            self.system.sync_changes()
+            if command == 'dashboard':
+                return self.dashboard_data()
+            if command == 'snapshot':
+                return self.system.to_data()
+            result = run_command(self.system, command, args)
+            if command in MUTATING_COMMANDS and self.flush_interval <= 0:
+                self.flush()
+            return result
+
+    def _flush_loop(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.checkpoint_if_due()
+
+    def serve_forever(self):
+        """Serve requests until stop() is called"""
+        if self.flush_interval > 0:
+            threading.Thread(target=self._flush_loop, daemon=True).start()
+        try:
+            self.server.serve_forever()
+        finally:
+            self.flush()
+            self.server.server_close()
+            try:
+                os.remove(self.token_file)
+            except OSError:
+                pass
+
+    def stop(self):
+        """Ask the daemon to stop after the current request"""
+        self.stopping = True
+        self._stop_event.set()
+        threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+
+class BankingClient:
+    """Client for a running BankingDaemon (one persistent connection)"""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=5.0,
+                 data_file="banking_data.json"):
+        self.address = (host, port)
+        self.timeout = timeout
+        # The daemon serving data_file writes its token next to it
+        self.token_file = token_path_for(data_file)
+        self._token = None
+        self._sock = None
+        self._file = None
+
+    def connect(self):
+        if self._sock is None:
+            self._sock = socket.create_connection(self.address, timeout=self.timeout)
+            self._file = self._sock.makefile('rwb')
+        return self
+
+    def close(self):
+        if self._sock is not None:
+            self._file.close()
+            self._sock.close()
+            self._sock = None
+            self._file = None
+
+    def __enter__(self):
+        return self.connect()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def call(self, command, *args):
+        """Send a command and return its result; raises ValueError on failure"""
+        self.connect()
+        if self._token is None:
+            self._token = read_token(self.token_file)
+        request = {'token': self._token, 'command': command, 'args': [str(arg) for arg in args]}
+        self._file.write((json.dumps(request) + "\n").encode('utf-8'))
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            self.close()
+            raise ConnectionError("Banking daemon closed the connection")
+        response = json.loads(line)
+        if not response.get('ok'):
+            raise ValueError(response.get('error', "Unknown error"))
+        return response['result']
+
+    def is_running(self):
+        """True if a daemon answers at this address"""
+        try:
+            return self.call('ping') == 'pong'
+        except OSError:
+            self.close()
+            return False
+
+
+def parse_address(text):
+    """Parse 'host:port', 'port' or '' into a (host, port) tuple"""
+    if not text:
+        return DEFAULT_HOST, DEFAULT_PORT
+    host, _, port = text.rpartition(':')
+    return host or DEFAULT_HOST, int(port)
+
+
+def main(argv=None):
+    """Run the banking daemon in the foreground"""
+    parser = argparse.ArgumentParser(prog="banking_daemon.py",
+                                     description="Serve the banking book from memory")
+    parser.add_argument('--data-file', default="banking_data.json")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help="port on 127.0.0.1 to listen on")
+    parser.add_argument('--flush-interval', type=float, default=1.0,
+                        help="seconds between background checkpoint checks "
+                             "(0 = checkpoint after every change)")
+    args = parser.parse_args(argv)
+
+    daemon = BankingDaemon(args.data_file, args.port, args.flush_interval)
+    host, port = daemon.address
+    print(f"🏦 Banking daemon serving {args.data_file} on {host}:{port} (Ctrl+C to stop)")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        print("\n💾 Saving and shutting down...")
+    print("👋 Banking daemon stopped.")
+
+
+if __name__ == "__main__":
+    main()
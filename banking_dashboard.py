@@ -1,28 +1,94 @@
 # banking_dashboard.py - Interactive Statistics Dashboard
 
-import json
 import datetime
-from collections import defaultdict
-import os
+from Enhanced_BankingApp import restore_accounts
+from banking_archive import HistoryArchive, archive_dir_for
+from banking_customers import CustomerRegistry
+from banking_journal import ChangeJournal, JournalWatcher, journal_path_for, read_snapshot
+from banking_records import TransactionLog, format_day
+from banking_rollups import Rollups
 
 class BankingDashboard:
-    def __init__(self, data_file="banking_data.json"):
+    def __init__(self, data_file="banking_data.json", client=None):
         self.data_file = data_file
+        # Optional BankingClient: read balances and totals from a running
+        # banking daemon instead of parsing the data file
+        self.client = client
         self.load_data()
     
     def load_data(self):
         """Load banking data for analysis"""
         self.accounts = {}
-        self.transaction_history = []
+        self.customers = {}
+        # Totals come from the rollup tables, not from the raw rows (see banking_rollups)
+        self.rollups = Rollups()
+        self.transfer_volume = 0.0
+        self.transfer_count = 0
         
-        if os.path.exists(self.data_file):
+        if self.client is not None:
             try:
-                with open(self.data_file, 'r') as f:
-                    data = json.load(f)
-                self.accounts = data.get('accounts', {})
-                self.transaction_history = data.get('transaction_history', [])
-            except:
-                pass
+                # Balances and totals only: the daemon never ships the history
+                data = self.client.call('dashboard')
+                self.accounts = data['accounts']
+                self.customers = data['customers']
+                self.rollups = Rollups.from_data(data['rollups'])
+                self.transfer_volume = data['transfers']['volume']
+                self.transfer_count = data['transfers']['count']
+                return
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Banking daemon unavailable ({e}), reading {self.data_file}")
+        
+        try:
+            self.read_book()
+        except (OSError, ValueError, KeyError) as e:
+            print(f"❌ Could not load {self.data_file}: {e}")
+    
+    def read_book(self):
+        """Load the snapshot and replay the journal after it, without writing anything.
+        
+        Unlike opening an EnhancedBankingSystem this takes no allocator block or
+        lock and never checkpoints, so it is safe next to running front ends.
+        """
+        data, _ = read_snapshot(self.data_file)
+        if data is None:
+            return
+        customers = CustomerRegistry()
+        accounts = restore_accounts(data, customers)
+        history = TransactionLog.from_data(data.get('transaction_history', []))
+        
+        # Changes committed after the snapshot was written
+        journal = ChangeJournal(journal_path_for(self.data_file))
+        offset = data.get('journal_offset', 0)
+        if journal.size() < offset:
+            offset = 0
+        watcher = JournalWatcher(journal, origin=None, offset=offset)
+        watcher.make_owner = customers.intern
+        watcher.poll(accounts, history)
+        customers.rebuild(accounts)
+        
+        rollups = Rollups.from_data(data['rollups']) if 'rollups' in data else None
+        if rollups is None or not (history.archived_rows <= rollups.through
+                                   <= history.archived_rows + len(history)):
+            rollups = Rollups()
+            rollups.rebuild(HistoryArchive(archive_dir_for(self.data_file)), history)
+        else:
+            rollups.catch_up(history)
+        
+        self.accounts = {str(acc_num): {'account_number': acc_num,
+                                        'customer_id': account.account_owner.customer_id,
+                                        'balance': account.account_balance}
+                         for acc_num, account in accounts.items()}
+        self.customers = customers.to_data()
+        self.rollups = rollups
+        self.transfer_volume = history.transfer_volume
+        self.transfer_count = history.transfer_count
+    
+    def owner_name(self, acc_data):
+        """Owner name of an account record (customers are stored separately)"""
+        customer = self.customers.get(acc_data.get('customer_id'))
+        if customer is not None:
+            return f"{customer['first_name']} {customer['last_name']}"
+        return f"{acc_data['owner_first_name']} {acc_data['owner_last_name']}"
     
     def get_total_assets(self):
         """Calculate total assets across all accounts"""
@@ -34,46 +100,29 @@ class BankingDashboard:
     
     def get_transaction_stats(self):
         """Get transaction statistics"""
-        if not self.transaction_history:
+        total, successful = self.rollups.totals()
+        if not total:
             return {}
         
-        stats = {
-            'total_transactions': len(self.transaction_history),
-            'successful_transactions': 0,
-            'failed_transactions': 0,
-            'total_deposits': 0,
-            'total_withdrawals': 0,
-            'total_transfers': 0
+        return {
+            'total_transactions': total,
+            'successful_transactions': successful,
+            'failed_transactions': total - successful,
+            'total_deposits': self.rollups.type_amount('DEPOSIT'),
+            'total_withdrawals': self.rollups.type_amount('WITHDRAW'),
+            # Each transfer once (not once per leg), kept up to date by the log
+            'total_transfers': self.transfer_volume,
+            'transfer_count': self.transfer_count
         }
-        
-        for trans in self.transaction_history:
-            if trans['success']:
-                stats['successful_transactions'] += 1
-                if trans['type'] == 'DEPOSIT':
-                    stats['total_deposits'] += trans['amount']
-                elif trans['type'] == 'WITHDRAW':
-                    stats['total_withdrawals'] += trans['amount']
-                elif 'TRANSFER' in trans['type']:
-                    stats['total_transfers'] += trans['amount']
-            else:
-                stats['failed_transactions'] += 1
-        
-        return stats
     
     def get_daily_activity(self):
         """Get daily transaction activity"""
-        daily_stats = defaultdict(int)
-        
-        for trans in self.transaction_history:
-            date = trans['timestamp'][:10]  # Extract date part
-            daily_stats[date] += 1
-        
-        return dict(daily_stats)
+        return {day: cell[0] for day, cell in self.rollups.days.items()}
     
     def get_top_accounts_by_balance(self, top_n=5):
         """Get top accounts by balance"""
         accounts_list = [
-            (acc_num, acc_data['owner_first_name'] + ' ' + acc_data['owner_last_name'], acc_data['balance'])
+            (acc_num, self.owner_name(acc_data), acc_data['balance'])
             for acc_num, acc_data in self.accounts.items()
         ]
         
@@ -105,6 +154,7 @@ class BankingDashboard:
             print(f"   💵 Total Deposits: ${trans_stats['total_deposits']:,.2f}")
             print(f"   💸 Total Withdrawals: ${trans_stats['total_withdrawals']:,.2f}")
             print(f"   🔄 Transfer Volume: ${trans_stats['total_transfers']:,.2f}")
+            print(f"   🔁 Transfers: {trans_stats['transfer_count']:,}")
         
         # Top Accounts
         top_accounts = self.get_top_accounts_by_balance()
@@ -119,9 +169,9 @@ class BankingDashboard:
         if daily_activity:
             print(f"\n📅 RECENT ACTIVITY (Last 7 days):")
             sorted_days = sorted(daily_activity.items(), reverse=True)[:7]
-            for date, count in sorted_days:
+            for day, count in sorted_days:
                 bar = "█" * min(count, 20)
-                print(f"   {date}: {bar} ({count} transactions)")
+                print(f"   {format_day(day)}: {bar} ({count} transactions)")
         
         print("="*80)
     
@@ -135,23 +185,17 @@ class BankingDashboard:
         
         print(f"\n📊 ACCOUNT ANALYSIS - {account_number}")
         print("="*60)
-        print(f"👤 Owner: {account['owner_first_name']} {account['owner_last_name']}")
+        print(f"👤 Owner: {self.owner_name(account)}")
         print(f"💰 Current Balance: ${account['balance']:,.2f}")
         
-        # Transaction history for this account
-        account_transactions = [
-            t for t in self.transaction_history 
-            if t['account_number'] == account_number
-        ]
+        # Transaction totals for this account (summed over its monthly rollups)
+        count, deposits, withdrawals, _ = self.rollups.account_totals(account_number)
         
-        if account_transactions:
-            deposits = sum(t['amount'] for t in account_transactions if t['type'] == 'DEPOSIT' and t['success'])
-            withdrawals = sum(t['amount'] for t in account_transactions if t['type'] == 'WITHDRAW' and t['success'])
-            
+        if count:
             print(f"📈 Total Deposits: ${deposits:,.2f}")
             print(f"📉 Total Withdrawals: ${withdrawals:,.2f}")
             print(f"🔄 Net Activity: ${deposits - withdrawals:,.2f}")
-            print(f"📊 Transaction Count: {len(account_transactions)}")
+            print(f"📊 Transaction Count: {count}")
         
         print("="*60)
     
@@ -174,6 +218,16 @@ class BankingDashboard:
             f.write(f"Total Accounts: {account_count}\n")
             f.write(f"Average Balance: ${total_assets/max(account_count, 1):,.2f}\n\n")
             
+            # Transaction stats
+            trans_stats = self.get_transaction_stats()
+            if trans_stats:
+                f.write("TRANSACTIONS:\n")
+                f.write(f"Total Transactions: {trans_stats['total_transactions']}\n")
+                f.write(f"Failed Transactions: {trans_stats['failed_transactions']}\n")
+                f.write(f"Total Deposits: ${trans_stats['total_deposits']:,.2f}\n")
+                f.write(f"Total Withdrawals: ${trans_stats['total_withdrawals']:,.2f}\n")
+                f.write(f"Transfer Volume: ${trans_stats['total_transfers']:,.2f}\n\n")
+            
             # Top accounts
             top_accounts = self.get_top_accounts_by_balance()
             f.write("TOP ACCOUNTS:\n")
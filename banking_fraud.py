@@ -0,0 +1,130 @@
+# banking_fraud.py - Streaming Fraud / Anomaly Screening
+"""
+Screens committed transactions as they happen, using per-account rules:
+
+- velocity        velocity_count transactions within velocity_window_ms
+- debit amount    withdrawals and outgoing transfers summing to more than
+                  debit_limit within debit_window_ms
+- failed bursts   failed_transfer_count TRANSFER_FAILED rows within
+                  failed_transfer_window_ms
+
+Every account gets a small AccountWindows state:
+
+- Ring buffers (deque with maxlen) of the last N timestamps answer the
+  count rules in O(1). The buffer is full and its oldest entry is inside
+  the window exactly when N events happened within the window.
+- A time-ordered deque of debits with a running total answers the amount
+  rule. Each debit is appended and expired once, so the cost is O(1)
+  amortized.
+
+Flagged events are put on a queue.Queue (thread-safe, bounded) as
+JSON-friendly dicts. Each rule alerts at most once per window per
+account, so a burst raises one alert, not one per transaction.
+
+EnhancedBankingSystem screens the rows of every operation it commits. See
+publish_changes. Each front end screens the operations it commits itself.
+"""
+
+import queue
+from collections import deque
+
+
+class FraudRules:
+    """Thresholds of the screening rules (all windows in milliseconds)"""
+
+    def __init__(self, velocity_count=10, velocity_window_ms=60_000,
+                 debit_limit=10_000.0, debit_window_ms=3_600_000,
+                 failed_transfer_count=3, failed_transfer_window_ms=300_000):
+        self.velocity_count = velocity_count
+        self.velocity_window_ms = velocity_window_ms
+        self.debit_limit = debit_limit
+        self.debit_window_ms = debit_window_ms
+        self.failed_transfer_count = failed_transfer_count
+        self.failed_transfer_window_ms = failed_transfer_window_ms
+
+
+DEBIT_TYPES = frozenset(('WITHDRAW', 'TRANSFER_OUT'))
+
+
+class AccountWindows:
+    """Sliding-window state of one account"""
+
+    __slots__ = ('recent', 'failures', 'debits', 'debit_total', 'quiet_until')
+
+    def __init__(self, rules):
+        self.recent = deque(maxlen=rules.velocity_count)
+        self.failures = deque(maxlen=rules.failed_transfer_count)
+        self.debits = deque()
+        self.debit_total = 0.0
+        # rule -> ts before which that rule does not alert again
+        self.quiet_until = {}
+
+
+class FraudDetector:
+    """Applies FraudRules to a stream of transaction rows"""
+
+    def __init__(self, rules=None, max_alerts=10_000):
+        self.rules = rules or FraudRules()
+        self.alerts = queue.Queue(maxsize=max_alerts)
+        self.windows = {}
+        self.screened = 0
+        self.dropped_alerts = 0
+
+    def screen_many(self, transactions):
+        for transaction in transactions:
+            self.screen(transaction)
+
+    def screen(self, transaction):
+        """Update the account's windows with one row and raise any alerts"""
+        rules = self.rules
+        acc_num = transaction['account_number']
+        state = self.windows.get(acc_num)
+        if state is None:
+            state = self.windows[acc_num] = AccountWindows(rules)
+        ts = transaction['ts']
+        self.screened += 1
+
+        recent = state.recent
+        recent.append(ts)
+        if len(recent) == recent.maxlen and ts - recent[0] < rules.velocity_window_ms:
+            self._alert(state, 'velocity', acc_num, ts, rules.velocity_window_ms,
+                        f"{len(recent)} transactions within {ts - recent[0]} ms")
+
+        kind = transaction['type']
+        if kind == 'TRANSFER_FAILED':
+            failures = state.failures
+            failures.append(ts)
+            if (len(failures) == failures.maxlen
+                    and ts - failures[0] < rules.failed_transfer_window_ms):
+                self._alert(state, 'failed_transfers', acc_num, ts, rules.failed_transfer_window_ms,
+                            f"{len(failures)} failed transfers within {ts - failures[0]} ms")
+        elif kind in DEBIT_TYPES and transaction['success']:
+            debits = state.debits
+            amount = transaction['amount'] or 0.0
+            debits.append((ts, amount))
+            state.debit_total += amount
+            horizon = ts - rules.debit_window_ms
+            while debits and debits[0][0] <= horizon:
+                state.debit_total -= debits.popleft()[1]
+            if state.debit_total > rules.debit_limit:
+                self._alert(state, 'debit_amount', acc_num, ts, rules.debit_window_ms,
+                            f"${state.debit_total:,.2f} debited within the window")
+
+    def _alert(self, state, rule, acc_num, ts, window_ms, detail):
+        if ts < state.quiet_until.get(rule, 0):
+            return
+        state.quiet_until[rule] = ts + window_ms
+        try:
+            self.alerts.put_nowait({'rule': rule, 'account_number': acc_num, 'ts': ts, 'detail': detail})
+        except queue.Full:
+            self.dropped_alerts += 1
+
+    def drain(self, limit=None):
+        """Take the queued alerts (up to limit), oldest first"""
+        taken = []
+        while limit is None or len(taken) < limit:
+            try:
+                taken.append(self.alerts.get_nowait())
+            except queue.Empty:
+                break
+        return taken
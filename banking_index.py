@@ -0,0 +1,227 @@
+# banking_index.py - Owner Name Index
+"""
+Finds accounts by owner name without scanning every account.
+
+Each account is indexed under two normalized keys (case-folded, single
+spaces): "first last" and "last first", so typing either a first or a last
+name finds it. Keys live in
+
+- a hash map: key -> set of account numbers (exact lookups, O(1))
+- a sorted key list searched with bisect (prefix lookups, O(log n + hits))
+
+The index is kept up to date incrementally from the set of changed account
+numbers that every journal replay returns.
+
+AccountOrder keeps the account numbers (and "last first" owner names) in
+sorted lists as well, so a browser can fetch one page of the book in
+O(log n + page) instead of sorting every account for each view.
+"""
+
+import bisect
+import heapq
+
+
+def normalize_name(text):
+    """Case-insensitive, whitespace-insensitive form of a name or query"""
+    return " ".join(text.casefold().split())
+
+
+def owner_keys(owner):
+    """Index keys for an account owner"""
+    first = normalize_name(owner.first_name)
+    last = normalize_name(owner.last_name)
+    return {f"{first} {last}", f"{last} {first}"}
+
+
+def account_matches(account, query):
+    """Would search_accounts(query) find this account? (used to filter live updates)"""
+    query = normalize_name(query)
+    if not query:
+        return True
+    if query.isdigit() and str(account.account_number).startswith(query):
+        return True
+    return any(key.startswith(query) for key in owner_keys(account.account_owner))
+
+
+class OwnerIndex:
+    """Exact and prefix owner-name lookups over account numbers"""
+
+    def __init__(self):
+        self._accounts_by_key = {}
+        self._sorted_keys = []
+        # account number -> keys it is indexed under
+        self._keys_by_account = {}
+
+    def __len__(self):
+        return len(self._keys_by_account)
+
+    def rebuild(self, accounts):
+        """Index all accounts from scratch (after a full load)"""
+        self._accounts_by_key = {}
+        self._keys_by_account = {}
+        for acc_num, account in accounts.items():
+            keys = owner_keys(account.account_owner)
+            self._keys_by_account[acc_num] = keys
+            for key in keys:
+                self._accounts_by_key.setdefault(key, set()).add(acc_num)
+        self._sorted_keys = sorted(self._accounts_by_key)
+
+    def update(self, accounts, changed):
+        """Re-index the given account numbers (created, renamed or deleted)"""
+        for acc_num in changed:
+            account = accounts.get(acc_num)
+            new_keys = owner_keys(account.account_owner) if account is not None else set()
+            old_keys = self._keys_by_account.get(acc_num, set())
+            if new_keys == old_keys:
+                continue
+            for key in old_keys - new_keys:
+                self._remove_key(key, acc_num)
+            for key in new_keys - old_keys:
+                self._add_key(key, acc_num)
+            if account is None:
+                self._keys_by_account.pop(acc_num, None)
+            else:
+                self._keys_by_account[acc_num] = new_keys
+
+    def _add_key(self, key, acc_num):
+        numbers = self._accounts_by_key.get(key)
+        if numbers is None:
+            numbers = self._accounts_by_key[key] = set()
+            bisect.insort(self._sorted_keys, key)
+        numbers.add(acc_num)
+
+    def _remove_key(self, key, acc_num):
+        numbers = self._accounts_by_key.get(key)
+        if numbers is None:
+            return
+        numbers.discard(acc_num)
+        if not numbers:
+            del self._accounts_by_key[key]
+            i = bisect.bisect_left(self._sorted_keys, key)
+            if i < len(self._sorted_keys) and self._sorted_keys[i] == key:
+                del self._sorted_keys[i]
+
+    def find(self, name):
+        """Account numbers whose owner is exactly `name` ("first last" or "last first")"""
+        return sorted(self._accounts_by_key.get(normalize_name(name), ()))
+
+    def search(self, prefix, limit=50):
+        """Account numbers whose owner name starts with `prefix`, in name order (limit=None: all)"""
+        prefix = normalize_name(prefix)
+        if not prefix:
+            return []
+        found = {}
+        i = bisect.bisect_left(self._sorted_keys, prefix)
+        while i < len(self._sorted_keys) and (limit is None or len(found) < limit):
+            key = self._sorted_keys[i]
+            if not key.startswith(prefix):
+                break
+            for acc_num in sorted(self._accounts_by_key[key]):
+                found[acc_num] = None
+            i += 1
+        return list(found)[:limit]
+
+
+def sort_name(account):
+    """Name sort key: normalized last name, then first name"""
+    owner = account.account_owner
+    return f"{normalize_name(owner.last_name)} {normalize_name(owner.first_name)}"
+
+
+class AccountOrder:
+    """Account numbers kept sorted by number and by owner name for paged views"""
+
+    SORTS = ('number', 'name', 'balance')
+
+    def __init__(self):
+        self._numbers = []
+        # sorted [(sort name, account number)]
+        self._names = []
+        # account number -> sort name
+        self._name_of = {}
+
+    def rebuild(self, accounts):
+        self._numbers = sorted(accounts)
+        self._name_of = {acc_num: sort_name(account) for acc_num, account in accounts.items()}
+        self._names = sorted((name, acc_num) for acc_num, name in self._name_of.items())
+
+    def update(self, accounts, changed):
+        """Re-position the given account numbers (created, renamed or deleted)"""
+        for acc_num in changed:
+            account = accounts.get(acc_num)
+            i = bisect.bisect_left(self._numbers, acc_num)
+            present = i < len(self._numbers) and self._numbers[i] == acc_num
+            if account is None and present:
+                del self._numbers[i]
+            elif account is not None and not present:
+                self._numbers.insert(i, acc_num)
+
+            old_name = self._name_of.get(acc_num)
+            new_name = sort_name(account) if account is not None else None
+            if old_name == new_name:
+                continue
+            if old_name is not None:
+                del self._names[bisect.bisect_left(self._names, (old_name, acc_num))]
+                del self._name_of[acc_num]
+            if new_name is not None:
+                bisect.insort(self._names, (new_name, acc_num))
+                self._name_of[acc_num] = new_name
+
+    def page(self, accounts, sort_by="number", descending=False, offset=0, limit=50):
+        """Account numbers of one page of the whole book.
+
+        number/name: O(page) slices of the maintained sorted lists.
+        balance: heapq top-k, O(n log(offset + limit)) - balances change on
+        every operation, so keeping them sorted would cost more than it saves.
+        """
+        if sort_by == 'balance':
+            pick = heapq.nlargest if descending else heapq.nsmallest
+            top = pick(offset + limit, accounts.values(),
+                       key=lambda acc: (acc.account_balance, acc.account_number))
+            return [acc.account_number for acc in top[offset:]]
+        if sort_by == 'number':
+            order = self._numbers
+        elif sort_by == 'name':
+            order = self._names
+        else:
+            raise ValueError(f"Unknown sort order: {sort_by}")
+
+        if descending:
+            end = len(order) - offset
+            window = order[max(end - limit, 0):max(end, 0)][::-1]
+        else:
+            window = order[offset:offset + limit]
+        return window if order is self._numbers else [acc_num for _, acc_num in window]
+
+    def numbers_after(self, acc_num, limit=50):
+        """Up to `limit` account numbers greater than acc_num (None: from the start), ascending"""
+        start = 0 if acc_num is None else bisect.bisect_right(self._numbers, acc_num)
+        return self._numbers[start:start + limit]
+
+    def numbers_with_prefix(self, digits, limit=50):
+        """Account numbers whose decimal form starts with `digits`, ascending (limit=None: all)"""
+        # No account number is written with a leading zero
+        if not digits.isdigit() or digits.startswith('0'):
+            return []
+        found = []
+        value = int(digits)
+        width = len(digits)
+        # An account number with n digits starts with `digits` iff it lies in
+        # [value * 10^(n-width), (value + 1) * 10^(n-width))
+        for extra in range(0, 19 - width):
+            if limit is not None and len(found) >= limit:
+                break
+            scale = 10 ** extra
+            low, high = value * scale, (value + 1) * scale
+            if self._numbers and low > self._numbers[-1]:
+                break
+            # Never collect a number twice, even if two ranges overlapped
+            if found:
+                low = max(low, found[-1] + 1)
+            i = bisect.bisect_left(self._numbers, low)
+            while (i < len(self._numbers) and self._numbers[i] < high
+                   and (limit is None or len(found) < limit)):
+                found.append(self._numbers[i])
+                i += 1
+        # Shorter numbers are collected first, so the list is already ascending
+        return found
@@ -0,0 +1,171 @@
+# banking_jobs.py - Interest and Fee Batch Jobs
+"""
+End-of-day processing over every account without one operation (and one
+save) per account.
+
+A BatchJob walks the book in account-number order, chunk_size accounts at a
+time. For each chunk it computes all amounts from the balances and the
+available balances (balance minus holds, see banking_limits) in one pass
+(schedule.amounts), then commits the chunk as a single journal record:
+
+- expect   the versions of the chunk's accounts (a concurrent change to any
+           of them makes the chunk retry on fresh balances)
+- deltas   one balance change per account with a non-zero amount
+- batches  the transaction rows as two columns (account numbers, amounts)
+- jobs     {job_id: progress}: the last account number done
+
+The job's progress is committed in the same record as its changes, so it is
+exactly as durable as they are: after a crash (or a ConcurrentUpdateError)
+running the same job id again continues after the last accepted chunk and
+never applies a chunk twice. A finished job is a no-op.
+
+Finished jobs record the day they finished and are pruned from the
+snapshot at the first checkpoint JOB_RETENTION_DAYS after it (prune_jobs).
+They are kept that long, not dropped at once, because the record is what
+makes re-running the same job id a no-op.
+
+    job = BatchJob(bank, "interest-2025-07-31", InterestSchedule())
+    summary = job.run()
+"""
+
+import bisect
+import math
+from banking_records import today, format_day
+
+
+class InterestSchedule:
+    """Tiered annual interest, accrued daily.
+
+    tiers is [(minimum balance, annual rate)] sorted by minimum balance; the
+    whole balance earns the rate of the highest tier it reaches.
+    """
+
+    transaction_type = 'INTEREST'
+
+    def __init__(self, tiers=((0.0, 0.01), (1000.0, 0.02), (10000.0, 0.03)), days_per_year=365):
+        self.tiers = sorted(tiers)
+        self._floors = [floor for floor, _ in self.tiers]
+        self._daily_rates = [rate / days_per_year for _, rate in self.tiers]
+
+    def amounts(self, balances, available):
+        """Interest for a chunk of balances, rounded to cents (held funds earn interest too)"""
+        floors, rates = self._floors, self._daily_rates
+        result = []
+        for balance in balances:
+            tier = bisect.bisect_right(floors, balance) - 1
+            result.append(round(balance * rates[tier], 2) if balance > 0 and tier >= 0 else 0.0)
+        return result
+
+
+class FeeSchedule:
+    """Flat maintenance fee, waived at or above a minimum balance.
+
+    A fee never eats into held funds or takes a balance below zero: at most
+    the available balance is charged.
+    """
+
+    transaction_type = 'FEE'
+
+    def __init__(self, fee=5.0, waive_at=1000.0):
+        self.fee = fee
+        self.waive_at = waive_at
+
+    def amounts(self, balances, available):
+        """Negative fee amounts for a chunk of balances and available balances"""
+        fee, waive_at = self.fee, self.waive_at
+        return [-min(fee, math.floor(free * 100) / 100) if 0 < free and balance < waive_at else 0.0
+                for balance, free in zip(balances, available)]
+
+
+SCHEDULES = {'interest': InterestSchedule, 'fees': FeeSchedule}
+
+# Days a finished job's progress is kept (re-running its id stays a no-op)
+JOB_RETENTION_DAYS = 7
+
+
+def prune_jobs(job_progress, day=None):
+    """Drop finished jobs older than JOB_RETENTION_DAYS (in place); returns how many.
+
+    Jobs finished before finish days were recorded are stamped with day
+    and go once the window has passed.
+    """
+    day = today() if day is None else day
+    expired = []
+    for job_id, progress in job_progress.items():
+        if progress.get('done'):
+            finished = progress.setdefault('finished', day)
+            if finished < day - JOB_RETENTION_DAYS:
+                expired.append(job_id)
+    for job_id in expired:
+        del job_progress[job_id]
+    return len(expired)
+
+
+def default_job_id(kind, day=None):
+    """Job id of the daily run of a kind: 'interest-YYYY-MM-DD'"""
+    return f"{kind}-{format_day(today() if day is None else day)}"
+
+
+class BatchJob:
+    """Applies a schedule to all accounts in chunks; resumable by job id"""
+
+    def __init__(self, bank, job_id, schedule, chunk_size=10000):
+        self.bank = bank
+        self.job_id = job_id
+        self.schedule = schedule
+        self.chunk_size = chunk_size
+
+    def progress(self):
+        """Committed progress of this job ({} if it never ran)"""
+        self.bank.sync_changes()
+        return dict(self.bank.job_progress.get(self.job_id, {}))
+
+    def run(self, max_chunks=None):
+        """Process the remaining chunks (at most max_chunks); returns the progress.
+
+        Checkpoints the snapshot once at the end instead of once per account.
+        """
+        chunks = 0
+        progress = self.progress()
+        while not progress.get('done') and (max_chunks is None or chunks < max_chunks):
+            progress = self.bank.run_operation(self._stage_chunk)
+            chunks += 1
+        if chunks:
+            self.bank.save_data()
+        return progress
+
+    def _stage_chunk(self):
+        bank = self.bank
+        bank.sync_changes()
+        # Re-read on every attempt: another run of the same job may have moved on
+        progress = dict(bank.job_progress.get(self.job_id, {}))
+        if progress.get('done'):
+            return lambda: progress
+        numbers = bank.account_order.numbers_after(progress.get('through'), self.chunk_size)
+        accounts = [bank.accounts[acc_num] for acc_num in numbers]
+        balances = [account.account_balance for account in accounts]
+        held = bank.limits.held_amount
+        amounts = self.schedule.amounts(
+            balances, [balance - held(acc_num) for acc_num, balance in zip(numbers, balances)])
+
+        logged_numbers, logged_amounts = [], []
+        for account, amount in zip(accounts, amounts):
+            bank.expect_version(account.account_number, account.version)
+            if amount:
+                bank.stage_delta(account.account_number, amount)
+                logged_numbers.append(account.account_number)
+                logged_amounts.append(amount)
+        bank.log_batch(self.schedule.transaction_type, logged_numbers, logged_amounts)
+
+        new_progress = {
+            'type': self.schedule.transaction_type,
+            'through': numbers[-1] if numbers else progress.get('through'),
+            'accounts': progress.get('accounts', 0) + len(numbers),
+            'transactions': progress.get('transactions', 0) + len(logged_numbers),
+            'total': round(progress.get('total', 0.0) + sum(logged_amounts), 2),
+            'done': len(numbers) < self.chunk_size
+        }
+        if new_progress['done']:
+            new_progress['finished'] = today()
+        bank.stage_job_progress(self.job_id, new_progress)
+        return lambda: new_progress
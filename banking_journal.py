@@ -0,0 +1,376 @@
+# banking_journal.py - Shared Change Journal for Concurrent Front Ends
+"""
+Keeps several front ends (console, Tk GUIs, daemon) coherent while they run
+at the same time against the same banking_data.json.
+
+Every committed operation is appended as one checksummed line to a journal
+file (write-ahead log) that sits next to the data file
+(banking_data.json -> banking_data.journal):
+
+    1a2b3c4d {"origin": "...", "seq": 7, "expect": {"123456": 41},
+              "transactions": [...], "deltas": {"123456": -50.0},
+              "accounts": [{account record}], "deleted": [789012]}
+
+The 8 hex digits are the CRC-32 of the JSON payload. Torn or corrupted
+records fail the check and are skipped on replay instead of aborting it.
+
+- expect      account versions the operation was validated against
+              (null = the account must not exist yet)
+- deltas      balance changes
+- accounts    created or renamed accounts (full account record, owner names
+              included so every record is self-contained)
+- deleted     account numbers that were removed
+- transactions rows to append to transaction_history
+- batches     (optional) bulk rows of one type and time as columns:
+              {"type": "INTEREST", "ts": ..., "day": ...,
+               "account_number": [...], "amount": [...]}
+- jobs        (optional) progress of batch jobs, {job id: progress}; it is
+              committed in the same record as the job's changes, so a job
+              resumes exactly where its last accepted chunk ended
+- limits      (optional) daily withdrawal limits, {account: limit or null}
+- holds       (optional) holds placed, {hold id: [account, amount]}
+- released    (optional) hold ids that were released
+              (see banking_limits; these fields are applied by observers)
+- archived    (optional) {"rows": archived row count, "cutoff": day number}:
+              the archive (banking_archive) now holds the history up to that
+              absolute row count, so every front end drops those rows
+
+Optimistic concurrency: every account carries a version that is bumped each
+time an accepted event touches it. An event is accepted only if all of its
+expected versions still match when it is replayed, so the journal order
+decides which of two concurrent writers wins - no lock is held while an
+operation is prepared. Every front end replays the same journal with the
+same rule, so all of them agree on which events were rejected. The loser
+sees its own event rejected and retries on fresh state (see RetryPolicy).
+
+Each front end polls the journal size (a single stat call) and only reads the
+bytes appended since its last poll, so picking up another front end's work
+never re-parses the whole data file.
+
+Checkpoints: banking_data.json is a snapshot that stores the journal offset
+it already contains. Snapshots are written atomically (temp file + fsync +
+rename, previous snapshot kept as .bak), so a crash can never leave a
+half-written data file. Recovery loads the newest readable snapshot and
+replays only the journal tail after its offset. Journal appends are fsynced
+by default, so an operation is durable once append() returns. Front ends
+checkpoint once that tail has grown by checkpoint_interval records,
+whichever front ends wrote them.
+"""
+
+import json
+import os
+import random
+import shutil
+import time
+import zlib
+from Model import BankAccount, BankAccountOwner
+from banking_records import migrate_transaction
+
+
+class JournalReset(Exception):
+    """The journal was truncated or replaced (compacted) under a running reader"""
+
+
+class ConcurrentUpdateError(ValueError):
+    """Raised when an operation kept losing version conflicts to other writers"""
+
+
+class RetryPolicy:
+    """How often (and how patiently) to retry an operation that lost a conflict"""
+
+    def __init__(self, max_attempts=8, base_delay=0.002, max_delay=0.1):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def wait(self, attempt):
+        """Sleep with jittered exponential backoff before the next attempt"""
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        time.sleep(random.uniform(0, delay))
+
+
+def journal_path_for(data_file):
+    """Journal file used for a given data file"""
+    return os.path.splitext(data_file)[0] + ".journal"
+
+
+def account_record(account):
+    """Serialize an account the same way banking_data.json stores it"""
+    return {
+        'account_number': account.account_number,
+        'owner_first_name': account.account_owner.first_name,
+        'owner_last_name': account.account_owner.last_name,
+        'customer_id': account.account_owner.customer_id,
+        'balance': account.account_balance,
+        'version': account.version
+    }
+
+
+def new_event(origin):
+    """Empty change event for one operation"""
+    return {'origin': origin, 'expect': {}, 'transactions': [], 'deltas': {},
+            'accounts': [], 'deleted': []}
+
+
+def event_is_empty(event):
+    return not (event['transactions'] or event['deltas'] or event['accounts'] or event['deleted']
+                or event.get('batches') or event.get('jobs') or event.get('limits')
+                or event.get('holds') or event.get('released') or event.get('archived'))
+
+
+def versions_match(accounts, event):
+    """Compare-and-swap check: are the expected account versions still current?"""
+    for acc_key, version in event.get('expect', {}).items():
+        account = accounts.get(int(acc_key))
+        if version is None:
+            if account is not None:
+                return False
+        elif account is None or account.version != version:
+            return False
+    return True
+
+
+def apply_event(accounts, transaction_history, event, make_owner=BankAccountOwner, jobs=None):
+    """Merge one journal event into in-memory state.
+
+    make_owner(first_name, last_name, customer_id) builds (or interns) owners.
+    jobs, if given, is the {job id: progress} dict the event's job progress
+    is recorded in. Returns the set of changed account numbers, or None if the event lost a
+    version conflict and was rejected.
+    """
+    if not versions_match(accounts, event):
+        return None
+    changed = set()
+
+    for record in event.get('accounts', []):
+        acc_num = record['account_number']
+        existing = accounts.get(acc_num)
+        owner = make_owner(record['owner_first_name'], record['owner_last_name'],
+                           record.get('customer_id'))
+        if existing is None:
+            accounts[acc_num] = BankAccount(acc_num, owner, record['balance'],
+                                            record.get('version', 0))
+        else:
+            accounts[acc_num] = BankAccount(acc_num, owner, existing.account_balance,
+                                            existing.version + 1)
+        changed.add(acc_num)
+
+    for acc_key, delta in event.get('deltas', {}).items():
+        account = accounts.get(int(acc_key))
+        if account is not None:
+            account.apply_delta(delta)
+            changed.add(account.account_number)
+
+    for acc_num in event.get('deleted', []):
+        if accounts.pop(acc_num, None) is not None:
+            changed.add(acc_num)
+
+    transaction_history.extend(migrate_transaction(transaction)
+                               for transaction in event.get('transactions', []))
+    for batch in event.get('batches', ()):
+        transaction_history.append_batch(batch)
+    archived = event.get('archived')
+    if archived:
+        transaction_history.drop_prefix(archived['rows'] - transaction_history.archived_rows)
+    if jobs is not None:
+        jobs.update(event.get('jobs', {}))
+    return changed
+
+
+def encode_record(event):
+    """Journal line for an event: CRC-32 of the payload, a space, the JSON payload"""
+    payload = json.dumps(event, separators=(',', ':')).encode('utf-8')
+    return b"%08x %s\n" % (zlib.crc32(payload), payload)
+
+
+def decode_record(line):
+    """Return the event stored in a journal line, or None if it is corrupt"""
+    try:
+        if line.startswith(b"{"):
+            # Record written before journal checksums were introduced
+            return json.loads(line)
+        checksum, payload = line.split(b" ", 1)
+        if int(checksum, 16) != zlib.crc32(payload):
+            return None
+        return json.loads(payload)
+    except ValueError:
+        return None
+
+
+class ChangeJournal:
+    """Append-only, checksummed write-ahead log shared by all front ends"""
+
+    def __init__(self, path, fsync=True):
+        self.path = path
+        # fsync every append, so a committed operation survives power loss
+        # (one disk flush per commit; fsync=False trades that for speed)
+        self.fsync = fsync
+        self.corrupt_records = 0
+
+    def stat(self):
+        """os.stat_result of the journal, or None if it does not exist yet"""
+        try:
+            return os.stat(self.path)
+        except OSError:
+            return None
+
+    def size(self):
+        """Current journal length in bytes (0 if it does not exist yet)"""
+        st = self.stat()
+        return st.st_size if st else 0
+
+    def append(self, event):
+        """Append one event with a single O_APPEND write; return the offset just past it"""
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, encode_record(event))
+            end = os.lseek(fd, 0, os.SEEK_CUR)
+            if self.fsync:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        return end
+
+    def read_from(self, offset):
+        """Return (events, new_offset) for complete records written after offset"""
+        if self.size() <= offset:
+            return [], offset
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            chunk = f.read()
+
+        # A writer may be half way through a record - leave it for the next poll
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            return [], offset
+        events = []
+        for line in chunk[:end].splitlines():
+            if not line.strip():
+                continue
+            event = decode_record(line)
+            if event is None:
+                self.corrupt_records += 1
+            else:
+                events.append(event)
+        return events, offset + end + 1
+
+    def truncate(self):
+        """Empty the journal - only safe once a checkpoint holds everything in it.
+
+        An empty file is renamed over the journal rather than truncating it in
+        place: the new inode tells every watcher the journal was reset, even
+        once new appends have grown it past the offset they had read to.
+        """
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+def write_snapshot(path, data):
+    """Atomically replace a snapshot file, keeping the previous one as .bak"""
+    # Per-process temp name: several front ends may checkpoint at the same time
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    if os.path.exists(path):
+        shutil.copy2(path, path + ".bak")
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path):
+    """Load the newest readable snapshot.
+
+    Returns (data, source_path); data is None when no snapshot exists at all.
+    An unreadable data file is kept aside as .corrupt and the .bak checkpoint
+    is used instead. Raises ValueError if snapshots exist but none is readable.
+    """
+    candidates = [p for p in (path, path + ".bak") if os.path.exists(p)]
+    if not candidates:
+        return None, None
+    errors = []
+    for candidate in candidates:
+        try:
+            with open(candidate, 'r') as f:
+                data = json.load(f)
+            if candidate != path and os.path.exists(path):
+                shutil.copy2(path, path + ".corrupt")
+            return data, candidate
+        except (OSError, ValueError) as e:
+            errors.append(f"{candidate}: {e}")
+    raise ValueError("No readable snapshot (" + "; ".join(errors) + ")")
+
+
+class JournalWatcher:
+    """Polls a journal and replays new events into in-memory state"""
+
+    def __init__(self, journal, origin, offset=0):
+        self.journal = journal
+        self.origin = origin
+        self.offset = offset
+        self.identity = None
+        self.make_owner = BankAccountOwner
+        # {job id: progress} that job progress in events is recorded in (None = ignore)
+        self.jobs = None
+        # Journal records read since the last reset (the tail after its offset)
+        self.records = 0
+        # seq -> accepted? for events this front end wrote itself
+        self.outcomes = {}
+        # Account numbers the last poll created, renamed or deleted (a subset
+        # of its changes: name and order indexes need nothing else)
+        self.reshaped = set()
+        # Called with every accepted event, after it was applied (state kept
+        # outside the accounts, e.g. banking_limits.AccountLimits.observe_event)
+        self.observers = []
+
+    def reset(self, offset):
+        """Start following the journal from offset (after a full load)"""
+        self.offset = offset
+        self.records = 0
+        self.outcomes.clear()
+        st = self.journal.stat()
+        self.identity = (st.st_dev, st.st_ino) if st else None
+
+    def has_changes(self):
+        """Cheap check: has anything been appended since the last poll?
+
+        Raises JournalReset if the journal shrank or was replaced.
+        """
+        st = self.journal.stat()
+        if st is None:
+            if self.offset:
+                raise JournalReset(self.journal.path)
+            return False
+        identity = (st.st_dev, st.st_ino)
+        if self.identity is None:
+            self.identity = identity
+        if identity != self.identity or st.st_size < self.offset:
+            raise JournalReset(self.journal.path)
+        return st.st_size > self.offset
+
+    def poll(self, accounts, transaction_history):
+        """Apply all new events; return the set of changed account numbers"""
+        self.reshaped = set()
+        if not self.has_changes():
+            return set()
+        events, self.offset = self.journal.read_from(self.offset)
+        self.records += len(events)
+        changed = set()
+        for event in events:
+            result = apply_event(accounts, transaction_history, event, self.make_owner, self.jobs)
+            if event.get('origin') == self.origin:
+                self.outcomes[event.get('seq')] = result is not None
+            if result is not None:
+                for observer in self.observers:
+                    observer(event)
+            if result:
+                changed |= result
+                self.reshaped.update(record['account_number'] for record in event.get('accounts', ()))
+                self.reshaped.update(event.get('deleted', ()))
+        return changed
+
+    def take_outcome(self, seq):
+        """Pop whether our own event `seq` was accepted (None if not replayed yet)"""
+        return self.outcomes.pop(seq, None)
@@ -0,0 +1,150 @@
+# banking_limits.py - Daily Withdrawal Limits and Holds
+"""
+Per-account debit controls checked on the withdraw/transfer path:
+
+- daily limit  maximum total of withdrawals and outgoing transfers per
+               calendar day (per account, or default_daily_limit)
+- holds        amounts reserved on an account (pending card payments,
+               cheques, ...); they reduce the available balance until
+               released
+
+All state lives in flat dicts keyed by account number (or hold id), so a
+check is a handful of dict lookups:
+
+    daily_limits  account -> limit
+    usage         account -> (day, amount debited that day)
+    held          account -> total on hold
+    holds         hold id -> (account, amount)
+
+The usage counter is a fixed daily window: it restarts when a debit falls
+on a later day than the one it counts, so it never needs a sweep.
+
+Changes are persisted incrementally through the change journal. Limit
+settings and holds travel in their own event fields ('limits', 'holds',
+'released'). Usage is derived from the committed WITHDRAW / TRANSFER_OUT
+rows of each event, so every front end replaying the journal counts the
+same usage. Placing a hold also stages a zero delta, which bumps the
+account version, so a concurrent withdrawal that did not see the hold is
+rejected and retried. The snapshot stores the whole state under 'limits'.
+"""
+
+import secrets
+
+DEBIT_TYPES = frozenset(('WITHDRAW', 'TRANSFER_OUT'))
+
+
+def new_hold_id():
+    """Random non-zero 63-bit hold id"""
+    return secrets.randbits(63) or 1
+
+
+class AccountLimits:
+    """Daily withdrawal limits, usage counters and holds for all accounts"""
+
+    def __init__(self, default_daily_limit=None):
+        # Applies to accounts without their own limit (None = unlimited)
+        self.default_daily_limit = default_daily_limit
+        self.daily_limits = {}
+        self.usage = {}
+        self.held = {}
+        self.holds = {}
+
+    def limit_of(self, acc_num):
+        return self.daily_limits.get(acc_num, self.default_daily_limit)
+
+    def used_on(self, acc_num, day):
+        """Amount debited from an account on a day (only the latest day is kept)"""
+        usage = self.usage.get(acc_num)
+        return usage[1] if usage is not None and usage[0] == day else 0.0
+
+    def held_amount(self, acc_num):
+        return self.held.get(acc_num, 0.0)
+
+    def check_debit(self, account, amount, day):
+        """Raise ValueError if debiting amount on day breaks a hold or the daily limit"""
+        acc_num = account.account_number
+        held = self.held.get(acc_num, 0.0)
+        if held and amount > account.account_balance - held:
+            raise ValueError(f"Insufficient available balance (${held:.2f} on hold)")
+        limit = self.daily_limits.get(acc_num, self.default_daily_limit)
+        if limit is not None:
+            used = self.used_on(acc_num, day)
+            if used + amount > limit:
+                raise ValueError(f"Daily withdrawal limit exceeded "
+                                 f"(${limit:.2f} per day, ${used:.2f} used today)")
+
+    def check_hold(self, account, amount):
+        """Raise ValueError if amount cannot be put on hold"""
+        if amount <= 0:
+            raise ValueError("Hold amount must be positive")
+        available = account.account_balance - self.held.get(account.account_number, 0.0)
+        if amount > available:
+            raise ValueError("Insufficient available balance for the hold")
+
+    # Journal replay (registered as a JournalWatcher observer)
+    def observe_event(self, event):
+        for acc_key, limit in event.get('limits', {}).items():
+            self._set_limit(int(acc_key), limit)
+        for hold_key, (acc_num, amount) in event.get('holds', {}).items():
+            self._add_hold(int(hold_key), acc_num, amount)
+        for hold_id in event.get('released', ()):
+            self._release(hold_id)
+        for transaction in event.get('transactions', ()):
+            if transaction['type'] in DEBIT_TYPES and transaction.get('success', True):
+                self._count_debit(transaction['account_number'], transaction['amount'],
+                                  transaction['day'])
+        for acc_num in event.get('deleted', ()):
+            self.forget(acc_num)
+
+    def _set_limit(self, acc_num, limit):
+        if limit is None:
+            self.daily_limits.pop(acc_num, None)
+        else:
+            self.daily_limits[acc_num] = float(limit)
+
+    def _add_hold(self, hold_id, acc_num, amount):
+        if hold_id not in self.holds:
+            self.holds[hold_id] = (acc_num, amount)
+            self.held[acc_num] = self.held.get(acc_num, 0.0) + amount
+
+    def _release(self, hold_id):
+        hold = self.holds.pop(hold_id, None)
+        if hold is None:
+            return
+        acc_num, amount = hold
+        remaining = self.held.get(acc_num, 0.0) - amount
+        if remaining > 0.005:
+            self.held[acc_num] = remaining
+        else:
+            self.held.pop(acc_num, None)
+
+    def _count_debit(self, acc_num, amount, day):
+        usage = self.usage.get(acc_num)
+        if usage is None or usage[0] < day:
+            self.usage[acc_num] = (day, amount)
+        elif usage[0] == day:
+            self.usage[acc_num] = (day, usage[1] + amount)
+
+    def forget(self, acc_num):
+        """Drop all state of a deleted account"""
+        self.daily_limits.pop(acc_num, None)
+        self.usage.pop(acc_num, None)
+        self.held.pop(acc_num, None)
+        for hold_id in [hold_id for hold_id, (owner, _) in self.holds.items() if owner == acc_num]:
+            del self.holds[hold_id]
+
+    # Snapshot
+    def to_data(self):
+        return {
+            'daily_limits': {str(acc_num): limit for acc_num, limit in self.daily_limits.items()},
+            'usage': {str(acc_num): list(usage) for acc_num, usage in self.usage.items()},
+            'holds': {str(hold_id): list(hold) for hold_id, hold in self.holds.items()}
+        }
+
+    def load(self, data):
+        self.daily_limits = {int(acc_key): limit for acc_key, limit in data.get('daily_limits', {}).items()}
+        self.usage = {int(acc_key): tuple(usage) for acc_key, usage in data.get('usage', {}).items()}
+        self.holds = {}
+        self.held = {}
+        for hold_key, (acc_num, amount) in data.get('holds', {}).items():
+            self._add_hold(int(hold_key), acc_num, amount)
@@ -0,0 +1,583 @@
+# banking_records.py - Transaction Records
+"""
+Canonical time fields of a transaction row:
+
+    'ts'   integer milliseconds since the Unix epoch (UTC)
+    'day'  local calendar day as an integer (days since 1970-01-01)
+
+Both are computed once when the transaction is logged. Bucketing by day is
+then an integer comparison instead of slicing or parsing strings, and text
+is only produced when something is displayed (format_ts / format_day).
+
+Rows written before this format carried an ISO 'timestamp' string, and
+older front ends spelled withdrawals 'WITHDRAWAL' / 'WITHDRAWAL_FAILED';
+both are converted by migrate_transaction() when a snapshot or journal is
+loaded.
+
+In memory the history is a TransactionLog: one typed array per field
+instead of one dict per row. The type is a one-byte TransactionCode (names
+outside the enum are interned per log) and the error text an index into an
+interned table (almost every row has the empty error, and failures repeat a
+handful of messages), so a row costs 42 bytes instead of a dict of boxed
+values several hundred bytes large. Indexing or iterating the log
+yields TransactionView objects, read-only mappings with the old keys, so
+existing callers keep writing trans['type'] and trans['amount'].
+
+Both legs of a transfer (TRANSFER_OUT and TRANSFER_IN) carry the same
+'transfer_id', a random 63-bit integer (0 = not part of a transfer). The log
+indexes rows by transfer id and keeps a running transfer volume, counting
+each transfer once (its TRANSFER_OUT leg), so per-transfer lookups and the
+total are O(1).
+
+Rows still enter as dicts (log_transaction, journal events) and the
+snapshot stores the columns as parallel lists:
+
+    "transaction_history": {"format": "columns", "errors": ["", ...],
+                            "extra_types": [], "ts": [...], "day": [...], "account_number": [...],
+                            "type": [1, 3, ...], "amount": [...],
+                            "success": [1, ...], "error": [0, ...],
+                            "transfer_id": [0, ...], "anchors": ["<hex>", ...],
+                            "tail": {"rows": 11, "anchor": "<hex>"},
+                            "archived": {"rows": 0, ...}}
+
+Audit chain: the log is cut into segments of AUDIT_SEGMENT_ROWS rows and
+every full segment is sealed with an anchor, the SHA-256 of the previous
+anchor followed by the segment's raw column bytes. Each segment therefore
+commits to every row before it: editing, inserting or dropping a row in the
+snapshot breaks the anchor of its segment. Sealing hashes the columns in C
+as a segment fills, so appends stay O(1). The rows after the last full
+segment are covered by the tail anchor, the same hash over the open
+segment's rows so far, written with every snapshot. banking_audit verifies
+the chain and derives a Merkle root to record outside the data file.
+
+Archiving (banking_archive) drops a prefix of whole sealed segments from the
+log. archived_rows is the absolute index of the first row still held, the
+anchors of archived segments stay with the log, and the transfer totals
+keep counting the archived rows.
+"""
+
+import datetime
+import hashlib
+import secrets
+import sys
+import time
+from array import array
+from collections.abc import Mapping, Sequence
+from enum import IntEnum
+
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+def now_ts():
+    """Current time as integer epoch milliseconds"""
+    return time.time_ns() // 1_000_000
+
+
+def day_of(ts):
+    """Local calendar day number of an epoch-ms timestamp"""
+    return datetime.datetime.fromtimestamp(ts / 1000).date().toordinal() - EPOCH_ORDINAL
+
+
+def day_number(date):
+    """Day number of a datetime.date"""
+    return date.toordinal() - EPOCH_ORDINAL
+
+
+def today():
+    """Day number of the current local date"""
+    return day_number(datetime.date.today())
+
+
+def day_to_date(day):
+    return datetime.date.fromordinal(day + EPOCH_ORDINAL)
+
+
+def format_ts(ts, seconds=True):
+    """Local 'YYYY-MM-DD HH:MM[:SS]' text for an epoch-ms timestamp"""
+    moment = datetime.datetime.fromtimestamp(ts / 1000)
+    return moment.strftime('%Y-%m-%d %H:%M:%S' if seconds else '%Y-%m-%d %H:%M')
+
+
+def format_day(day):
+    """'YYYY-MM-DD' text for a day number"""
+    return day_to_date(day).isoformat()
+
+
+def stamp(transaction, ts=None):
+    """Set the time fields of a new transaction row"""
+    ts = now_ts() if ts is None else ts
+    transaction['ts'] = ts
+    transaction['day'] = day_of(ts)
+    return transaction
+
+
+def new_transfer_id():
+    """Random non-zero 63-bit id shared by both legs of a transfer"""
+    return secrets.randbits(63) or 1
+
+
+# Type names written by older front ends -> current names
+LEGACY_TYPE_NAMES = {
+    'WITHDRAWAL': 'WITHDRAW',
+    'WITHDRAWAL_FAILED': 'WITHDRAW_FAILED'
+}
+
+
+def migrate_transaction(transaction):
+    """Convert a legacy row (ISO 'timestamp' string, old type names) in place"""
+    legacy_type = LEGACY_TYPE_NAMES.get(transaction.get('type'))
+    if legacy_type is not None:
+        transaction['type'] = legacy_type
+    if 'ts' not in transaction:
+        text = transaction.pop('timestamp', None)
+        try:
+            moment = datetime.datetime.fromisoformat(text.replace('Z', ''))
+            stamp(transaction, int(moment.timestamp() * 1000))
+        except (AttributeError, ValueError):
+            stamp(transaction, 0)
+    return transaction
+
+
+class TransactionCode(IntEnum):
+    """One-byte type codes of transaction rows (values are stored in snapshots: never renumber)"""
+    DEPOSIT = 1
+    WITHDRAW = 2
+    TRANSFER_IN = 3
+    TRANSFER_OUT = 4
+    ACCOUNT_CREATED = 5
+    ACCOUNT_DELETED = 6
+    DEPOSIT_FAILED = 7
+    WITHDRAW_FAILED = 8
+    TRANSFER_FAILED = 9
+    INTEREST = 10
+    FEE = 11
+
+
+# Sign of the balance change a successful row of each type records (FEE
+# amounts are stored negative; failed rows and unknown types change nothing)
+BALANCE_SIGNS = {
+    TransactionCode.DEPOSIT: 1,
+    TransactionCode.WITHDRAW: -1,
+    TransactionCode.TRANSFER_IN: 1,
+    TransactionCode.TRANSFER_OUT: -1,
+    TransactionCode.ACCOUNT_CREATED: 1,
+    TransactionCode.ACCOUNT_DELETED: -1,
+    TransactionCode.INTEREST: 1,
+    TransactionCode.FEE: 1,
+}
+
+
+# Type names outside the enum (e.g. written by older versions) are interned
+# per log from this code up, leaving room for new enum members below it
+EXTRA_TYPE_BASE = 128
+
+
+TRANSACTION_FIELDS = ('ts', 'day', 'account_number', 'type', 'amount', 'success', 'error', 'transfer_id')
+
+# Rows per link of the audit hash chain (stored with the anchors: never change
+# it for an existing book)
+AUDIT_SEGMENT_ROWS = 4096
+GENESIS_ANCHOR = bytes(32)
+
+
+def chain_hash(previous, column_bytes):
+    """Anchor of a segment: SHA-256 of the previous anchor and the segment's column bytes"""
+    digest = hashlib.sha256(previous)
+    for chunk in column_bytes:
+        digest.update(chunk)
+    return digest.digest()
+
+
+class TransactionView(Mapping):
+    """Read-only dict-like view of one row of a TransactionLog"""
+
+    __slots__ = ('_log', '_index')
+
+    def __init__(self, log, index):
+        self._log = log
+        self._index = index
+
+    def __getitem__(self, key):
+        return self._log.field(self._index, key)
+
+    def __iter__(self):
+        return iter(TRANSACTION_FIELDS)
+
+    def __len__(self):
+        return len(TRANSACTION_FIELDS)
+
+    def __repr__(self):
+        return f"TransactionView({dict(self)!r})"
+
+
+class TransactionLog(Sequence):
+    """Transaction history stored as typed columns.
+
+    Rows are appended at the end and only ever removed from the front, when
+    archiving drops a prefix (drop_prefix). Both happen on the owner's
+    thread; work on another thread gets copies of the columns it needs
+    (copy_columns) instead of the live arrays.
+    """
+
+    def __init__(self):
+        self._ts = array('q')
+        self._day = array('i')
+        self._account = array('q')
+        self._type = array('B')
+        self._amount = array('d')
+        self._success = array('B')
+        self._error = array('I')
+        self._transfer = array('q')
+        # Interned error messages; index 0 is "no error"
+        self._errors = [""]
+        self._error_ids = {"": 0}
+        # Type names not in TransactionCode, coded from EXTRA_TYPE_BASE up
+        self._extra_types = []
+        self._extra_type_codes = {}
+        # transfer id -> row indexes of its legs
+        self._transfer_rows = {}
+        self.transfer_count = 0
+        self.transfer_volume = 0.0
+        # Audit chain anchor of every full segment (archived ones included)
+        self._anchors = []
+        # (absolute row count, tail anchor) stored with the snapshot this log was loaded from
+        self.saved_tail = None
+        # Why the loaded rows did not match their stored anchors (empty if they did)
+        self.tamper_problems = []
+        # Rows moved to the archive; row i of the log is absolute row archived_rows + i
+        self.archived_rows = 0
+        self.archived_transfer_count = 0
+        self.archived_transfer_volume = 0.0
+        # Set by from_data when the data was in an older format (rewrite it)
+        self.upgraded = False
+
+    def __len__(self):
+        return len(self._ts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [TransactionView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("transaction index out of range")
+        return TransactionView(self, index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield TransactionView(self, i)
+
+    def __reversed__(self):
+        for i in range(len(self) - 1, -1, -1):
+            yield TransactionView(self, i)
+
+    def field(self, index, key):
+        """One field of a row, decoded to the old dict value"""
+        if key == 'ts':
+            return self._ts[index]
+        if key == 'day':
+            return self._day[index]
+        if key == 'account_number':
+            return self._account[index]
+        if key == 'type':
+            return self.type_name(self._type[index])
+        if key == 'amount':
+            return self._amount[index]
+        if key == 'success':
+            return bool(self._success[index])
+        if key == 'error':
+            return self._errors[self._error[index]]
+        if key == 'transfer_id':
+            return self._transfer[index] or None
+        raise KeyError(key)
+
+    def column(self, name):
+        """The raw array behind a field (type: codes, error: indexes into errors())"""
+        return {'ts': self._ts, 'day': self._day, 'account_number': self._account,
+                'type': self._type, 'amount': self._amount, 'success': self._success,
+                'error': self._error, 'transfer_id': self._transfer}[name]
+
+    def copy_columns(self, *names):
+        """Copies of raw columns (C-level copies, cheap enough for the Tk thread)"""
+        return [self.column(name)[:] for name in names]
+
+    def errors(self):
+        """The interned error table (error column values index into it)"""
+        return self._errors
+
+    def extra_types(self):
+        """Interned type names outside TransactionCode (code EXTRA_TYPE_BASE + index)"""
+        return self._extra_types
+
+    def type_name(self, code):
+        if code >= EXTRA_TYPE_BASE:
+            return self._extra_types[code - EXTRA_TYPE_BASE]
+        return TransactionCode(code).name
+
+    def type_code(self, name):
+        """Stored code of a type name (interning names the enum does not know)"""
+        member = TransactionCode.__members__.get(name)
+        if member is not None:
+            return member
+        code = self._extra_type_codes.get(name)
+        if code is None:
+            code = EXTRA_TYPE_BASE + len(self._extra_types)
+            if code > 255:
+                raise ValueError(f"Too many unknown transaction types (at {name!r})")
+            self._extra_type_codes[name] = code
+            self._extra_types.append(str(name))
+        return code
+
+    def intern_error(self, message):
+        error_id = self._error_ids.get(message)
+        if error_id is None:
+            error_id = self._error_ids[message] = len(self._errors)
+            self._errors.append(message)
+        return error_id
+
+    def append(self, transaction):
+        """Add a row given as a dict with the classic keys (ts/day already set)"""
+        code = self.type_code(transaction['type'])
+        error_id = self.intern_error(transaction.get('error') or "")
+        # The timestamp goes last: len() follows it, so a reader never sees a half-written row
+        self._day.append(transaction['day'])
+        self._account.append(transaction['account_number'])
+        self._type.append(code)
+        self._amount.append(float(transaction.get('amount') or 0.0))
+        self._success.append(1 if transaction.get('success', True) else 0)
+        self._error.append(error_id)
+        self._transfer.append(transaction.get('transfer_id') or 0)
+        self._ts.append(transaction['ts'])
+        self._index_transfer(len(self._ts) - 1)
+        if (self.archived_rows + len(self._ts)) % AUDIT_SEGMENT_ROWS == 0:
+            self._seal_segments()
+
+    def append_batch(self, batch):
+        """Add the rows of a batch: one type and time, columns of account numbers and amounts.
+
+        Used for job runs (interest, fees) that log thousands of rows at once;
+        the columns are extended in C instead of row by row.
+        """
+        count = len(batch['account_number'])
+        if len(batch['amount']) != count:
+            raise ValueError("Batch columns differ in length")
+        code = self.type_code(batch['type'])
+        self._day.extend([batch['day']] * count)
+        self._account.extend(batch['account_number'])
+        self._type.extend([code] * count)
+        self._amount.extend(batch['amount'])
+        self._success.extend([1] * count)
+        self._error.extend([0] * count)
+        self._transfer.extend([0] * count)
+        self._ts.extend([batch['ts']] * count)
+        self._seal_segments()
+
+    def _index_transfer(self, index):
+        transfer_id = self._transfer[index]
+        if transfer_id:
+            self._transfer_rows[transfer_id] = self._transfer_rows.get(transfer_id, ()) + (index,)
+        # Only the outgoing leg counts, so a transfer is not counted twice
+        # (rows from before transfer ids are counted the same way)
+        if self._type[index] == TransactionCode.TRANSFER_OUT and self._success[index]:
+            self.transfer_count += 1
+            self.transfer_volume += self._amount[index]
+
+    def column_bytes(self, start, end):
+        """Little-endian bytes of every column over rows [start, end), in field order"""
+        chunks = []
+        for name in TRANSACTION_FIELDS:
+            part = self.column(name)[start:end]
+            if sys.byteorder == 'big':
+                part.byteswap()
+            chunks.append(part.tobytes())
+        return chunks
+
+    def anchors(self):
+        """Audit chain anchors of the full segments (see banking_audit)"""
+        return self._anchors
+
+    def tail_anchor(self):
+        """Chain hash of the rows after the last full segment"""
+        end = self.archived_rows + len(self)
+        segment = end // AUDIT_SEGMENT_ROWS
+        start = segment * AUDIT_SEGMENT_ROWS - self.archived_rows
+        previous = self._anchors[segment - 1] if segment else GENESIS_ANCHOR
+        return chain_hash(previous, self.column_bytes(start, end - self.archived_rows))
+
+    def stored_tail(self):
+        """(absolute row count, tail anchor) to write with the next snapshot.
+
+        A log that failed its load-time check keeps the tail it was loaded
+        with (possibly None): recomputing it would cover rows nobody checked.
+        """
+        if self.tamper_problems:
+            return self.saved_tail
+        return self.archived_rows + len(self), self.tail_anchor()
+
+    def _check_saved_chain(self):
+        """Problems found checking the loaded rows against the stored anchors and tail anchor"""
+        rows = self.archived_rows + len(self)
+        full_segments = rows // AUDIT_SEGMENT_ROWS
+        if len(self._anchors) != full_segments:
+            return [f"{len(self._anchors)} anchors stored for {full_segments} full segments "
+                    f"(rows were added or removed)"]
+        start = full_segments * AUDIT_SEGMENT_ROWS
+        if self.saved_tail is None:
+            return [f"no tail anchor stored: rows {start}-{rows - 1} are unchecked"]
+        tail_rows, anchor = self.saved_tail
+        if tail_rows != rows:
+            return [f"tail anchor covers {tail_rows} rows, the log holds {rows} "
+                    f"(rows were added or removed)"]
+        if self.tail_anchor() != anchor:
+            return [f"rows {start}-{rows - 1} do not match the tail anchor"]
+        return []
+
+    def _seal_segments(self):
+        # Never seal rows of a log whose stored chain did not check out
+        if self.tamper_problems:
+            return
+        while self.archived_rows + len(self) >= (len(self._anchors) + 1) * AUDIT_SEGMENT_ROWS:
+            start = len(self._anchors) * AUDIT_SEGMENT_ROWS - self.archived_rows
+            previous = self._anchors[-1] if self._anchors else GENESIS_ANCHOR
+            self._anchors.append(chain_hash(previous, self.column_bytes(start, start + AUDIT_SEGMENT_ROWS)))
+
+    def slice_data(self, start, end):
+        """to_data() of rows [start, end) alone, without audit anchors (used for archive runs)"""
+        return {
+            'format': 'columns',
+            'errors': list(self._errors),
+            'extra_types': list(self._extra_types),
+            **{name: self.column(name)[start:end].tolist() for name in TRANSACTION_FIELDS}
+        }
+
+    def drop_prefix(self, count):
+        """Forget the first count rows (they were archived); must end on a sealed segment"""
+        if count <= 0:
+            return
+        if count > len(self) or (self.archived_rows + count) % AUDIT_SEGMENT_ROWS:
+            raise ValueError("Only whole sealed segments can be dropped from a log")
+        transfer_out = TransactionCode.TRANSFER_OUT
+        for index in range(count):
+            if self._type[index] == transfer_out and self._success[index]:
+                self.archived_transfer_count += 1
+                self.archived_transfer_volume += self._amount[index]
+        for name in TRANSACTION_FIELDS:
+            del self.column(name)[:count]
+        self.archived_rows += count
+        self._transfer_rows = {}
+        for index, transfer_id in enumerate(self._transfer):
+            if transfer_id:
+                self._transfer_rows[transfer_id] = self._transfer_rows.get(transfer_id, ()) + (index,)
+
+    def transfer_legs(self, transfer_id):
+        """Views of the rows of a transfer (empty if the id is unknown)"""
+        return [TransactionView(self, i) for i in self._transfer_rows.get(transfer_id, ())]
+
+    def transfer(self, transfer_id):
+        """One transfer as a dict (from/to account, amount, time), or None"""
+        record = None
+        for leg in self.transfer_legs(transfer_id):
+            if record is None:
+                record = {'transfer_id': transfer_id, 'from_account': None, 'to_account': None,
+                          'amount': leg['amount'], 'ts': leg['ts'], 'day': leg['day']}
+            if leg['type'] == 'TRANSFER_OUT':
+                record['from_account'] = leg['account_number']
+            elif leg['type'] == 'TRANSFER_IN':
+                record['to_account'] = leg['account_number']
+        return record
+
+    def extend(self, transactions):
+        for transaction in transactions:
+            self.append(transaction)
+
+    def to_data(self):
+        """Columnar, JSON-serializable form for the snapshot"""
+        return {
+            'format': 'columns',
+            'errors': list(self._errors),
+            'extra_types': list(self._extra_types),
+            'ts': self._ts.tolist(),
+            'day': self._day.tolist(),
+            'account_number': self._account.tolist(),
+            'type': self._type.tolist(),
+            'amount': self._amount.tolist(),
+            'success': self._success.tolist(),
+            'error': self._error.tolist(),
+            'transfer_id': self._transfer.tolist(),
+            'audit_segment_rows': AUDIT_SEGMENT_ROWS,
+            'anchors': [anchor.hex() for anchor in self._anchors],
+            **self._tail_data(),
+            'archived': {'rows': self.archived_rows,
+                         'transfer_count': self.archived_transfer_count,
+                         'transfer_volume': self.archived_transfer_volume}
+        }
+
+    def _tail_data(self):
+        tail = self.stored_tail()
+        if tail is None:
+            return {}
+        return {'tail': {'rows': tail[0], 'anchor': tail[1].hex()}}
+
+    @classmethod
+    def from_data(cls, data, chained=True):
+        """Rebuild a log from to_data() output or from a legacy list of row dicts.
+
+        The rows after the last stored anchor are checked against the stored
+        tail anchor; if they (or the anchor count) do not match, the reasons go
+        to tamper_problems and the log carries the stored anchors and tail
+        unchanged from then on (banking_audit reports them, the archive refuses
+        the log). Full segments are checked by banking_audit. Histories saved
+        without anchors get them computed and are flagged as upgraded. chained=False skips the audit chain altogether
+        (rows read back from the archive). Raises ValueError for a malformed or newer
+        columnar history.
+        """
+        log = cls()
+        if not data:
+            return log
+        if isinstance(data, list):
+            log.extend(migrate_transaction(transaction) for transaction in data)
+            log.upgraded = True
+            return log
+        if data.get('format') != 'columns':
+            raise ValueError(f"Unknown transaction history format: {data.get('format')}")
+        # Columnar histories saved before transfer ids have no transfer_id column
+        transfer_ids = data.get('transfer_id', [0] * len(data['ts']))
+        columns = [data[name] for name in TRANSACTION_FIELDS if name != 'transfer_id'] + [transfer_ids]
+        if len({len(column) for column in columns}) > 1:
+            raise ValueError("Transaction history columns differ in length")
+        log._errors = list(data['errors'])
+        log._error_ids = {message: i for i, message in enumerate(log._errors)}
+        log._extra_types = list(data.get('extra_types', []))
+        log._extra_type_codes = {name: EXTRA_TYPE_BASE + i for i, name in enumerate(log._extra_types)}
+        known = set(TransactionCode) | set(log._extra_type_codes.values())
+        if not set(data['type']) <= known:
+            raise ValueError("Transaction history uses type codes this version does not know")
+        log._day.extend(data['day'])
+        log._account.extend(data['account_number'])
+        log._type.extend(data['type'])
+        log._amount.extend(data['amount'])
+        log._success.extend(data['success'])
+        log._error.extend(data['error'])
+        log._transfer.extend(transfer_ids)
+        log._ts.extend(data['ts'])
+        archived = data.get('archived', {})
+        log.archived_rows = archived.get('rows', 0)
+        log.archived_transfer_count = log.transfer_count = archived.get('transfer_count', 0)
+        log.archived_transfer_volume = log.transfer_volume = archived.get('transfer_volume', 0.0)
+        transfer_out = TransactionCode.TRANSFER_OUT
+        for index, (code, transfer_id) in enumerate(zip(log._type, log._transfer)):
+            if transfer_id or code == transfer_out:
+                log._index_transfer(index)
+        if not chained:
+            return log
+        if 'anchors' in data:
+            if data.get('audit_segment_rows', AUDIT_SEGMENT_ROWS) != AUDIT_SEGMENT_ROWS:
+                raise ValueError("Transaction history uses a different audit segment size")
+            log._anchors = [bytes.fromhex(anchor) for anchor in data['anchors']]
+            if 'tail' in data:
+                log.saved_tail = (data['tail']['rows'], bytes.fromhex(data['tail']['anchor']))
+            log.tamper_problems = log._check_saved_chain()
+        else:
+            log.upgraded = True
+        log._seal_segments()
+        return log
@@ -0,0 +1,176 @@
+# banking_rollups.py - Pre-aggregated Transaction Totals
+"""
+Rollup tables over the whole transaction history, so reports read a few
+rows per day, type or account instead of every transaction:
+
+    days      day number -> [rows, successful, net balance change]
+    types     type name  -> [rows, successful, amount of the successful rows]
+    accounts  account number -> {'YYYY-MM' -> [rows, deposits, withdrawals,
+                                               net balance change]}
+
+Only successful rows move money; the net change follows BALANCE_SIGNS
+(FEE amounts are stored negative, so they subtract).
+
+The tables are kept current incrementally. 'through' is the absolute row
+count they cover, and catch_up() folds in the log rows after it. The engine
+calls it after every journal poll, so rows committed by any front end are
+counted exactly once, in journal order. The snapshot stores the tables
+under 'rollups'. rebuild() recomputes them from the archive plus the live
+log, e.g. for a snapshot written before rollups existed or after another
+front end archived rows. The archive manifest keeps the tables of each
+archived month (see banking_archive), so a rebuild merges those and only
+reads the live rows; full=True re-reads every partition instead.
+"""
+
+from banking_records import BALANCE_SIGNS, TransactionCode, day_to_date
+
+SIGNS = [BALANCE_SIGNS.get(code, 0) for code in range(256)]
+
+
+class Rollups:
+    """Per-day, per-type and per-account-month totals of a TransactionLog"""
+
+    def __init__(self):
+        self.through = 0
+        self.days = {}
+        self.types = {}
+        self.accounts = {}
+        # day number -> 'YYYY-MM' (a handful of entries per month of history)
+        self._months = {}
+
+    def month_of(self, day):
+        month = self._months.get(day)
+        if month is None:
+            month = self._months[day] = day_to_date(day).strftime('%Y-%m')
+        return month
+
+    def catch_up(self, log):
+        """Fold in the rows appended to log since the last call; returns how many"""
+        start = self.through - log.archived_rows
+        if start < 0:
+            raise ValueError("Rollups are behind the archived history (rebuild them)")
+        end = len(log)
+        if start >= end:
+            return 0
+        self.add_rows(log, start, end)
+        self.through = log.archived_rows + end
+        return end - start
+
+    def add_rows(self, log, start, end):
+        """Add rows [start, end) of a log to the tables"""
+        days = log.column('day')
+        accounts = log.column('account_number')
+        types = log.column('type')
+        amounts = log.column('amount')
+        successes = log.column('success')
+        day_table, type_table, account_table = self.days, self.types, self.accounts
+        type_cells = {}
+        deposit, withdraw = TransactionCode.DEPOSIT, TransactionCode.WITHDRAW
+
+        for index in range(start, end):
+            code = types[index]
+            success = successes[index]
+            amount = amounts[index]
+            change = SIGNS[code] * amount if success else 0.0
+
+            day = days[index]
+            cell = day_table.get(day)
+            if cell is None:
+                cell = day_table[day] = [0, 0, 0.0]
+            cell[0] += 1
+            cell[1] += success
+            cell[2] += change
+
+            cell = type_cells.get(code)
+            if cell is None:
+                cell = type_cells[code] = type_table.setdefault(log.type_name(code), [0, 0, 0.0])
+            cell[0] += 1
+            if success:
+                cell[1] += 1
+                cell[2] += amount
+
+            months = account_table.get(accounts[index])
+            if months is None:
+                months = account_table[accounts[index]] = {}
+            month = self.month_of(day)
+            cell = months.get(month)
+            if cell is None:
+                cell = months[month] = [0, 0.0, 0.0, 0.0]
+            cell[0] += 1
+            if success:
+                if code == deposit:
+                    cell[1] += amount
+                elif code == withdraw:
+                    cell[2] += amount
+                cell[3] += change
+
+    def merge(self, other):
+        """Add the tables of another Rollups into this one"""
+        for day, cell in other.days.items():
+            total = self.days.setdefault(day, [0, 0, 0.0])
+            for i, value in enumerate(cell):
+                total[i] += value
+        for name, cell in other.types.items():
+            total = self.types.setdefault(name, [0, 0, 0.0])
+            for i, value in enumerate(cell):
+                total[i] += value
+        for acc_num, months in other.accounts.items():
+            own = self.accounts.setdefault(acc_num, {})
+            for month, cell in months.items():
+                total = own.setdefault(month, [0, 0.0, 0.0, 0.0])
+                for i, value in enumerate(cell):
+                    total[i] += value
+
+    def rebuild(self, archive, log, full=False):
+        """Recompute every table from the archive and the live log.
+
+        Archived months come from the manifest's per-month tables; full=True
+        (or a manifest without them) reads the archived rows instead.
+        """
+        self.days, self.types, self.accounts = {}, {}, {}
+        archive.refresh()
+        months = [] if full else [archive.month_rollups(month) for month in archive.manifest['partitions']]
+        if None in months or full:
+            for history, first_index in archive.period_logs(log):
+                self.add_rows(history, first_index, len(history))
+        else:
+            for rollups in months:
+                self.merge(rollups)
+            # Live rows the archive already holds (an interrupted drop) are counted there
+            self.add_rows(log, max(0, min(archive.rows - log.archived_rows, len(log))), len(log))
+        self.through = log.archived_rows + len(log)
+
+    # Queries
+    def totals(self):
+        """[rows, successful] over the whole history"""
+        return [sum(cell[0] for cell in self.types.values()),
+                sum(cell[1] for cell in self.types.values())]
+
+    def type_amount(self, type_name):
+        return self.types.get(type_name, [0, 0, 0.0])[2]
+
+    def account_totals(self, acc_num):
+        """[rows, deposits, withdrawals, net balance change] of one account"""
+        total = [0, 0.0, 0.0, 0.0]
+        for cell in self.accounts.get(acc_num, {}).values():
+            for i, value in enumerate(cell):
+                total[i] += value
+        return total
+
+    # Snapshot
+    def to_data(self):
+        return {
+            'through': self.through,
+            'days': {str(day): cell for day, cell in self.days.items()},
+            'types': self.types,
+            'accounts': {str(acc_num): months for acc_num, months in self.accounts.items()}
+        }
+
+    @classmethod
+    def from_data(cls, data):
+        rollups = cls()
+        rollups.through = data['through']
+        rollups.days = {int(day): cell for day, cell in data['days'].items()}
+        rollups.types = dict(data['types'])
+        rollups.accounts = {int(acc_num): months for acc_num, months in data['accounts'].items()}
+        return rollups
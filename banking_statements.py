@@ -0,0 +1,204 @@
+# banking_statements.py - Account Statement Generation
+"""
+Text or CSV statements for every account (or a selection) over a period.
+
+Statement runs have two stages:
+
+1. collect_statements() makes one pass over the TransactionLog columns in
+   the parent process (reading archived months first when the period
+   reaches back into the archive, see banking_archive). It takes each account's rows in the period and the
+   net balance change after it. The closing balance is the current balance
+   minus the later changes, and the opening balance is the closing balance
+   minus the period's changes.
+2. write_statements() hands the statements out in chunks to a process pool.
+   Each worker formats and writes its files independently, so a month-end
+   run over all accounts scales with the number of cores. With workers=1
+   everything runs in-process.
+
+Files are written as <out_dir>/<account number>_<period>.txt (or .csv).
+"""
+
+import csv
+import datetime
+import io
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from banking_records import (BALANCE_SIGNS, day_number, day_to_date, format_day, format_ts,
+                             today)
+
+FORMATS = ('text', 'csv')
+
+
+def month_period(year, month):
+    """(first day, last day) numbers of a calendar month"""
+    first = datetime.date(year, month, 1)
+    following = datetime.date(year + month // 12, month % 12 + 1, 1)
+    return day_number(first), day_number(following) - 1
+
+
+def previous_month():
+    """Period of the last complete calendar month"""
+    last_day = day_to_date(today()).replace(day=1) - datetime.timedelta(days=1)
+    return month_period(last_day.year, last_day.month)
+
+
+def parse_period(text):
+    """'YYYY-MM' (a month) or 'YYYY-MM-DD:YYYY-MM-DD' (inclusive range) -> day numbers"""
+    try:
+        if ':' in text:
+            start, end = (day_number(datetime.date.fromisoformat(part)) for part in text.split(':', 1))
+        else:
+            year, month = (int(part) for part in text.split('-'))
+            start, end = month_period(year, month)
+    except ValueError:
+        raise ValueError(f"Invalid period '{text}' (use YYYY-MM or YYYY-MM-DD:YYYY-MM-DD)") from None
+    if end < start:
+        raise ValueError(f"Invalid period '{text}': it ends before it starts")
+    return start, end
+
+
+def period_label(start_day, end_day):
+    return f"{format_day(start_day)}_{format_day(end_day)}"
+
+
+def collect_statements(bank, start_day, end_day, account_numbers=None):
+    """Yield one statement dict per account (all accounts, or account_numbers).
+
+    A statement holds the account and owner, the period, the opening and
+    closing balances, and its rows as (ts, type, amount, success, error,
+    transfer_id) tuples, with debits as negative amounts.
+    """
+    bank.sync_changes()
+    wanted = set(bank.accounts) if account_numbers is None else set(account_numbers) & set(bank.accounts)
+
+    rows = {acc_num: [] for acc_num in wanted}
+    period_change = dict.fromkeys(wanted, 0.0)
+    later_change = dict.fromkeys(wanted, 0.0)
+    signs = [BALANCE_SIGNS.get(code, 0) for code in range(256)]
+
+    for history, first_index in bank.archive.period_logs(bank.transaction_history, start_day):
+        days = history.column('day')
+        accounts = history.column('account_number')
+        types = history.column('type')
+        amounts = history.column('amount')
+        successes = history.column('success')
+        for index in range(first_index, len(history)):
+            day = days[index]
+            if day < start_day:
+                continue
+            acc_num = accounts[index]
+            if acc_num not in wanted:
+                continue
+            change = signs[types[index]] * amounts[index] if successes[index] else 0.0
+            if day > end_day:
+                later_change[acc_num] += change
+                continue
+            period_change[acc_num] += change
+            row = history[index]
+            amount = signs[types[index]] * row['amount'] or row['amount']
+            rows[acc_num].append((row['ts'], row['type'], amount, row['success'],
+                                  row['error'], row['transfer_id']))
+
+    for acc_num in sorted(wanted):
+        account = bank.accounts[acc_num]
+        closing = account.account_balance - later_change[acc_num]
+        yield {
+            'account_number': acc_num,
+            'owner': account.account_owner.full_name,
+            'start_day': start_day,
+            'end_day': end_day,
+            'opening_balance': round(closing - period_change[acc_num], 2),
+            'closing_balance': round(closing, 2),
+            'rows': rows[acc_num]
+        }
+
+
+def render_text(statement):
+    """Statement as a fixed-width text document"""
+    lines = [
+        "ACCOUNT STATEMENT",
+        "=" * 75,
+        f"Account: {statement['account_number']}    Owner: {statement['owner']}",
+        f"Period:  {format_day(statement['start_day'])} to {format_day(statement['end_day'])}",
+        "-" * 75,
+        f"{'Time':<20} {'Type':<16} {'Amount':>12}  {'Status':<8} {'Reference'}",
+        "-" * 75,
+        f"{'':<20} {'OPENING BALANCE':<16} {statement['opening_balance']:>12.2f}",
+    ]
+    for ts, kind, amount, success, error, transfer_id in statement['rows']:
+        status = "OK" if success else "FAILED"
+        reference = f"transfer {transfer_id}" if transfer_id else error
+        lines.append(f"{format_ts(ts):<20} {kind:<16} {amount:>12.2f}  {status:<8} {reference}")
+    lines += [
+        f"{'':<20} {'CLOSING BALANCE':<16} {statement['closing_balance']:>12.2f}",
+        "=" * 75,
+        f"{len(statement['rows'])} transaction(s)",
+        ""
+    ]
+    return "\n".join(lines)
+
+
+def render_csv(statement):
+    """Statement as CSV: one row per transaction between opening and closing rows"""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(['account_number', 'time', 'type', 'amount', 'success', 'error', 'transfer_id'])
+    acc_num = statement['account_number']
+    writer.writerow([acc_num, format_day(statement['start_day']), 'OPENING_BALANCE',
+                     f"{statement['opening_balance']:.2f}", '', '', ''])
+    for ts, kind, amount, success, error, transfer_id in statement['rows']:
+        writer.writerow([acc_num, format_ts(ts), kind, f"{amount:.2f}", int(success), error,
+                         transfer_id or ''])
+    writer.writerow([acc_num, format_day(statement['end_day']), 'CLOSING_BALANCE',
+                     f"{statement['closing_balance']:.2f}", '', '', ''])
+    return out.getvalue()
+
+
+RENDERERS = {'text': (render_text, '.txt'), 'csv': (render_csv, '.csv')}
+
+
+def render_chunk(statements, out_dir, fmt):
+    """Render and write a chunk of statements (runs in a worker process); returns the count"""
+    render, suffix = RENDERERS[fmt]
+    for statement in statements:
+        name = f"{statement['account_number']}_{period_label(statement['start_day'], statement['end_day'])}{suffix}"
+        with open(os.path.join(out_dir, name), 'w', newline='') as f:
+            f.write(render(statement))
+    return len(statements)
+
+
+def write_statements(statements, out_dir, fmt='text', workers=None, chunk_size=500):
+    """Write statements to out_dir across a process pool (workers=None: one per core).
+
+    statements may be a generator; it is consumed chunk by chunk, and at most
+    a few chunks per worker are in flight at any time. Returns the number of
+    statements written.
+    """
+    if fmt not in RENDERERS:
+        raise ValueError(f"Unknown statement format: {fmt} (choose from {', '.join(FORMATS)})")
+    os.makedirs(out_dir, exist_ok=True)
+    if workers == 1:
+        return sum(render_chunk(chunk, out_dir, fmt) for chunk in chunked(statements, chunk_size))
+
+    workers = workers or os.cpu_count() or 1
+    written = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for chunk in chunked(statements, chunk_size):
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                written += sum(future.result() for future in done)
+            pending.add(pool.submit(render_chunk, chunk, out_dir, fmt))
+        written += sum(future.result() for future in pending)
+    return written
+
+
+def chunked(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,45 @@
+# banking_stats.py - Book Statistics (safe to run off the Tk thread)
+"""
+Pure functions that aggregate the book. They only read the snapshot they
+are given, so the GUIs can run them in a worker thread (see
+banking_views.BackgroundTasks) and keep the Tk main loop responsive.
+"""
+
+from banking_records import today as today_number
+
+
+def compute_statistics(accounts, successes, days, today=None):
+    """Aggregate account balances and the transactions of the given columns.
+
+    accounts is a list copy of the account objects (list(dict.values()) is a
+    fast C-level copy the Tk thread can afford). successes and days are
+    copies of the history's 'success' and 'day' columns
+    (TransactionLog.copy_columns): the live arrays lose their prefix when
+    history is archived, so the worker must not read them. today is the day
+    number whose transactions are counted (default: the current date).
+    """
+    history_length = len(days)
+    today = today_number() if today is None else today
+    stats = {
+        'total_accounts': len(accounts),
+        'total_balance': 0.0,
+        'max_balance': 0.0,
+        'min_balance': 0.0,
+        'premium_accounts': 0,
+        'total_transactions': history_length,
+        'successful_transactions': 0,
+        'today_transactions': 0
+    }
+    if accounts:
+        values = [account.account_balance for account in accounts]
+        stats['total_balance'] = sum(values)
+        stats['max_balance'] = max(values)
+        stats['min_balance'] = min(values)
+        stats['premium_accounts'] = sum(1 for balance in values if balance > 1000)
+    stats['average_balance'] = stats['total_balance'] / max(len(accounts), 1)
+
+    # Counted over the raw columns: no per-row objects are created
+    stats['successful_transactions'] = successes.count(1)
+    stats['today_transactions'] = days.count(today)
+    stats['success_rate'] = stats['successful_transactions'] / max(history_length, 1) * 100
+    return stats
@@ -0,0 +1,330 @@
+# banking_views.py - Incremental View Models for the Tk GUIs
+"""
+Keeps list widgets in step with the book by touching only the rows that
+changed.
+
+KeyedListModel holds one row per key (account number) in sorted order. After
+an operation the GUI passes the account numbers the engine reported as
+changed; the model re-formats just those rows and applies the difference to
+the widget:
+
+- same text            -> nothing
+- new text, same place -> replace that one row (selection is kept)
+- new sort position    -> delete + insert at the bisected position
+- account gone         -> delete the row
+
+So a deposit costs O(changed rows * log n) instead of clearing and
+re-inserting every account. Without a widget the model simply tracks the
+rows (used for combobox 'values', which only need re-assigning when update()
+reports a change).
+
+AccountPager shows one page of a sorted, filtered book in such a model and
+only ever asks the engine for the visible window.
+
+RefreshScheduler batches panel redraws so several changes in a row cost one
+refresh, and BackgroundTasks moves heavy computations off the Tk thread.
+"""
+
+import bisect
+from concurrent.futures import ThreadPoolExecutor
+from banking_index import account_matches, sort_name
+
+
+def account_number_of(account):
+    return account.account_number
+
+
+class KeyedListModel:
+    """Sorted, keyed rows mirrored into a tk.Listbox (or kept as a plain list)"""
+
+    def __init__(self, format_row, widget=None, sort_key=account_number_of, key=account_number_of):
+        self.format_row = format_row
+        self.widget = widget
+        self.sort_key = sort_key
+        self.key = key
+        # key -> (sort value, row text)
+        self._rows = {}
+        # sorted [(sort value, key)], parallel to the widget rows
+        self._order = []
+
+    def __len__(self):
+        return len(self._order)
+
+    def rows(self):
+        """Row texts in display order"""
+        return [self._rows[key][1] for _, key in self._order]
+
+    def key_at(self, index):
+        """Key (account number) of the row at a widget index"""
+        return self._order[index][1]
+
+    def index_of(self, key):
+        """Widget index of a key, or None if it is not shown"""
+        row = self._rows.get(key)
+        return None if row is None else self._position(row[0], key)
+
+    def _position(self, sort_value, key):
+        return bisect.bisect_left(self._order, (sort_value, key))
+
+    def reset(self, items):
+        """Replace all rows (initial fill, new filter, manual refresh)"""
+        self._rows = {self.key(item): (self.sort_key(item), self.format_row(item)) for item in items}
+        self._order = sorted((sort_value, key) for key, (sort_value, _) in self._rows.items())
+        if self.widget is not None:
+            self.widget.delete(0, 'end')
+            if self._order:
+                self.widget.insert('end', *self.rows())
+
+    def update(self, items, keys, accept=None):
+        """Re-sync the rows for the given keys.
+
+        items maps key -> item (missing = removed); accept(item) can hide items
+        that do not match the current filter. Returns True if any row changed.
+        """
+        changed = False
+        for key in keys:
+            item = items.get(key)
+            if item is not None and accept is not None and not accept(item):
+                item = None
+            if self._set(key, item):
+                changed = True
+        return changed
+
+    def _set(self, key, item):
+        old = self._rows.get(key)
+        if item is None:
+            if old is None:
+                return False
+            self._remove(old[0], key)
+            return True
+
+        sort_value, text = self.sort_key(item), self.format_row(item)
+        if old == (sort_value, text):
+            return False
+        if old is not None and old[0] == sort_value:
+            self._rows[key] = (sort_value, text)
+            self._replace_row(self._position(sort_value, key), text)
+            return True
+        if old is not None:
+            self._remove(old[0], key)
+        index = self._position(sort_value, key)
+        self._order.insert(index, (sort_value, key))
+        self._rows[key] = (sort_value, text)
+        if self.widget is not None:
+            self.widget.insert(index, text)
+        return True
+
+    def _remove(self, sort_value, key):
+        index = self._position(sort_value, key)
+        del self._order[index]
+        del self._rows[key]
+        if self.widget is not None:
+            self.widget.delete(index)
+
+    def _replace_row(self, index, text):
+        if self.widget is None:
+            return
+        selected = self.widget.selection_includes(index)
+        self.widget.delete(index)
+        self.widget.insert(index, text)
+        if selected:
+            self.widget.selection_set(index)
+
+
+class AccountPager:
+    """Paged, sorted and filtered window onto the book for a KeyedListModel.
+
+    Each page is fetched with bank.browse_accounts(), so only page_size
+    accounts are formatted and drawn. After an operation, changed rows that
+    are on the page and keep their place are patched in place. Changes that
+    can move rows between pages (new or deleted accounts, renames under name
+    sort, filter matches, any balance change under balance sort) re-fetch
+    the page. That costs O(page), or O(n log page) for balance sort.
+    """
+
+    SORT_LABELS = {'Number': 'number', 'Name': 'name', 'Balance': 'balance'}
+
+    def __init__(self, bank, list_model, page_size=100):
+        self.bank = bank
+        self.model = list_model
+        self.page_size = page_size
+        self.query = ""
+        self.sort_by = 'number'
+        self.descending = False
+        self.page = 0
+        self.has_more = False
+        self.shown_total = 0
+        # account number -> (position on page, sort value when fetched)
+        self._page = {}
+        self.model.sort_key = lambda account: self._page[account.account_number][0]
+
+    def sort_value(self, account):
+        if self.sort_by == 'name':
+            return sort_name(account)
+        if self.sort_by == 'balance':
+            return account.account_balance
+        return account.account_number
+
+    def set_query(self, query):
+        """Change the filter; returns True if the page has to be re-fetched"""
+        query = query.strip()
+        if query == self.query:
+            return False
+        self.query = query
+        self.page = 0
+        return True
+
+    def set_sort(self, sort_by, descending=False):
+        self.sort_by = sort_by
+        self.descending = descending
+        self.page = 0
+        self.reload()
+
+    def next_page(self):
+        if self.has_more:
+            self.page += 1
+            self.reload()
+
+    def previous_page(self):
+        if self.page > 0:
+            self.page -= 1
+            self.reload()
+
+    def reload(self):
+        """Fetch and draw the current page"""
+        accounts, self.has_more = self.bank.browse_accounts(
+            self.query, self.sort_by, self.descending,
+            self.page * self.page_size, self.page_size)
+        if not accounts and self.page > 0:
+            # The page emptied (accounts deleted or filter narrowed): step back
+            self.page -= 1
+            return self.reload()
+        self._page = {account.account_number: (position, self.sort_value(account))
+                      for position, account in enumerate(accounts)}
+        self.shown_total = len(self.bank.accounts)
+        self.model.reset(accounts)
+
+    def apply_changes(self, changes):
+        """Bring the page up to date after the given account changes (None = everything)"""
+        accounts = self.bank.accounts
+        if changes is None or self.sort_by == 'balance' or len(accounts) != self.shown_total:
+            return self.reload()
+        on_page = []
+        for acc_num in changes:
+            account = accounts.get(acc_num)
+            if account is None:
+                return self.reload()
+            matches = not self.query or account_matches(account, self.query)
+            if acc_num in self._page:
+                if not matches or self.sort_value(account) != self._page[acc_num][1]:
+                    return self.reload()
+                on_page.append(acc_num)
+            elif self.query and matches or self.sort_by == 'name':
+                # May belong on this page now (or have shifted the page)
+                return self.reload()
+        self.model.update(accounts, on_page)
+
+    def describe(self):
+        """Page position for a status label"""
+        if not self._page:
+            return "No accounts"
+        first = self.page * self.page_size + 1
+        last = first + len(self._page) - 1
+        return f"Page {self.page + 1} · {first}-{last}{'+' if self.has_more else ''}"
+
+
+class RefreshScheduler:
+    """Coalesces refresh requests into at most one redraw per frame.
+
+    Panels are registered by name. mark() only sets dirty flags and schedules
+    a single root.after() callback, so any number of state changes within one
+    frame cause one refresh. A panel may also supply inputs(), a cheap
+    signature of what it displays; if the signature is unchanged since its
+    last draw the panel is skipped even when marked. Nothing runs while
+    nothing is marked, so an idle GUI does no work.
+    """
+
+    def __init__(self, root, delay=16):
+        self.root = root
+        self.delay = delay
+        # name -> (callback, inputs), in registration (= drawing) order
+        self._panels = {}
+        self._dirty = set()
+        self._signatures = {}
+        self._pending = None
+
+    def register(self, name, callback, inputs=None):
+        self._panels[name] = (callback, inputs)
+
+    def mark(self, *names):
+        """Schedule a refresh of the named panels (all panels if none given)"""
+        self._dirty.update(names or self._panels)
+        if self._pending is None:
+            self._pending = self.root.after(self.delay, self.flush)
+
+    def invalidate(self, *names):
+        """Forget input signatures so the panels redraw even if unchanged"""
+        for name in names or list(self._signatures):
+            self._signatures.pop(name, None)
+        self.mark(*names)
+
+    def flush(self):
+        """Redraw every dirty panel whose inputs changed"""
+        self._pending = None
+        dirty, self._dirty = self._dirty, set()
+        for name, (callback, inputs) in self._panels.items():
+            if name not in dirty:
+                continue
+            if inputs is not None:
+                signature = inputs()
+                if name in self._signatures and self._signatures[name] == signature:
+                    continue
+                self._signatures[name] = signature
+            callback()
+
+
+class BackgroundTasks:
+    """Runs computations in a worker thread and publishes results on the Tk thread.
+
+    Tk must only be touched from the main thread, so workers never call into
+    Tk: the main loop polls the job's future with root.after() and hands the
+    result to publish(). Submitting a job under a name that is still running
+    supersedes it - a not yet started job is cancelled and a finished stale
+    result is dropped, so only the newest numbers are ever shown.
+    """
+
+    def __init__(self, root, workers=1, poll_interval=50):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="banking-worker")
+        # name -> (generation, future) of the newest job
+        self._jobs = {}
+
+    def submit(self, name, compute, publish, *args, on_error=None):
+        previous = self._jobs.get(name)
+        generation = previous[0] + 1 if previous else 1
+        if previous:
+            previous[1].cancel()
+        future = self.executor.submit(compute, *args)
+        self._jobs[name] = (generation, future)
+        self.root.after(self.poll_interval, self._check, name, generation, future, publish, on_error)
+
+    def _check(self, name, generation, future, publish, on_error):
+        if self._jobs.get(name, (None,))[0] != generation:
+            return  # superseded by a newer job
+        if not future.done():
+            self.root.after(self.poll_interval, self._check, name, generation, future, publish, on_error)
+            return
+        del self._jobs[name]
+        try:
+            result = future.result()
+        except Exception as e:
+            if on_error is not None:
+                on_error(e)
+            return
+        publish(result)
+
+    def shutdown(self):
+        """Drop pending jobs (call when the window closes)"""
+        self._jobs.clear()
+        self.executor.shutdown(wait=False, cancel_futures=True)
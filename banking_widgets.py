@@ -0,0 +1,47 @@
+# banking_widgets.py - Reusable Tk Widgets for the Banking GUIs
+
+from tkinter import ttk
+
+
+def account_choice(account):
+    """Text shown for an account in pickers: '123456 - Jane Smith'"""
+    return f"{account.account_number} - {account.account_owner.full_name}"
+
+
+class AccountPicker(ttk.Combobox):
+    """Account entry with autocomplete suggestions.
+
+    Instead of loading every account into 'values' (unusable for big books)
+    the drop-down only holds the few accounts matching what has been typed so
+    far - owner name prefix or account number prefix - fetched from the
+    engine's indexes on each keystroke. The text keeps the usual
+    '123456 - Jane Smith' form, and a bare account number is accepted too.
+    """
+
+    def __init__(self, master, bank, max_suggestions=10, **kwargs):
+        super().__init__(master, postcommand=self.update_suggestions, **kwargs)
+        self.bank = bank
+        self.max_suggestions = max_suggestions
+        self.bind('<KeyRelease>', self.on_key_release)
+
+    def search_text(self):
+        text = self.get().strip()
+        # A picked entry searches by its account number
+        return text.split(" - ")[0] if " - " in text else text
+
+    def update_suggestions(self):
+        text = self.search_text()
+        if text:
+            matches = self.bank.search_accounts(text, self.max_suggestions)
+        else:
+            matches, _ = self.bank.browse_accounts(limit=self.max_suggestions)
+        self['values'] = [account_choice(account) for account in matches]
+
+    def on_key_release(self, event):
+        if event.keysym in ('Up', 'Down', 'Return', 'Escape', 'Tab'):
+            return
+        self.update_suggestions()
+
+    def account_number(self):
+        """Account number entered or picked (ValueError if there is none)"""
+        return int(self.search_text())
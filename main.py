@@ -194,7 +194,9 @@ def show_system_info():
         ('Enhanced_Professional_GUI.py', 'Ultra-modern GUI interface'),
         ('banking_dashboard.py', 'Analytics and statistics'),
         ('banking_art.py', 'ASCII art and visual elements'),
-        ('Creative_Banking_Launcher.py', 'Creative module launcher')
+        ('Creative_Banking_Launcher.py', 'Creative module launcher'),
+        ('banking_cli.py', 'Non-interactive command line interface'),
+        ('banking_daemon.py', 'Persistent in-memory banking service')
     ]
     
     for module, description in modules:
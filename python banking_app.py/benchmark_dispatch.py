@@ -0,0 +1,108 @@
+# benchmark_dispatch.py - cost per transaction of the Bank hot path
+#
+#     python benchmark_dispatch.py [--transactions N] [--accounts N] [--repeat N]
+#
+# compares the old if/elif chain on type strings with the dispatch table
+# (perform_transaction) and the batch path (perform_transactions); each
+# figure is the best of --repeat runs on a fresh bank, since single runs
+# are noisy
+import argparse
+import random
+import time
+
+from base_model import Bank, Transaction, TransactionType
+
+
+# the pre-dispatch-table perform_transaction, kept here as the baseline
+def perform_with_if_chain(bank, account_id, transaction):
+    account = bank.get_account(account_id)
+    if not account:
+        raise ValueError("Account not found.")
+    if transaction.get_type() == "deposit":
+        account.deposit(transaction.get_amount())
+    elif transaction.get_type() == "withdrawal":
+        account.withdraw(transaction.get_amount())
+    else:
+        raise ValueError("Invalid transaction type.")
+    return account
+
+
+def make_bank(accounts):
+    bank = Bank()
+    for i in range(accounts):
+        bank.create_account(str(i), f"Holder {i}", 1000)
+    return bank
+
+
+def make_stream(count, accounts, kinds):
+    rng = random.Random(42)
+    return [(str(rng.randrange(accounts)), Transaction(rng.choice(kinds), rng.choice((5, 10, 20, 50))))
+            for _ in range(count)]
+
+
+def run_loop(perform, bank, stream):
+    start = time.perf_counter()
+    for account_id, transaction in stream:
+        try:
+            perform(bank, account_id, transaction)
+        except ValueError:
+            pass
+    return time.perf_counter() - start
+
+
+def run_batch(bank, stream):
+    start = time.perf_counter()
+    bank.perform_transactions(stream)
+    return time.perf_counter() - start
+
+
+def best_of(repeat, run, accounts, count, kinds):
+    return min(run(make_bank(accounts), make_stream(count, accounts, kinds))
+               for _ in range(repeat))
+
+
+def report(label, seconds, count):
+    print(f"{label:<34} {seconds * 1e9 / count:8.0f} ns/transaction")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bank transaction dispatch benchmark")
+    parser.add_argument('--transactions', type=int, default=200000)
+    parser.add_argument('--accounts', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    n = args.transactions
+
+    def if_chain(bank, stream):
+        return run_loop(perform_with_if_chain, bank, stream)
+
+    def dispatch(bank, stream):
+        return run_loop(Bank.perform_transaction, bank, stream)
+
+    basic = ["deposit", "withdrawal"]
+    print(f"{n} deposits/withdrawals over {args.accounts} accounts")
+    report("if/elif chain", best_of(args.repeat, if_chain, args.accounts, n, basic), n)
+    report("dispatch table", best_of(args.repeat, dispatch, args.accounts, n, basic), n)
+    report("perform_transactions (batch)", best_of(args.repeat, run_batch, args.accounts, n, basic), n)
+
+    # the table lookup alone: a loop with and without handlers.get()
+    handlers = {kind.value: None for kind in TransactionType}
+    stream = make_stream(n, args.accounts, basic)
+    start = time.perf_counter()
+    for _, transaction in stream:
+        transaction.get_type()
+    bare = time.perf_counter() - start
+    start = time.perf_counter()
+    for _, transaction in stream:
+        handlers.get(transaction.get_type())
+    report("handler lookup (dict.get) only", time.perf_counter() - start - bare, n)
+
+    mixed = [TransactionType.DEPOSIT, TransactionType.WITHDRAWAL,
+             TransactionType.FEE, TransactionType.INTEREST]
+    print(f"\n{n} transactions incl. fees and interest")
+    report("dispatch table", best_of(args.repeat, dispatch, args.accounts, n, mixed), n)
+    report("perform_transactions (batch)", best_of(args.repeat, run_batch, args.accounts, n, mixed), n)
+
+
+if __name__ == "__main__":
+    main()
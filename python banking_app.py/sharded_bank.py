@@ -0,0 +1,185 @@
+# sharded_bank.py - Bank that can be shared by worker threads
+#
+# accounts are split over N shards by hash(account_id); each shard is a
+# plain base_model.Bank guarded by its own lock, so threads working on
+# different shards never wait for each other
+#
+#     python sharded_bank.py [--threads 1,2,4,8] [--shards 64]
+#
+# replays the same transaction streams with each thread count and prints
+# the throughput
+#
+# the shard locks keep the bank correct under threads; they do not make it
+# faster on the standard (GIL) build. There only one thread runs Python code
+# at a time, and every extra thread adds GIL handoffs: measured throughput
+# drops from ~730k tx/s with 1 thread to ~440k tx/s with 4 on a multi-core
+# machine. Threads can only pay off on a free-threaded build, so
+# replay_streams uses a single worker unless told otherwise when the GIL is
+# enabled
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from base_model import Bank, Transaction, TransactionType
+
+
+# create class ShardedBank
+class ShardedBank:
+    def __init__(self, shards=16):
+        if shards < 1:
+            raise ValueError("A bank needs at least one shard.")
+        self.__shards = [Bank() for _ in range(shards)]
+        self.__locks = [threading.Lock() for _ in range(shards)]
+
+    def shard_count(self):
+        return len(self.__shards)
+
+    def shard_of(self, account_id):
+        return hash(account_id) % len(self.__shards)
+
+    def create_account(self, account_id, holder_name, initial_balance=0):
+        shard = self.shard_of(account_id)
+        with self.__locks[shard]:
+            return self.__shards[shard].create_account(account_id, holder_name, initial_balance)
+
+    def get_account(self, account_id):
+        return self.__shards[self.shard_of(account_id)].get_account(account_id)
+
+    def register_handler(self, transaction_type, handler):
+        for shard, lock in zip(self.__shards, self.__locks):
+            with lock:
+                shard.register_handler(transaction_type, handler)
+
+    def perform_transaction(self, account_id, transaction):
+        shard = self.shard_of(account_id)
+        with self.__locks[shard]:
+            return self.__shards[shard].perform_transaction(account_id, transaction)
+
+    # same contract as Bank.perform_transactions; the batch is split by
+    # shard and every shard applies its part under its lock in one go
+    # (a transaction only touches its own account, so the order within
+    # each account - all that matters - is kept)
+    def perform_transactions(self, transactions):
+        shard_count = len(self.__shards)
+        groups = {}
+        for index, pair in enumerate(transactions):
+            group = groups.get(hash(pair[0]) % shard_count)
+            if group is None:
+                group = groups[hash(pair[0]) % shard_count] = ([], [])
+            group[0].append(index)
+            group[1].append(pair)
+
+        failures = []
+        for shard, (indexes, pairs) in groups.items():
+            with self.__locks[shard]:
+                shard_failures = self.__shards[shard].perform_transactions(pairs)
+            failures.extend((indexes[i], message) for i, message in shard_failures)
+        failures.sort()
+        return failures
+
+    # move amount between two accounts atomically: both shards are locked,
+    # always in shard order, so two opposite transfers cannot deadlock;
+    # returns the (withdrawal, deposit) transactions
+    def transfer(self, from_id, to_id, amount):
+        if from_id == to_id:
+            raise ValueError("Cannot transfer to the same account.")
+        shards = sorted({self.shard_of(from_id), self.shard_of(to_id)})
+        for shard in shards:
+            self.__locks[shard].acquire()
+        try:
+            source = self.__shards[self.shard_of(from_id)]
+            destination = self.__shards[self.shard_of(to_id)]
+            if destination.get_account(to_id) is None:
+                raise ValueError("Account not found.")
+            withdrawal = Transaction(TransactionType.WITHDRAWAL, amount)
+            deposit = Transaction(TransactionType.DEPOSIT, amount)
+            source.perform_transaction(from_id, withdrawal)
+            try:
+                destination.perform_transaction(to_id, deposit)
+            except Exception:
+                source.perform_transaction(from_id, Transaction.reversal_of(withdrawal))
+                raise
+            return withdrawal, deposit
+        finally:
+            for shard in reversed(shards):
+                self.__locks[shard].release()
+
+    def total_balance(self):
+        total = 0
+        for shard, lock in zip(self.__shards, self.__locks):
+            with lock:
+                total += shard.total_balance()
+        return total
+
+
+def gil_enabled():
+    return getattr(sys, '_is_gil_enabled', lambda: True)()
+
+
+# replay transaction streams (iterables of (account_id, transaction)) with a
+# pool of worker threads, one stream per task, batch_size transactions per
+# perform_transactions call; returns the failures of each stream, with
+# indexes counted from the start of that stream. workers=None means one per
+# core on a free-threaded build and one with the GIL (see the top of the file)
+def replay_streams(bank, streams, workers=None, batch_size=1000):
+    if workers is None:
+        workers = 1 if gil_enabled() else os.cpu_count() or 1
+    def replay(stream):
+        failures = []
+        batch = []
+        offset = 0
+        for pair in stream:
+            batch.append(pair)
+            if len(batch) >= batch_size:
+                failures.extend((offset + i, message)
+                                for i, message in bank.perform_transactions(batch))
+                offset += len(batch)
+                batch = []
+        if batch:
+            failures.extend((offset + i, message)
+                            for i, message in bank.perform_transactions(batch))
+        return failures
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bank-replay") as pool:
+        return list(pool.map(replay, streams))
+
+
+def make_streams(stream_count, length, accounts, seed=42):
+    rng = random.Random(seed)
+    kinds = [TransactionType.DEPOSIT, TransactionType.WITHDRAWAL]
+    return [[(str(rng.randrange(accounts)), Transaction(rng.choice(kinds), rng.choice((5, 10, 20, 50))))
+             for _ in range(length)]
+            for _ in range(stream_count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ShardedBank replay throughput")
+    parser.add_argument('--threads', default="1,2,4,8", help="comma-separated thread counts")
+    parser.add_argument('--shards', type=int, default=64)
+    parser.add_argument('--accounts', type=int, default=10000)
+    parser.add_argument('--streams', type=int, default=8)
+    parser.add_argument('--length', type=int, default=50000, help="transactions per stream")
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    gil = gil_enabled()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}, "
+          f"{args.shards} shards, {args.streams} x {args.length} transactions")
+    total = args.streams * args.length
+    for threads in (int(t) for t in args.threads.split(',')):
+        bank = ShardedBank(args.shards)
+        for i in range(args.accounts):
+            bank.create_account(str(i), f"Holder {i}", 1000)
+        streams = make_streams(args.streams, args.length, args.accounts)
+        start = time.perf_counter()
+        replay_streams(bank, streams, workers=threads, batch_size=args.batch_size)
+        seconds = time.perf_counter() - start
+        print(f"{threads:>3} thread(s): {total / seconds:12,.0f} transactions/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Account number allocation and check digits"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from banking_allocator import AccountNumberAllocator, is_valid_account_number
+
+
+class CheckDigitTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.state_file = os.path.join(self.directory, "banking_data.alloc")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_new_book_takes_the_constructor_setting(self):
+        allocator = AccountNumberAllocator(self.state_file, check_digit=True)
+        number = allocator.allocate()
+        self.assertEqual(number, 1000009)
+        self.assertTrue(is_valid_account_number(number))
+        # The stored setting wins over a later constructor argument
+        self.assertTrue(is_valid_account_number(AccountNumberAllocator(self.state_file).allocate()))
+
+    def test_switching_never_reuses_numbers(self):
+        allocator = AccountNumberAllocator(self.state_file)
+        other = AccountNumberAllocator(self.state_file)
+        issued = [allocator.allocate(), other.allocate()]
+
+        allocator.set_check_digit(True)
+        checked = [allocator.allocate(), AccountNumberAllocator(self.state_file).allocate()]
+        self.assertTrue(all(is_valid_account_number(number) for number in checked))
+
+        allocator.set_check_digit(False)
+        plain = allocator.allocate()
+        self.assertGreater(plain, max(checked))
+        issued += checked + [plain, other.allocate()]
+        self.assertEqual(len(set(issued)), len(issued))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""Archiving: rows leave every running front end, not just the archiving one"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Enhanced_BankingApp
+from Enhanced_BankingApp import EnhancedBankingSystem
+from banking_records import AUDIT_SEGMENT_ROWS, today
+
+
+class ArchiveTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.data_file = os.path.join(self.directory, "banking_data.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def open_system(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return EnhancedBankingSystem(self.data_file, auto_save=False)
+
+    def add_rows(self, system, count):
+        def stage():
+            system.log_batch("INTEREST", [123456] * count, [0.01] * count)
+            return lambda: None
+        system.run_operation(stage)
+
+    def archive_everything(self, system):
+        # Every row so far counts as older than the cutoff
+        with mock.patch.object(Enhanced_BankingApp, 'today', return_value=today() + 1):
+            return system.archive_history(0)
+
+    def test_running_front_end_drops_archived_rows(self):
+        archiver = self.open_system()
+        self.add_rows(archiver, AUDIT_SEGMENT_ROWS + 10)
+        running = self.open_system()
+        total = archiver.transaction_history.archived_rows + len(archiver.transaction_history)
+
+        moved = self.archive_everything(archiver)
+        self.assertEqual(moved, AUDIT_SEGMENT_ROWS)
+
+        # The running front end checkpoints later: the rows stay archived
+        running.deposit(123456, 1)
+        running.save_data()
+        with open(self.data_file) as f:
+            history = json.load(f)['transaction_history']
+        self.assertEqual(history['archived']['rows'], AUDIT_SEGMENT_ROWS)
+        self.assertEqual(len(running.transaction_history), total + 1 - AUDIT_SEGMENT_ROWS)
+        self.assertEqual(running.rollups.through, total + 1)
+
+    def test_replay_from_older_snapshot_drops_archived_rows(self):
+        system = self.open_system()
+        system.save_data()
+        self.add_rows(system, AUDIT_SEGMENT_ROWS)
+        self.archive_everything(system)
+        os.replace(self.data_file + ".bak", self.data_file)
+
+        reopened = self.open_system()
+        self.assertEqual(reopened.transaction_history.archived_rows, AUDIT_SEGMENT_ROWS)
+        self.assertEqual(reopened.rollups.totals(), system.rollups.totals())
+
+
+if __name__ == "__main__":
+    unittest.main()
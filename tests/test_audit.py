@@ -0,0 +1,83 @@
+"""Audit chain: rows after the last full segment are chained too"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Enhanced_BankingApp import EnhancedBankingSystem
+from banking_audit import verify_log
+
+
+class TailAnchorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.data_file = os.path.join(self.directory, "banking_data.json")
+        system = self.open_system()
+        for amount in range(1, 12):
+            system.deposit(123456, amount)
+        system.save_data()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def open_system(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return EnhancedBankingSystem(self.data_file, auto_save=False)
+
+    def edit_snapshot(self, change):
+        with open(self.data_file) as f:
+            data = json.load(f)
+        change(data['transaction_history'])
+        with open(self.data_file, 'w') as f:
+            json.dump(data, f)
+
+    def test_untouched_tail_verifies(self):
+        system = self.open_system()
+        system.deposit(123456, 1)
+        self.assertTrue(verify_log(system.transaction_history, workers=1)['ok'])
+
+    def test_edited_tail_row_fails(self):
+        def change(history):
+            history['amount'][5] = 5000.0
+        self.edit_snapshot(change)
+        report = verify_log(self.open_system().transaction_history, workers=1)
+        self.assertFalse(report['ok'])
+        self.assertIn("do not match the tail anchor", report['problems'][0])
+
+    def test_removed_tail_row_fails(self):
+        def change(history):
+            for name in ('ts', 'day', 'account_number', 'type', 'amount', 'success',
+                         'error', 'transfer_id'):
+                del history[name][-1]
+        self.edit_snapshot(change)
+        self.assertFalse(verify_log(self.open_system().transaction_history, workers=1)['ok'])
+
+    def test_edit_is_not_sealed_by_a_later_checkpoint(self):
+        def change(history):
+            history['amount'][2] = 5000.0
+        self.edit_snapshot(change)
+        with open(self.data_file) as f:
+            saved_tail = json.load(f)['transaction_history']['tail']
+        system = self.open_system()
+        system.deposit(123456, 1)
+        system.save_data()
+
+        with open(self.data_file) as f:
+            self.assertEqual(json.load(f)['transaction_history']['tail'], saved_tail)
+        self.assertFalse(verify_log(self.open_system().transaction_history, workers=1)['ok'])
+
+    def test_stripped_tail_anchor_fails(self):
+        self.edit_snapshot(lambda history: history.pop('tail'))
+        self.assertFalse(verify_log(self.open_system().transaction_history, workers=1)['ok'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+"""base_model.Bank: transaction handlers, and batches that behave like single calls"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "python banking_app.py"))
+
+from base_model import Bank, Transaction, TransactionType
+
+
+def make_bank():
+    bank = Bank()
+    for i in range(5):
+        bank.create_account(str(i), f"Holder {i}", 100)
+    return bank
+
+
+def make_stream(count):
+    rng = random.Random(7)
+    kinds = ["deposit", "withdrawal", "fee", "interest", "bogus"]
+    return [(str(rng.randrange(6)), Transaction(rng.choice(kinds), rng.choice((-5, 0.01, 10, 80))))
+            for _ in range(count)]
+
+
+class BatchTest(unittest.TestCase):
+
+    def test_batch_matches_single_calls(self):
+        single, batched = make_bank(), make_bank()
+        single_stream, batch_stream = make_stream(500), make_stream(500)
+        failures = []
+        for index, (account_id, transaction) in enumerate(single_stream):
+            try:
+                single.perform_transaction(account_id, transaction)
+            except ValueError as e:
+                failures.append((index, str(e)))
+
+        self.assertEqual(batched.perform_transactions(batch_stream), failures)
+        for i in range(5):
+            self.assertAlmostEqual(batched.get_account(str(i)).get_balance(),
+                                   single.get_account(str(i)).get_balance())
+        for (_, one), (_, other) in zip(single_stream, batch_stream):
+            self.assertEqual((one.get_change(), one.get_account_id()),
+                             (other.get_change(), other.get_account_id()))
+
+    def test_batched_deposit_and_withdrawal_can_be_reversed(self):
+        bank = make_bank()
+        deposit = Transaction(TransactionType.DEPOSIT, 50)
+        withdrawal = Transaction(TransactionType.WITHDRAWAL, 30)
+        self.assertEqual(bank.perform_transactions([("0", deposit), ("1", withdrawal)]), [])
+
+        bank.perform_transaction("0", Transaction.reversal_of(deposit))
+        bank.perform_transaction("1", Transaction.reversal_of(withdrawal))
+        self.assertEqual(bank.get_account("0").get_balance(), 100)
+        self.assertEqual(bank.get_account("1").get_balance(), 100)
+
+    def test_unexpected_error_keeps_earlier_transactions(self):
+        bank = make_bank()
+
+        def broken_fee(account, transaction):
+            raise RuntimeError("fee service down")
+
+        bank.register_handler(TransactionType.FEE, broken_fee)
+        with self.assertRaises(RuntimeError):
+            bank.perform_transactions([("0", Transaction("deposit", 10)),
+                                       ("1", Transaction("withdrawal", 20)),
+                                       ("0", Transaction("fee", 5)),
+                                       ("2", Transaction("deposit", 30))])
+        # as in a loop of perform_transaction calls: applied up to the failure
+        self.assertEqual([bank.get_account(str(i)).get_balance() for i in range(3)],
+                         [110, 80, 100])
+
+
+class HandlerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.bank = make_bank()
+        self.account = self.bank.get_account("0")
+
+    def test_fee_may_overdraw(self):
+        self.bank.perform_transaction("0", Transaction("fee", 150))
+        self.assertEqual(self.account.get_balance(), -50)
+        with self.assertRaisesRegex(ValueError, "Fee amount must be positive"):
+            self.bank.perform_transaction("0", Transaction("fee", 0))
+
+    def test_interest_only_on_positive_balances(self):
+        interest = Transaction(TransactionType.INTEREST, 0.05)
+        self.bank.perform_transaction("0", interest)
+        self.assertAlmostEqual(self.account.get_balance(), 105)
+        self.assertAlmostEqual(interest.get_change(), 5)
+        self.bank.perform_transaction("1", Transaction("fee", 150))
+        self.bank.perform_transaction("1", Transaction("interest", 0.05))
+        self.assertEqual(self.bank.get_account("1").get_balance(), -50)
+
+    def test_reversal_undoes_once_on_the_same_account(self):
+        fee = Transaction("fee", 30)
+        self.bank.perform_transaction("0", fee)
+        with self.assertRaisesRegex(ValueError, "original account"):
+            self.bank.perform_transaction("1", Transaction.reversal_of(fee))
+        self.bank.perform_transaction("0", Transaction.reversal_of(fee))
+        self.assertEqual(self.account.get_balance(), 100)
+        self.assertTrue(fee.is_reversed())
+        with self.assertRaisesRegex(ValueError, "already reversed"):
+            self.bank.perform_transaction("0", Transaction.reversal_of(fee))
+        with self.assertRaisesRegex(ValueError, "Nothing to reverse"):
+            self.bank.perform_transaction("0", Transaction.reversal_of(Transaction("deposit", 5)))
+
+    def test_reversed_deposit_needs_the_funds(self):
+        deposit = Transaction("deposit", 50)
+        self.bank.perform_transaction("0", deposit)
+        self.bank.perform_transaction("0", Transaction("withdrawal", 120))
+        with self.assertRaisesRegex(ValueError, "Insufficient funds"):
+            self.bank.perform_transaction("0", Transaction.reversal_of(deposit))
+
+    def test_registered_handler_replaces_the_built_in_one(self):
+        def capped_deposit(account, transaction):
+            amount = min(transaction.get_amount(), 25)
+            account.deposit(amount)
+            return amount
+
+        self.bank.register_handler("deposit", capped_deposit)
+        deposit = Transaction("deposit", 40)
+        self.bank.perform_transaction("0", deposit)
+        self.assertEqual(deposit.get_change(), 25)
+        self.assertEqual(self.bank.perform_transactions([("0", Transaction("deposit", 40))]), [])
+        self.assertEqual(self.account.get_balance(), 150)
+        # other banks keep the built-in handler
+        other = make_bank()
+        other.perform_transaction("0", Transaction("deposit", 40))
+        self.assertEqual(other.get_account("0").get_balance(), 140)
+
+    def test_unknown_types(self):
+        with self.assertRaisesRegex(ValueError, "Invalid transaction type"):
+            self.bank.perform_transaction("0", Transaction("bogus", 5))
+        with self.assertRaises(ValueError):
+            self.bank.register_handler("bogus", lambda account, transaction: 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+"""CLI commands: amounts are validated before anything is journaled"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Enhanced_BankingApp
+import banking_cli
+from Enhanced_BankingApp import EnhancedBankingSystem
+from banking_cli import main
+from banking_records import today
+
+
+class CliTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.data_file = os.path.join(self.directory, "banking_data.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_cli(self, *argv):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            code = main(['--data-file', self.data_file, *argv])
+        return code, output.getvalue()
+
+    def open_system(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return EnhancedBankingSystem(self.data_file, auto_save=False)
+
+    def test_deposit_and_transfer(self):
+        self.assertEqual(self.run_cli('deposit', '123456', '50')[0], 0)
+        code, output = self.run_cli('transfer', '123456', '789012', '100')
+        self.assertEqual(code, 0)
+        self.assertIn("123456 ($450.00) -> 789012 ($1100.00)", output)
+        system = self.open_system()
+        self.assertEqual(system.accounts[123456].account_balance, 450.0)
+
+    def test_non_finite_amounts_are_rejected(self):
+        for argv in (('deposit', '123456', 'nan'), ('withdraw', '123456', 'NaN'),
+                     ('deposit', '123456', 'inf'), ('transfer', '123456', '789012', 'nan'),
+                     ('create', 'Jane', 'Roe', 'inf'), ('hold', '123456', 'nan'),
+                     ('limit', '123456', 'nan')):
+            code, output = self.run_cli(*argv)
+            self.assertEqual(code, 1, argv)
+            self.assertIn("must be a finite number", output)
+
+        system = self.open_system()
+        self.assertEqual(system.accounts[123456].account_balance, 500.0)
+        self.assertEqual(len(system.accounts), 4)
+        self.assertEqual(len(system.transaction_history), 0)
+        self.assertEqual(system.limits.holds, {})
+        code, output = self.run_cli('summary')
+        self.assertIn("$3450.00", output)
+
+    def test_archive_reports_rows_short_of_a_segment(self):
+        self.run_cli('deposit', '123456', '50')
+        self.run_cli('withdraw', '789012', '25')
+        tomorrow = today() + 1
+        with mock.patch.object(Enhanced_BankingApp, 'today', return_value=tomorrow), \
+                mock.patch.object(banking_cli, 'today', return_value=tomorrow):
+            code, output = self.run_cli('archive', '--days', '0')
+        self.assertEqual(code, 0)
+        self.assertIn("Archived 0 row(s)", output)
+        self.assertIn("2 older row(s) stay live", output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""Customer ids: opaque per customer, names are only a search key"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Enhanced_BankingApp import EnhancedBankingSystem
+
+
+class CustomerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.data_file = os.path.join(self.directory, "banking_data.json")
+        self.system = self.open_system()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def open_system(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return EnhancedBankingSystem(self.data_file, auto_save=False)
+
+    def test_namesakes_are_different_customers(self):
+        first = self.system.open_account("Jane", "Doe", 10)
+        second = self.system.open_account("jane", " DOE ", 20)
+        self.assertNotEqual(first.account_owner.customer_id, second.account_owner.customer_id)
+        self.assertEqual(len(self.system.find_owner_accounts("Jane", "Doe")), 2)
+        self.assertEqual(self.system.customer_summary(first.account_number)['total_holdings'], 10)
+
+    def test_open_account_for_existing_customer(self):
+        first = self.system.open_account("Jane", "Doe", 10)
+        customer_id = first.account_owner.customer_id
+        second = self.system.open_account("", "", 5, customer_id=customer_id)
+        self.assertIs(second.account_owner, first.account_owner)
+        self.assertEqual(self.system.customer_summary(first.account_number)['total_holdings'], 15)
+
+        with self.assertRaises(ValueError):
+            self.system.open_account("John", "Doe", 5, customer_id=customer_id)
+        with self.assertRaises(ValueError):
+            self.system.open_account("Jane", "Doe", 5, customer_id="unknown")
+
+    def test_ids_survive_replay_and_snapshot(self):
+        account = self.system.open_account("Jane", "Doe", 10)
+        replayed = self.open_system()
+        self.assertEqual(replayed.accounts[account.account_number].account_owner.customer_id,
+                         account.account_owner.customer_id)
+        self.system.save_data()
+        reloaded = self.open_system()
+        self.assertEqual(reloaded.accounts[account.account_number].account_owner.customer_id,
+                         account.account_owner.customer_id)
+
+    def test_rename_keeps_a_single_account_customer(self):
+        account = self.system.open_account("Jane", "Doe", 10)
+        renamed = self.system.update_owner(account.account_number, "Jane", "Smith")
+        self.assertEqual(renamed.account_owner.customer_id, account.account_owner.customer_id)
+        self.assertEqual(renamed.account_owner.full_name, "Jane Smith")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""Banking daemon: JSON-lines protocol, token check, and the dashboard it serves"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import socket
+import stat
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from banking_daemon import BankingClient, BankingDaemon
+from banking_dashboard import BankingDashboard
+
+
+class DaemonTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.data_file = os.path.join(self.directory, "banking_data.json")
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.daemon = BankingDaemon(self.data_file, port=0, flush_interval=0)
+        self.thread = threading.Thread(target=self.daemon.serve_forever)
+        self.thread.start()
+        host, port = self.daemon.address
+        self.client = BankingClient(host, port, data_file=self.data_file)
+
+    def tearDown(self):
+        self.client.close()
+        self.daemon.stop()
+        self.thread.join(5)
+        shutil.rmtree(self.directory)
+
+    def raw_request(self, request):
+        """Send one request line and return the decoded response line"""
+        with socket.create_connection(self.daemon.address, timeout=5) as sock:
+            with sock.makefile('rwb') as f:
+                f.write((json.dumps(request) + "\n").encode('utf-8'))
+                f.flush()
+                return json.loads(f.readline())
+
+    def test_commands_run_against_the_book(self):
+        self.assertEqual(self.client.call('ping'), 'pong')
+        self.client.call('deposit', 123456, 50)
+        with self.assertRaisesRegex(ValueError, "Insufficient"):
+            self.client.call('withdraw', 123456, 10000)
+        self.assertEqual(self.client.call('snapshot')['accounts']['123456']['balance'], 550.0)
+
+    def test_requests_without_the_token_are_refused(self):
+        token_file = self.client.token_file
+        self.assertEqual(stat.S_IMODE(os.stat(token_file).st_mode), 0o600)
+        for token in (None, "0" * 64, 42):
+            response = self.raw_request({'token': token, 'command': 'deposit',
+                                         'args': ['123456', '50']})
+            self.assertFalse(response['ok'])
+            self.assertIn("Unauthorized", response['error'])
+        with open(token_file) as f:
+            token = f.read()
+        self.assertTrue(self.raw_request({'token': token, 'command': 'ping'})['ok'])
+        self.assertEqual(self.client.call('snapshot')['accounts']['123456']['balance'], 500.0)
+
+    def test_dashboard_matches_the_data_file(self):
+        self.client.call('deposit', 123456, 50)
+        self.client.call('transfer', 345678, 901234, 100)
+        data = self.client.call('dashboard')
+        self.assertNotIn('transaction_history', data)
+        self.assertEqual(data['transfers'], {'volume': 100.0, 'count': 1})
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            served = BankingDashboard(self.data_file, client=self.client)
+            from_file = BankingDashboard(self.data_file)
+        for dashboard in (served, from_file):
+            self.assertEqual(dashboard.get_total_assets(), 3500.0)
+            self.assertEqual(dashboard.get_transaction_stats()['total_transfers'], 100.0)
+            self.assertEqual(dashboard.get_top_accounts_by_balance(1),
+                             [("901234", "Alice Johnson", 1300.0)])
+
+
+class DashboardLoadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.data_file = os.path.join(self.directory, "banking_data.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_reading_the_book_writes_nothing(self):
+        with open(self.data_file, 'w') as f:
+            json.dump({'accounts': {'123456': {'account_number': 123456, 'owner_first_name': "Filan",
+                                               'owner_last_name': "Fisteku", 'balance': 500.0}},
+                       'transaction_history': []}, f)
+        dashboard = BankingDashboard(self.data_file)
+        self.assertEqual(dashboard.get_top_accounts_by_balance(), [("123456", "Filan Fisteku", 500.0)])
+        self.assertEqual(os.listdir(self.directory), ["banking_data.json"])
+
+    def test_unreadable_book_is_reported(self):
+        with open(self.data_file, 'w') as f:
+            f.write("{not json")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            dashboard = BankingDashboard(self.data_file)
+        self.assertEqual(dashboard.get_account_count(), 0)
+        self.assertIn("Could not load", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
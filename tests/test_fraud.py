@@ -0,0 +1,78 @@
+"""Fraud screening rules raise one alert per burst"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Enhanced_BankingApp import EnhancedBankingSystem
+from banking_fraud import FraudDetector, FraudRules
+
+
+def row(kind, amount, ts, success=True, account_number=123456):
+    return {'account_number': account_number, 'type': kind, 'amount': amount,
+            'ts': ts, 'success': success}
+
+
+class FraudRuleTest(unittest.TestCase):
+
+    def setUp(self):
+        self.detector = FraudDetector(FraudRules(velocity_count=3, velocity_window_ms=1000,
+                                                 debit_limit=100.0, debit_window_ms=10_000,
+                                                 failed_transfer_count=2,
+                                                 failed_transfer_window_ms=5000))
+
+    def test_velocity_alerts_once_per_window(self):
+        self.detector.screen_many(row('DEPOSIT', 1.0, ts) for ts in (0, 300, 600, 900, 1200))
+        alerts = self.detector.drain()
+        self.assertEqual([(alert['rule'], alert['ts']) for alert in alerts], [('velocity', 600)])
+
+    def test_slow_transactions_do_not_alert(self):
+        self.detector.screen_many(row('DEPOSIT', 1.0, ts) for ts in range(0, 10_000, 600))
+        self.assertEqual(self.detector.drain(), [])
+
+    def test_debits_over_the_limit_within_the_window(self):
+        self.detector.screen_many([row('WITHDRAW', 60.0, 0), row('WITHDRAW', 30.0, 5000),
+                                   row('WITHDRAW', 50.0, 12_000), row('TRANSFER_OUT', 80.0, 14_000)])
+        alert, = self.detector.drain()
+        self.assertEqual((alert['rule'], alert['ts']), ('debit_amount', 14_000))
+        self.assertIn("$160.00", alert['detail'])
+
+    def test_failed_debits_and_other_accounts_do_not_count(self):
+        self.detector.screen_many([row('WITHDRAW', 90.0, 0), row('WITHDRAW', 90.0, 10, False),
+                                   row('WITHDRAW', 90.0, 20000, account_number=789012)])
+        self.assertEqual(self.detector.drain(), [])
+
+    def test_failed_transfer_burst(self):
+        self.detector.screen_many([row('TRANSFER_FAILED', 900.0, 0, False),
+                                   row('TRANSFER_FAILED', 900.0, 4000, False)])
+        alert, = self.detector.drain()
+        self.assertEqual(alert['rule'], 'failed_transfers')
+
+
+class EngineScreeningTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.system = EnhancedBankingSystem(os.path.join(self.directory, "banking_data.json"),
+                                                auto_save=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_committed_failures_are_screened(self):
+        for _ in range(3):
+            with self.assertRaises(ValueError):
+                self.system.transfer(123456, 789012, 10_000)
+        alert, = self.system.fraud_detector.drain()
+        self.assertEqual((alert['rule'], alert['account_number']), ('failed_transfers', 123456))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+"""Owner-name search and account number prefix search"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Enhanced_BankingApp import EnhancedBankingSystem
+from Model import BankAccount, BankAccountOwner
+from banking_index import AccountOrder, OwnerIndex
+
+
+class PrefixTest(unittest.TestCase):
+
+    def setUp(self):
+        owner = BankAccountOwner("Jane", "Doe")
+        numbers = [1, 12, 120, 123456, 123457, 129999, 200000, 1234567]
+        self.order = AccountOrder()
+        self.order.rebuild({number: BankAccount(number, owner) for number in numbers})
+
+    def test_leading_zero_matches_nothing(self):
+        self.assertEqual(self.order.numbers_with_prefix("0"), [])
+        self.assertEqual(self.order.numbers_with_prefix("012"), [])
+
+    def test_full_number(self):
+        self.assertEqual(self.order.numbers_with_prefix("123456"), [123456, 1234567])
+        self.assertEqual(self.order.numbers_with_prefix("200000"), [200000])
+
+    def test_prefix_is_ascending_without_duplicates(self):
+        found = self.order.numbers_with_prefix("12", limit=None)
+        self.assertEqual(found, [12, 120, 123456, 123457, 129999, 1234567])
+        self.assertEqual(self.order.numbers_with_prefix("12", limit=3), [12, 120, 123456])
+
+    def test_non_digits(self):
+        self.assertEqual(self.order.numbers_with_prefix(""), [])
+        self.assertEqual(self.order.numbers_with_prefix("12a"), [])
+
+
+class OwnerIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.accounts = {
+            1: BankAccount(1, BankAccountOwner("Jane", "Doe")),
+            2: BankAccount(2, BankAccountOwner("John", "Doe")),
+            3: BankAccount(3, BankAccountOwner("Janet", "  Smith ")),
+            4: BankAccount(4, BankAccountOwner("Alice", "Jansen")),
+        }
+        self.index = OwnerIndex()
+        self.index.rebuild(self.accounts)
+
+    def test_first_or_last_name_prefix(self):
+        self.assertEqual(self.index.search("jan"), [1, 3, 4])
+        self.assertEqual(self.index.search("DOE"), [1, 2])
+        self.assertEqual(self.index.search("doe jo"), [2])
+        self.assertEqual(self.index.search("jan", limit=2), [1, 3])
+        self.assertEqual(self.index.search("   "), [])
+
+    def test_exact_name_either_order(self):
+        self.assertEqual(self.index.find("jane doe"), [1])
+        self.assertEqual(self.index.find("Smith  Janet"), [3])
+        self.assertEqual(self.index.find("jane"), [])
+
+    def test_update_follows_renames_and_deletes(self):
+        self.accounts[1] = BankAccount(1, BankAccountOwner("Jane", "Roe"))
+        del self.accounts[2]
+        self.accounts[5] = BankAccount(5, BankAccountOwner("Doe", "Ray"))
+        self.index.update(self.accounts, {1, 2, 5})
+        self.assertEqual(self.index.search("doe"), [5])
+        self.assertEqual(self.index.find("jane roe"), [1])
+        self.assertEqual(len(self.index), 4)
+
+
+class EngineSearchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.data_file = os.path.join(self.directory, "banking_data.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def open_system(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return EnhancedBankingSystem(self.data_file, auto_save=False)
+
+    def test_search_sees_other_front_ends(self):
+        first, second = self.open_system(), self.open_system()
+        account = second.open_account("Maria", "Doeson", 10)
+        self.assertEqual([a.account_number for a in first.search_accounts("doe")],
+                         [789012, account.account_number])
+        second.update_owner(789012, "John", "Smith")
+        self.assertEqual([a.account_number for a in first.search_accounts("doe")],
+                         [account.account_number])
+        self.assertEqual([a.account_number for a in first.find_owner_accounts("John", "Smith")],
+                         [789012])
+        self.assertEqual([a.account_number for a in first.search_accounts("7890")], [789012])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""Batch jobs: resuming interrupted runs, holds, pruning finished jobs"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Enhanced_BankingApp import EnhancedBankingSystem
+from banking_jobs import BatchJob, FeeSchedule, InterestSchedule, JOB_RETENTION_DAYS, prune_jobs
+from banking_records import today
+
+DEFAULT_BALANCES = {123456: 500.0, 345678: 750.0, 789012: 1000.0, 901234: 1200.0}
+
+
+class FailingSchedule(InterestSchedule):
+    """Interest schedule that crashes on one chunk"""
+
+    def __init__(self, fail_on_call):
+        super().__init__()
+        self.calls = 0
+        self.fail_on_call = fail_on_call
+
+    def amounts(self, balances, available):
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            raise RuntimeError("worker killed")
+        return super().amounts(balances, available)
+
+
+class BatchJobTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.data_file = os.path.join(self.directory, "banking_data.json")
+        self.system = self.open_system()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def open_system(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return EnhancedBankingSystem(self.data_file, auto_save=False)
+
+    def balances(self, system):
+        return {acc_num: account.account_balance for acc_num, account in system.accounts.items()}
+
+    def test_interrupted_job_resumes_without_applying_a_chunk_twice(self):
+        with self.assertRaises(RuntimeError):
+            BatchJob(self.system, "interest-test", FailingSchedule(3), chunk_size=1).run()
+        self.assertEqual(self.system.job_progress["interest-test"]['accounts'], 2)
+
+        # A restarted front end picks the job up from the journal
+        restarted = self.open_system()
+        progress = BatchJob(restarted, "interest-test", InterestSchedule(), chunk_size=1).run()
+        self.assertTrue(progress['done'])
+        self.assertEqual(progress['accounts'], 4)
+
+        schedule = InterestSchedule()
+        expected = {acc_num: balance + interest for (acc_num, balance), interest in
+                    zip(DEFAULT_BALANCES.items(), schedule.amounts(DEFAULT_BALANCES.values(), []))}
+        for acc_num, balance in self.balances(restarted).items():
+            self.assertAlmostEqual(balance, expected[acc_num])
+        self.assertEqual(len(restarted.transaction_history), 4)
+
+        # Running the finished job again changes nothing
+        BatchJob(restarted, "interest-test", InterestSchedule(), chunk_size=1).run()
+        self.assertEqual(len(restarted.transaction_history), 4)
+
+    def test_fees_never_touch_held_funds(self):
+        self.system.place_hold(123456, 498)
+        self.system.place_hold(345678, 750)
+        BatchJob(self.system, "fees-test", FeeSchedule()).run()
+        self.assertEqual(self.system.accounts[123456].account_balance, 498.0)
+        self.assertEqual(self.system.accounts[345678].account_balance, 750.0)
+        self.assertEqual(self.system.available_balance(123456), 0.0)
+
+    def test_finished_jobs_are_pruned_after_the_retention_window(self):
+        BatchJob(self.system, "interest-test", InterestSchedule()).run()
+        self.assertEqual(self.system.job_progress["interest-test"]['finished'], today())
+
+        self.system.job_progress["fees-old"] = {'type': 'FEE', 'done': True}
+        self.system.job_progress["fees-running"] = {'type': 'FEE', 'done': False}
+        self.system.save_data()
+        with open(self.data_file) as f:
+            self.assertEqual(set(json.load(f)['jobs']), {"interest-test", "fees-old", "fees-running"})
+
+        later = today() + JOB_RETENTION_DAYS + 1
+        self.assertEqual(prune_jobs(self.system.job_progress, later), 2)
+        self.assertEqual(set(self.system.job_progress), {"fees-running"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+"""Change journal: replay, conflicts, snapshot recovery and checkpointing"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Enhanced_BankingApp import EnhancedBankingSystem
+from banking_journal import journal_path_for
+
+
+class JournalTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.data_file = os.path.join(self.directory, "banking_data.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def open_system(self, auto_save=False):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return EnhancedBankingSystem(self.data_file, auto_save=auto_save)
+
+
+class ReplayTest(JournalTestCase):
+
+    def test_torn_record_is_skipped_and_later_records_replay(self):
+        system = self.open_system()
+        system.save_data()
+        system.deposit(123456, 10)
+        with open(journal_path_for(self.data_file), 'ab') as f:
+            f.write(b"0badc0de {\"origin\": \"torn\n")
+        system.deposit(123456, 5)
+
+        reopened = self.open_system()
+        self.assertEqual(reopened.journal.corrupt_records, 1)
+        self.assertAlmostEqual(reopened.accounts[123456].account_balance, 515.0)
+        self.assertEqual(reopened.accounts[123456].version, system.accounts[123456].version)
+
+    def test_half_written_record_waits_for_the_next_poll(self):
+        system = self.open_system()
+        path = journal_path_for(self.data_file)
+        with open(path, 'ab') as f:
+            f.write(b"00000000 {\"origin\"")
+        offset = system.watcher.offset
+        self.assertEqual(system.sync_changes(), set())
+        self.assertEqual(system.watcher.offset, offset)
+
+    def test_own_record_lost_in_a_torn_line_is_redone(self):
+        system = self.open_system()
+        with open(journal_path_for(self.data_file), 'ab') as f:
+            f.write(b"00000000 {\"origin\"")
+        # The deposit's record completes the torn line, which fails its checksum
+        system.deposit(123456, 10)
+        self.assertEqual(system.journal.corrupt_records, 1)
+        self.assertAlmostEqual(system.accounts[123456].account_balance, 510.0)
+        self.assertAlmostEqual(self.open_system().accounts[123456].account_balance, 510.0)
+
+
+class ConflictTest(JournalTestCase):
+
+    def test_stale_operation_retries_on_fresh_state(self):
+        first = self.open_system()
+        second = self.open_system()
+        first.withdraw(123456, 400)
+
+        # second has not seen the withdrawal: its first attempt loses the
+        # version check, the retry runs against the new balance
+        attempts = []
+
+        def stage():
+            attempts.append(second.accounts[123456].account_balance)
+            second.expect_version(123456, second.accounts[123456].version)
+            second.stage_delta(123456, -50)
+            return lambda: second.accounts[123456].account_balance
+
+        self.assertAlmostEqual(second.run_operation(stage), 50.0)
+        self.assertEqual(attempts, [500.0, 100.0])
+
+        first.sync_changes()
+        self.assertAlmostEqual(first.accounts[123456].account_balance, 50.0)
+
+    def test_both_writers_converge(self):
+        first = self.open_system()
+        second = self.open_system()
+        first.deposit(789012, 25)
+        second.deposit(789012, 75)
+        first.sync_changes()
+        self.assertEqual(first.accounts[789012].account_balance,
+                         second.accounts[789012].account_balance)
+        self.assertEqual(first.accounts[789012].version, second.accounts[789012].version)
+
+
+class RecoveryTest(JournalTestCase):
+
+    def test_corrupt_snapshot_recovers_from_bak(self):
+        system = self.open_system()
+        system.save_data()
+        system.deposit(123456, 20)
+        system.save_data()
+        with open(self.data_file, 'w') as f:
+            f.write('{"accounts": ')
+
+        reopened = self.open_system()
+        self.assertAlmostEqual(reopened.accounts[123456].account_balance, 520.0)
+        self.assertTrue(os.path.exists(self.data_file + ".corrupt"))
+
+
+class CheckpointTest(JournalTestCase):
+
+    def test_one_shot_processes_checkpoint_from_the_journal_tail(self):
+        self.open_system().save_data()
+        for _ in range(4):
+            system = self.open_system()
+            system.checkpoint_interval = 3
+            system.deposit(123456, 1)
+            system.checkpoint_if_due()
+
+        # Three commits reached the interval, the fourth is still in the tail
+        reopened = self.open_system()
+        self.assertEqual(reopened.journal_tail(), 1)
+        self.assertAlmostEqual(reopened.accounts[123456].account_balance, 504.0)
+
+    def test_commits_from_other_front_ends_count(self):
+        system = self.open_system()
+        system.save_data()
+        system.checkpoint_interval = 2
+        other = self.open_system()
+        other.deposit(123456, 1)
+        other.deposit(123456, 1)
+        system.checkpoint_if_due()
+        self.assertEqual(system.journal_tail(), 0)
+
+    def test_compaction_is_noticed_after_the_journal_regrows(self):
+        first = self.open_system()
+        second = self.open_system()
+        first.deposit(123456, 1)
+        second.sync_changes()
+        first.compact_journal()
+        # Longer than everything second has read, so a size check alone would miss the reset
+        for _ in range(3):
+            first.deposit(789012, 1)
+        self.assertGreater(first.journal.size(), second.watcher.offset)
+
+        second.sync_changes()
+        self.assertEqual(second.journal_resets, 1)
+        self.assertAlmostEqual(second.accounts[123456].account_balance, 501.0)
+        self.assertAlmostEqual(second.accounts[789012].account_balance, 1003.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""Daily withdrawal limits and holds decide which debits are accepted"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Enhanced_BankingApp
+from Enhanced_BankingApp import EnhancedBankingSystem
+from banking_records import today
+
+
+class LimitTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.data_file = os.path.join(self.directory, "banking_data.json")
+        self.system = self.open_system()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def open_system(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return EnhancedBankingSystem(self.data_file, auto_save=False)
+
+    def test_daily_limit_rejects_the_next_withdrawal(self):
+        self.system.set_daily_limit(123456, 100)
+        self.system.withdraw(123456, 60)
+        self.system.transfer(123456, 789012, 30)
+        with self.assertRaisesRegex(ValueError, "Daily withdrawal limit exceeded"):
+            self.system.withdraw(123456, 20)
+        self.assertEqual(self.system.accounts[123456].account_balance, 410.0)
+        self.assertEqual(self.system.transaction_history[-1]['type'], "WITHDRAW_FAILED")
+
+        # Another front end counts the same usage from the journal
+        other = self.open_system()
+        self.assertEqual(other.limits.used_on(123456, today()), 90.0)
+        with self.assertRaisesRegex(ValueError, "Daily withdrawal limit exceeded"):
+            other.withdraw(123456, 20)
+
+    def test_limit_window_restarts_the_next_day(self):
+        self.system.set_daily_limit(123456, 100)
+        self.system.withdraw(123456, 100)
+        with mock.patch.object(Enhanced_BankingApp, 'today', return_value=today() + 1):
+            self.system.withdraw(123456, 100)
+        self.assertEqual(self.system.accounts[123456].account_balance, 300.0)
+
+    def test_hold_blocks_debits_until_released(self):
+        hold_id = self.system.place_hold(123456, 450)
+        self.assertEqual(self.system.available_balance(123456), 50.0)
+        with self.assertRaisesRegex(ValueError, "Insufficient available balance"):
+            self.system.withdraw(123456, 100)
+        with self.assertRaisesRegex(ValueError, "Insufficient available balance"):
+            self.system.transfer(123456, 789012, 100)
+        with self.assertRaisesRegex(ValueError, "Insufficient available balance"):
+            self.system.place_hold(123456, 100)
+
+        self.assertEqual(self.system.release_hold(hold_id), (123456, 450))
+        self.assertEqual(self.system.available_balance(123456), 500.0)
+        self.system.withdraw(123456, 100)
+        self.assertEqual(self.system.accounts[123456].account_balance, 400.0)
+        with self.assertRaisesRegex(ValueError, "not found"):
+            self.system.release_hold(hold_id)
+
+    def test_holds_survive_a_checkpoint(self):
+        self.system.place_hold(123456, 450)
+        self.system.save_data()
+        with self.assertRaisesRegex(ValueError, "Insufficient available balance"):
+            self.open_system().withdraw(123456, 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""Timestamp migration: legacy ISO 'timestamp' rows become epoch-ms ts plus day number"""
+
+import contextlib
+import datetime
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Enhanced_BankingApp import EnhancedBankingSystem
+from banking_journal import ChangeJournal, journal_path_for, new_event
+from banking_records import day_number, format_day, format_ts, migrate_transaction
+
+
+def legacy_row(timestamp, kind="DEPOSIT"):
+    return {'account_number': 123456, 'type': kind, 'amount': 10.0, 'success': True,
+            'error': "", 'timestamp': timestamp}
+
+
+class MigrateTransactionTest(unittest.TestCase):
+
+    def test_iso_timestamp_becomes_local_epoch_ms(self):
+        row = migrate_transaction(legacy_row("2025-06-10T23:30:15.250000"))
+        self.assertNotIn('timestamp', row)
+        expected = datetime.datetime(2025, 6, 10, 23, 30, 15, 250000)
+        self.assertEqual(row['ts'], int(expected.timestamp() * 1000))
+        self.assertEqual(row['day'], day_number(datetime.date(2025, 6, 10)))
+        self.assertEqual(format_ts(row['ts']), "2025-06-10 23:30:15")
+        self.assertEqual(format_day(row['day']), "2025-06-10")
+
+    def test_trailing_z_reads_as_the_same_wall_clock_time(self):
+        self.assertEqual(migrate_transaction(legacy_row("2025-06-10T10:00:00Z"))['ts'],
+                         migrate_transaction(legacy_row("2025-06-10T10:00:00"))['ts'])
+
+    def test_unreadable_or_missing_timestamp_becomes_the_epoch(self):
+        epoch_day = day_number(datetime.datetime.fromtimestamp(0).date())
+        for timestamp in ("yesterday", None):
+            row = migrate_transaction(legacy_row(timestamp))
+            self.assertEqual((row['ts'], row['day']), (0, epoch_day))
+
+    def test_legacy_type_names_and_migrated_rows(self):
+        row = migrate_transaction(legacy_row("2025-06-10T10:00:00", "WITHDRAWAL"))
+        self.assertEqual(row['type'], "WITHDRAW")
+        self.assertEqual(migrate_transaction(dict(row)), row)
+
+
+class LegacyBookTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.data_file = os.path.join(self.directory, "banking_data.json")
+        with open(self.data_file, 'w') as f:
+            json.dump({'accounts': {'123456': {'account_number': 123456, 'owner_first_name': "Jane",
+                                               'owner_last_name': "Doe", 'balance': 10.0}},
+                       'transaction_history': [legacy_row("2025-06-10T10:00:00")]}, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def open_system(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return EnhancedBankingSystem(self.data_file, auto_save=False)
+
+    def test_snapshot_and_journal_rows_are_migrated(self):
+        # An older front end journals rows with ISO timestamps
+        event = new_event("old-front-end")
+        event['transactions'].append(legacy_row("2025-06-11T09:00:00"))
+        ChangeJournal(journal_path_for(self.data_file)).append(event)
+
+        system = self.open_system()
+        self.assertTrue(system.dirty)
+        self.assertEqual([format_day(row['day']) for row in system.transaction_history],
+                         ["2025-06-10", "2025-06-11"])
+        system.save_data()
+        with open(self.data_file) as f:
+            history = json.load(f)['transaction_history']
+        self.assertEqual(history['format'], 'columns')
+        self.assertNotIn('timestamp', history)
+        self.assertEqual([format_ts(row['ts']) for row in self.open_system().transaction_history],
+                         ["2025-06-10 10:00:00", "2025-06-11 09:00:00"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""Rollups: incremental totals match a rebuild, archived months come from the manifest"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Enhanced_BankingApp
+from Enhanced_BankingApp import EnhancedBankingSystem
+from banking_archive import HistoryArchive, MANIFEST
+from banking_records import AUDIT_SEGMENT_ROWS, today
+from banking_rollups import Rollups
+
+
+class RollupTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.data_file = os.path.join(self.directory, "banking_data.json")
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.system = EnhancedBankingSystem(self.data_file, auto_save=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def add_activity(self):
+        system = self.system
+        system.deposit(123456, 50)
+        system.withdraw(789012, 25)
+        system.transfer(345678, 901234, 100)
+        with self.assertRaises(ValueError):
+            system.withdraw(123456, 10000)
+
+        def stage():
+            system.log_batch("INTEREST", [123456] * AUDIT_SEGMENT_ROWS, [0.01] * AUDIT_SEGMENT_ROWS)
+            return lambda: None
+        system.run_operation(stage)
+
+    def rebuilt(self, full):
+        rollups = Rollups()
+        rollups.rebuild(self.system.archive, self.system.transaction_history, full)
+        return rollups
+
+    def assert_same_tables(self, rollups, other):
+        self.assertEqual(rollups.through, other.through)
+        self.assertEqual(json.loads(json.dumps(rollups.to_data())),
+                         json.loads(json.dumps(other.to_data())))
+
+    def test_incremental_tables_match_a_rebuild(self):
+        self.add_activity()
+        rollups = self.system.rollups
+        self.assertEqual(rollups.totals(), [AUDIT_SEGMENT_ROWS + 5, AUDIT_SEGMENT_ROWS + 4])
+        self.assertEqual(rollups.type_amount("TRANSFER_OUT"), 100)
+        self.assertEqual(rollups.account_totals(789012), [1, 0.0, 25.0, -25.0])
+        self.assertEqual(rollups.days[today()][:2], [AUDIT_SEGMENT_ROWS + 5, AUDIT_SEGMENT_ROWS + 4])
+        self.assert_same_tables(rollups, self.rebuilt(full=True))
+
+    def test_rebuild_after_archiving_reads_only_the_manifest(self):
+        self.add_activity()
+        with mock.patch.object(Enhanced_BankingApp, 'today', return_value=today() + 1):
+            self.assertEqual(self.system.archive_history(0), AUDIT_SEGMENT_ROWS)
+
+        full = self.rebuilt(full=True)
+        with mock.patch.object(HistoryArchive, '_partition_runs',
+                               side_effect=AssertionError("partition read")):
+            from_manifest = self.rebuilt(full=False)
+        self.assertEqual(self.system.transaction_history.archived_rows, AUDIT_SEGMENT_ROWS)
+        self.assertEqual(full.totals(), self.system.rollups.totals())
+        self.assertEqual(from_manifest.totals(), full.totals())
+        self.assertEqual(from_manifest.account_totals(123456), full.account_totals(123456))
+
+    def test_manifest_without_month_tables_falls_back_to_the_partitions(self):
+        self.add_activity()
+        with mock.patch.object(Enhanced_BankingApp, 'today', return_value=today() + 1):
+            self.system.archive_history(0)
+        manifest_path = os.path.join(self.system.archive.directory, MANIFEST)
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        # The per-month summary written before month rollups existed
+        for month in manifest['partitions']:
+            manifest['partitions'][month] = {'rows': 0, 'successful': 0, 'by_type': {}, 'days': {}}
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f)
+
+        self.assertEqual(self.rebuilt(full=False).totals(), self.system.rollups.totals())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+"""ShardedBank: concurrent transfers across shards"""
+
+import os
+import random
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "python banking_app.py"))
+
+from sharded_bank import ShardedBank
+
+
+class ShardedBankTest(unittest.TestCase):
+
+    def setUp(self):
+        self.bank = ShardedBank(8)
+        for i in range(40):
+            self.bank.create_account(str(i), f"Holder {i}", 100)
+
+    def test_concurrent_transfers_keep_the_total(self):
+        failures = []
+
+        def worker(seed):
+            rng = random.Random(seed)
+            for _ in range(2000):
+                source, destination = rng.sample(range(40), 2)
+                try:
+                    self.bank.transfer(str(source), str(destination), rng.choice((1, 5, 30, 150)))
+                except ValueError:
+                    failures.append(seed)
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.bank.total_balance(), 4000)
+        self.assertTrue(failures)  # some transfers of 150 found too little money
+        self.assertTrue(all(self.bank.get_account(str(i)).get_balance() >= 0 for i in range(40)))
+
+    def test_failed_transfer_changes_nothing(self):
+        with self.assertRaisesRegex(ValueError, "Insufficient funds"):
+            self.bank.transfer("0", "1", 500)
+        with self.assertRaisesRegex(ValueError, "Account not found"):
+            self.bank.transfer("0", "missing", 50)
+        self.assertEqual(self.bank.get_account("0").get_balance(), 100)
+        self.assertEqual(self.bank.get_account("1").get_balance(), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+"""Statements: opening and closing balances, legacy snapshots, archived months"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Enhanced_BankingApp import EnhancedBankingSystem
+from banking_records import AUDIT_SEGMENT_ROWS
+from banking_statements import collect_statements, parse_period, render_csv
+
+LEGACY_SNAPSHOT = {
+    'accounts': {
+        '123456': {'account_number': 123456, 'owner_first_name': "Jane",
+                   'owner_last_name': "Doe", 'balance': 70.0}
+    },
+    'transaction_history': [
+        {'account_number': 123456, 'type': "DEPOSIT", 'amount': 100.0, 'success': True,
+         'error': "", 'timestamp': "2025-06-10T10:00:00"},
+        {'account_number': 123456, 'type': "WITHDRAWAL", 'amount': 30.0, 'success': True,
+         'error': "", 'timestamp': "2025-06-11T10:00:00"},
+        {'account_number': 123456, 'type': "WITHDRAWAL_FAILED", 'amount': 500.0, 'success': False,
+         'error': "Insufficient balance", 'timestamp': "2025-06-12T10:00:00"}
+    ]
+}
+
+
+class LegacyStatementTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.data_file = os.path.join(self.directory, "banking_data.json")
+        with open(self.data_file, 'w') as f:
+            json.dump(LEGACY_SNAPSHOT, f)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.system = EnhancedBankingSystem(self.data_file, auto_save=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_legacy_withdrawal_rows_are_debits(self):
+        start_day, end_day = parse_period("2025-06")
+        statement, = collect_statements(self.system, start_day, end_day)
+        self.assertEqual(statement['opening_balance'], 0.0)
+        self.assertEqual(statement['closing_balance'], 70.0)
+        self.assertEqual([row[1:4] for row in statement['rows']],
+                         [("DEPOSIT", 100.0, True), ("WITHDRAW", -30.0, True),
+                          ("WITHDRAW_FAILED", 500.0, False)])
+        self.assertIn("WITHDRAW,-30.00", render_csv(statement))
+        self.assertEqual(self.system.transaction_history.extra_types(), [])
+
+
+def row(account_number, kind, amount, timestamp, success=True):
+    return {'account_number': account_number, 'type': kind, 'amount': amount, 'success': success,
+            'error': "" if success else "Insufficient balance", 'timestamp': timestamp}
+
+
+class BalanceTest(unittest.TestCase):
+    """One full audit segment of May deposits, then June and July activity"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.data_file = os.path.join(self.directory, "banking_data.json")
+        history = [row(123456, "DEPOSIT", 1.0, "2025-05-15T10:00:00")] * AUDIT_SEGMENT_ROWS
+        history += [row(123456, "DEPOSIT", 100.0, "2025-06-10T10:00:00"),
+                    row(123456, "WITHDRAWAL", 30.0, "2025-06-11T10:00:00"),
+                    row(123456, "WITHDRAWAL_FAILED", 500.0, "2025-06-30T23:59:59", success=False),
+                    row(123456, "TRANSFER_OUT", 50.0, "2025-07-01T00:00:00"),
+                    row(789012, "TRANSFER_IN", 50.0, "2025-07-01T00:00:00")]
+        accounts = {
+            '123456': {'account_number': 123456, 'owner_first_name': "Jane",
+                       'owner_last_name': "Doe", 'balance': AUDIT_SEGMENT_ROWS + 20.0},
+            '789012': {'account_number': 789012, 'owner_first_name': "John",
+                       'owner_last_name': "Doe", 'balance': 50.0}
+        }
+        with open(self.data_file, 'w') as f:
+            json.dump({'accounts': accounts, 'transaction_history': history}, f)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.system = EnhancedBankingSystem(self.data_file, auto_save=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def balances(self, period):
+        return {statement['account_number']: (statement['opening_balance'],
+                                              statement['closing_balance'], len(statement['rows']))
+                for statement in collect_statements(self.system, *parse_period(period))}
+
+    def check_periods(self):
+        may = AUDIT_SEGMENT_ROWS
+        self.assertEqual(self.balances("2025-05"), {123456: (0.0, may, may), 789012: (0.0, 0.0, 0)})
+        self.assertEqual(self.balances("2025-06"), {123456: (may, may + 70, 3),
+                                                    789012: (0.0, 0.0, 0)})
+        self.assertEqual(self.balances("2025-07"), {123456: (may + 70, may + 20, 1),
+                                                    789012: (0.0, 50.0, 1)})
+
+    def test_each_closing_balance_opens_the_next_period(self):
+        self.check_periods()
+        # Activity after the period moves neither of its balances
+        self.system.deposit(123456, 5)
+        self.check_periods()
+
+    def test_archived_months_give_the_same_statements(self):
+        self.assertEqual(self.system.archive_history(0), AUDIT_SEGMENT_ROWS)
+        self.assertEqual(len(self.system.transaction_history), 5)
+        self.check_periods()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""Transfer ids: both legs of a transfer share one id, across retries and reloads"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Enhanced_BankingApp import EnhancedBankingSystem
+
+
+class TransferIdTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.data_file = os.path.join(self.directory, "banking_data.json")
+        self.system = self.open_system()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def open_system(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return EnhancedBankingSystem(self.data_file, auto_save=False)
+
+    def legs(self, system, transfer_id):
+        return [(leg['type'], leg['account_number'], leg['amount'])
+                for leg in system.transaction_history.transfer_legs(transfer_id)]
+
+    def test_both_legs_carry_the_id(self):
+        self.system.deposit(123456, 5)
+        self.system.transfer(123456, 789012, 100, transfer_id=42)
+        self.system.transfer(345678, 901234, 10)
+        self.assertEqual(self.legs(self.system, 42),
+                         [('TRANSFER_OUT', 123456, 100.0), ('TRANSFER_IN', 789012, 100.0)])
+        record = self.system.get_transfer(42)
+        self.assertEqual((record['from_account'], record['to_account'], record['amount']),
+                         (123456, 789012, 100.0))
+        history = self.system.transaction_history
+        self.assertEqual((history.transfer_count, history.transfer_volume), (2, 110.0))
+
+    def test_legs_stay_linked_after_a_reload(self):
+        self.system.transfer(123456, 789012, 100, transfer_id=42)
+        self.system.save_data()
+        self.system.transfer(345678, 901234, 10, transfer_id=43)
+        reopened = self.open_system()
+        self.assertEqual(reopened.get_transfer(42)['to_account'], 789012)
+        self.assertEqual(reopened.get_transfer(43)['from_account'], 345678)
+        with self.assertRaisesRegex(ValueError, "not found"):
+            reopened.get_transfer(44)
+
+    def test_retried_transfer_keeps_one_id(self):
+        other = self.open_system()
+        other.withdraw(123456, 50)
+        # self has not seen the withdrawal: the first attempt loses its version check
+        self.system.transfer(123456, 789012, 100)
+        transfer_ids = {row['transfer_id'] for row in self.system.transaction_history} - {None}
+        self.assertEqual(len(transfer_ids), 1)
+        transfer_id = transfer_ids.pop()
+        self.assertEqual(len(self.legs(self.system, transfer_id)), 2)
+        other.sync_changes()
+        self.assertEqual(other.get_transfer(transfer_id)['amount'], 100.0)
+
+    def test_failed_transfer_has_no_legs(self):
+        with self.assertRaises(ValueError):
+            self.system.transfer(123456, 789012, 10000, transfer_id=42)
+        self.assertEqual(self.legs(self.system, 42), [])
+        self.assertEqual(self.system.transaction_history.transfer_count, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
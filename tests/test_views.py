@@ -0,0 +1,251 @@
+"""GUI view models, driven with stand-ins for the Tk widgets and main loop"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Enhanced_BankingApp import EnhancedBankingSystem
+from Model import BankAccount, BankAccountOwner
+from banking_views import AccountPager, BackgroundTasks, KeyedListModel, RefreshScheduler
+
+
+class FakeListbox:
+    """The part of tk.Listbox the view models use, recording every row operation"""
+
+    def __init__(self):
+        self.items = []
+        self.selected = set()
+        self.operations = 0
+
+    def delete(self, first, last=None):
+        self.operations += 1
+        if last == 'end':
+            del self.items[first:]
+            self.selected.clear()
+        else:
+            del self.items[first]
+            self.selected = {i if i < first else i - 1 for i in self.selected if i != first}
+
+    def insert(self, index, *texts):
+        self.operations += 1
+        index = len(self.items) if index == 'end' else index
+        self.items[index:index] = texts
+        self.selected = {i if i < index else i + len(texts) for i in self.selected}
+
+    def selection_includes(self, index):
+        return index in self.selected
+
+    def selection_set(self, index):
+        self.selected.add(index)
+
+
+class FakeRoot:
+    """Stand-in for the Tk root: after() queues callbacks until run_pending()"""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, delay, callback, *args):
+        self.pending.append((callback, args))
+        return len(self.pending)
+
+    def run_pending(self):
+        """Run the queued callbacks, including ones they queue (one main-loop turn each)"""
+        turns = 0
+        while self.pending:
+            pending, self.pending = self.pending, []
+            for callback, args in pending:
+                callback(*args)
+            turns += 1
+        return turns
+
+
+def make_accounts(*rows):
+    return {number: BankAccount(number, BankAccountOwner(first, last), balance)
+            for number, first, last, balance in rows}
+
+
+def format_account(account):
+    return f"{account.account_number} {account.account_owner.first_name} ${account.account_balance:.2f}"
+
+
+class KeyedListModelTest(unittest.TestCase):
+
+    def setUp(self):
+        self.accounts = make_accounts((300, "Cara", "Poe", 30.0), (100, "Ann", "Lee", 10.0),
+                                      (200, "Bob", "Kay", 20.0))
+        self.widget = FakeListbox()
+        self.model = KeyedListModel(format_account, self.widget)
+        self.model.reset(self.accounts.values())
+
+    def test_reset_sorts_by_key(self):
+        self.assertEqual(self.widget.items, ["100 Ann $10.00", "200 Bob $20.00", "300 Cara $30.00"])
+        self.assertEqual(self.model.rows(), self.widget.items)
+        self.assertEqual((self.model.key_at(2), self.model.index_of(200)), (300, 1))
+
+    def test_changed_row_is_replaced_in_place_and_stays_selected(self):
+        self.widget.selection_set(1)
+        self.widget.operations = 0
+        self.accounts[200].deposit(5)
+        self.assertTrue(self.model.update(self.accounts, [100, 200, 300]))
+        self.assertEqual(self.widget.items[1], "200 Bob $25.00")
+        self.assertEqual(self.widget.operations, 2)
+        self.assertTrue(self.widget.selection_includes(1))
+        self.assertFalse(self.model.update(self.accounts, [100, 200, 300]))
+
+    def test_added_and_removed_rows(self):
+        self.accounts.update(make_accounts((150, "Dan", "Ray", 15.0)))
+        del self.accounts[300]
+        self.assertTrue(self.model.update(self.accounts, [150, 300]))
+        self.assertEqual(self.widget.items, ["100 Ann $10.00", "150 Dan $15.00", "200 Bob $20.00"])
+        self.assertIsNone(self.model.index_of(300))
+
+    def test_row_moves_when_its_sort_value_changes(self):
+        model = KeyedListModel(format_account, self.widget,
+                               sort_key=lambda account: account.account_balance)
+        model.reset(self.accounts.values())
+        self.accounts[100].deposit(25)
+        model.update(self.accounts, [100])
+        self.assertEqual(self.widget.items, ["200 Bob $20.00", "300 Cara $30.00", "100 Ann $35.00"])
+
+    def test_filtered_out_rows_are_removed(self):
+        model = KeyedListModel(format_account)
+        model.reset(self.accounts.values())
+        model.update(self.accounts, [100, 200], accept=lambda account: account.account_balance > 15)
+        self.assertEqual(model.rows(), ["200 Bob $20.00", "300 Cara $30.00"])
+
+
+class AccountPagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.bank = EnhancedBankingSystem(os.path.join(self.directory, "banking_data.json"),
+                                              auto_save=False)
+        self.fetches = 0
+        browse = self.bank.browse_accounts
+
+        def counting_browse(*args):
+            self.fetches += 1
+            return browse(*args)
+        self.bank.browse_accounts = counting_browse
+        self.widget = FakeListbox()
+        self.pager = AccountPager(self.bank, KeyedListModel(format_account, self.widget), page_size=3)
+        self.pager.reload()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def shown(self):
+        return [int(row.split()[0]) for row in self.widget.items]
+
+    def test_pages_through_the_book(self):
+        self.assertEqual(self.shown(), [123456, 345678, 789012])
+        self.assertEqual(self.pager.describe(), "Page 1 · 1-3+")
+        self.pager.next_page()
+        self.assertEqual(self.shown(), [901234])
+        self.assertEqual(self.pager.describe(), "Page 2 · 4-4")
+        self.pager.set_sort('balance', descending=True)
+        self.assertEqual(self.shown(), [901234, 789012, 345678])
+        self.assertTrue(self.pager.set_query("jo"))
+        self.pager.reload()
+        self.assertEqual(self.shown(), [901234, 789012])
+
+    def test_change_on_the_page_is_patched_in_place(self):
+        self.bank.deposit(345678, 50)
+        self.pager.apply_changes({345678})
+        self.assertEqual(self.fetches, 1)
+        self.assertEqual(self.widget.items[1], "345678 Jane $800.00")
+
+    def test_changes_that_move_rows_refetch_the_page(self):
+        self.bank.delete_account(123456)
+        self.pager.apply_changes({123456})
+        self.assertEqual(self.fetches, 2)
+        self.assertEqual(self.shown(), [345678, 789012, 901234])
+        self.pager.set_sort('balance')
+        self.bank.deposit(901234, 1)
+        self.pager.apply_changes({901234})
+        self.assertEqual(self.fetches, 4)
+
+
+class RefreshSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = FakeRoot()
+        self.scheduler = RefreshScheduler(self.root)
+        self.drawn = []
+        self.total = 0
+        self.scheduler.register('accounts', lambda: self.drawn.append('accounts'))
+        self.scheduler.register('stats', lambda: self.drawn.append('stats'), inputs=lambda: self.total)
+
+    def test_marks_within_a_frame_cost_one_redraw(self):
+        for _ in range(5):
+            self.scheduler.mark('accounts')
+        self.scheduler.mark('stats')
+        self.assertEqual(len(self.root.pending), 1)
+        self.root.run_pending()
+        self.assertEqual(self.drawn, ['accounts', 'stats'])
+
+    def test_idle_gui_does_no_work(self):
+        self.root.run_pending()
+        self.assertEqual((self.drawn, self.root.pending), ([], []))
+
+    def test_panel_with_unchanged_inputs_is_skipped(self):
+        self.scheduler.mark()
+        self.root.run_pending()
+        self.scheduler.mark()
+        self.root.run_pending()
+        self.assertEqual(self.drawn, ['accounts', 'stats', 'accounts'])
+        self.total = 1
+        self.scheduler.mark('stats')
+        self.root.run_pending()
+        self.scheduler.invalidate('stats')
+        self.root.run_pending()
+        self.assertEqual(self.drawn[3:], ['stats', 'stats'])
+
+
+class BackgroundTasksTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = FakeRoot()
+        self.tasks = BackgroundTasks(self.root)
+        self.published = []
+
+    def tearDown(self):
+        self.tasks.shutdown()
+
+    def test_result_is_published_from_the_main_loop(self):
+        self.tasks.submit('stats', sum, self.published.append, [1, 2, 3])
+        self.assertEqual(self.published, [])
+        self.root.run_pending()
+        self.assertEqual(self.published, [6])
+
+    def test_newer_job_supersedes_a_running_one(self):
+        release = threading.Event()
+
+        def slow(value):
+            release.wait(5)
+            return value
+        self.tasks.submit('stats', slow, self.published.append, "stale")
+        self.tasks.submit('stats', slow, self.published.append, "fresh")
+        release.set()
+        self.root.run_pending()
+        self.assertEqual(self.published, ["fresh"])
+
+    def test_errors_go_to_on_error(self):
+        errors = []
+        self.tasks.submit('stats', lambda: 1 / 0, self.published.append, on_error=errors.append)
+        self.root.run_pending()
+        self.assertEqual(self.published, [])
+        self.assertIsInstance(errors[0], ZeroDivisionError)
+
+
+if __name__ == "__main__":
+    unittest.main()